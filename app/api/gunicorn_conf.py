@@ -0,0 +1,46 @@
+# app/api/gunicorn_conf.py
+"""
+gunicorn settings for the Twilio server.
+
+Usage:
+    gunicorn -c python:app.api.gunicorn_conf app.api.twilio_server:app
+
+PREFORK_PRELOAD=1 builds the menu / engine / responder once in the
+master and forks the workers from it (see app/api/prefork.py).
+
+METRICS_DIR=<dir> makes /metrics cover every worker, not only the one
+a scrape reaches (see app/core/metrics_multiprocess.py).
+"""
+
+import os
+
+from app.api.prefork import PREFORK_PRELOAD, preload
+from app.core.metrics_multiprocess import METRICS_DIR, clear_snapshots, retire_worker
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", 2))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Import the app in the master: code and module-level tables are
+# shared with the workers too. Nothing per-process (pid, worker id,
+# connections) may be taken at import: the lifespan does, per worker
+preload_app = PREFORK_PRELOAD
+
+
+def on_starting(server):
+    # Master, once: totals start with it
+    if METRICS_DIR:
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        clear_snapshots(METRICS_DIR)
+
+
+def child_exit(server, worker):
+    # Master, after any worker exits (crashed ones included)
+    if METRICS_DIR:
+        retire_worker(METRICS_DIR, worker.pid)
+
+
+def when_ready(server):
+    # Master, after binding, before the first fork
+    if PREFORK_PRELOAD:
+        preload()
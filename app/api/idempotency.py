@@ -0,0 +1,205 @@
+# app/api/idempotency.py
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import time
+from typing import Awaitable, Callable, Dict, Optional, Protocol, Tuple
+
+from app.core.metrics import REGISTRY
+
+# How long a rendered webhook response can be replayed
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", 120))
+
+# How long a duplicate waits for the original (still running) request.
+# Twilio gives up on a webhook after 15 s.
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", 10.0))
+
+# Marker stored while the original request is being processed
+_IN_FLIGHT = b"\x00in-flight"
+
+IDEMPOTENCY_LOOKUPS = REGISTRY.counter(
+    "webhook_idempotency_total",
+    "Webhook idempotency lookups by outcome (hit = replayed response)",
+    ("outcome",),
+)
+
+
+class KeyValueStore(Protocol):
+    """
+    The subset of redis.asyncio.Redis the idempotency cache uses.
+    """
+
+    async def set(self, key: str, value: bytes, nx: bool = False, ex: Optional[int] = None):
+        ...
+
+    async def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    async def delete(self, key: str):
+        ...
+
+
+class LocalKeyValueStore:
+    """
+    In-process KeyValueStore for deployments without Redis
+    (memory / SQLite session backends). Deduplicates retries that reach
+    the same worker process only.
+    """
+
+    def __init__(self, max_keys: int = 10_000) -> None:
+        self.max_keys = max_keys
+        self._data: Dict[str, Tuple[bytes, float]] = {}
+
+    async def set(self, key: str, value: bytes, nx: bool = False, ex: Optional[int] = None):
+        now = time.monotonic()
+        if nx and self._live(key, now) is not None:
+            return None
+
+        if len(self._data) >= self.max_keys:
+            self._purge(now)
+
+        self._data[key] = (value, now + ex if ex else float("inf"))
+        return True
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._live(key, time.monotonic())
+
+    async def delete(self, key: str):
+        return 1 if self._data.pop(key, None) is not None else 0
+
+    def _live(self, key: str, now: float) -> Optional[bytes]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= now:
+            del self._data[key]
+            return None
+        return entry[0]
+
+    def _purge(self, now: float) -> None:
+        for key in [k for k, (_, exp) in self._data.items() if exp <= now]:
+            del self._data[key]
+
+        # Still full: drop the oldest half (insertion order)
+        if len(self._data) >= self.max_keys:
+            for key in list(self._data)[: self.max_keys // 2]:
+                del self._data[key]
+
+
+class WebhookIdempotencyCache:
+    """
+    Replays the rendered response of a webhook Twilio retried.
+
+    Responsibilities:
+    -----------------
+    - Run a webhook's work at most once per idempotency key
+    - Store the rendered response (as the caller serializes it: TwiML
+      and cookies, see twilio_server) for a short TTL — in Redis when the
+      session backend is Redis (any worker can answer a retry),
+      otherwise in process (LocalKeyValueStore)
+    - Make duplicates that arrive while the original is still running
+      wait for its result instead of re-running it
+    - Count hits / misses / waits
+
+    Non-responsibilities:
+    ---------------------
+    - Deciding what the key is (see webhook_key)
+    - Turn processing (AsyncTurnRunner)
+
+    If the original fails, its claim is released so a later retry runs.
+    """
+
+    def __init__(
+        self,
+        store: KeyValueStore,
+        *,
+        ttl_seconds: int = IDEMPOTENCY_TTL_SECONDS,
+        wait_seconds: float = IDEMPOTENCY_WAIT_SECONDS,
+        poll_interval: float = 0.1,
+    ) -> None:
+        self._store = store
+        self.ttl_seconds = ttl_seconds
+        self.wait_seconds = wait_seconds
+        self.poll_interval = poll_interval
+
+        # A crashed worker's claim expires shortly after duplicates stop waiting
+        self._claim_ttl = int(wait_seconds) + 5
+
+        # key → result of the original request running in this worker
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+    async def run(self, key: str, produce: Callable[[], Awaitable[str]]) -> Optional[str]:
+        """
+        Returns the response for `key`: produced now (first request),
+        or replayed (duplicate). None if a duplicate gave up waiting.
+        """
+        local = self._in_flight.get(key)
+        if local is not None:
+            IDEMPOTENCY_LOOKUPS.inc(outcome="in_flight")
+            return await asyncio.shield(local)
+
+        deadline = time.monotonic() + self.wait_seconds
+
+        while True:
+            # Claim (one round trip on the common, non-duplicate path)
+            claimed = await self._store.set(
+                _redis_key(key), _IN_FLIGHT, nx=True, ex=self._claim_ttl
+            )
+            if claimed:
+                IDEMPOTENCY_LOOKUPS.inc(outcome="miss")
+                return await self._produce(key, produce)
+
+            stored = await self._store.get(_redis_key(key))
+            if stored is not None and stored != _IN_FLIGHT:
+                IDEMPOTENCY_LOOKUPS.inc(outcome="hit")
+                return stored.decode("utf-8")
+
+            # Original still running on another worker (or claim just
+            # released → loop claims it)
+            if stored is not None:
+                if time.monotonic() >= deadline:
+                    IDEMPOTENCY_LOOKUPS.inc(outcome="wait_timeout")
+                    return None
+                await asyncio.sleep(self.poll_interval)
+
+    async def _produce(self, key: str, produce: Callable[[], Awaitable[str]]) -> str:
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+
+        try:
+            body = await produce()
+        except BaseException as e:
+            # Release the claim: the next retry runs the work again
+            await self._store.delete(_redis_key(key))
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                future.exception()  # retrieved: no warning if nobody waited
+            raise
+        finally:
+            self._in_flight.pop(key, None)
+
+        await self._store.set(_redis_key(key), body.encode("utf-8"), ex=self.ttl_seconds)
+        future.set_result(body)
+        return body
+
+
+def webhook_key(call_sid: str, turn: Optional[str], speech: str) -> Optional[str]:
+    """
+    (CallSid, turn sequence, SpeechResult hash).
+    No turn sequence → no key: identical utterances on different turns
+    ("yes", "yes") must not be treated as retries.
+    """
+    if not call_sid or turn is None:
+        return None
+
+    digest = hashlib.sha1(speech.encode("utf-8")).hexdigest()[:16]
+    return f"{call_sid}:{turn}:{digest}"
+
+
+def _redis_key(key: str) -> str:
+    return f"idem:{key}"
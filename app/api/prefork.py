@@ -0,0 +1,125 @@
+# app/api/prefork.py
+"""
+Serving core built once in the gunicorn master (preload mode).
+
+The menu, the TurnEngine (decision table, NLU resolvers) and the
+ResponseBuilder are the bulk of a worker's heap and never change
+after startup. With PREFORK_PRELOAD=1 (see app/api/gunicorn_conf.py)
+the master builds them before forking and moves them to the GC's
+permanent generation (gc.freeze()): workers attach to the master's
+copy, and the cyclic GC of a worker never walks — and so never
+writes to — those pages. Without preload every worker's lifespan
+builds its own.
+
+Responsibilities:
+-----------------
+- Build the serving core (menu store → engine / responder)
+- Preload + freeze it in the master, hand it to the workers
+
+Non-responsibilities:
+---------------------
+- Per-worker state: session backend, caches, runner (lifespan)
+- Measurements (app/perf/prefork_memory.py)
+
+Reference counting still writes to the object headers a worker
+touches, so sharing is best on the parts a turn only reads through
+(menu items, patterns, tables), not on every page.
+"""
+
+from __future__ import annotations
+
+import gc
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from app.core.response_builder import ResponseBuilder
+from app.core.turn_engine import TurnEngine
+from app.core.warmup import WARMUP_ENABLED, load_warmup_calls, warm_engine
+from app.menu.exceptions import MenuLoadError
+from app.menu.repository import MenuRepository
+from app.menu.store import MenuStore
+from app.state_machine.state_router import StateRouter
+
+# Build the serving core in the gunicorn master (preload_app)
+PREFORK_PRELOAD = os.getenv("PREFORK_PRELOAD", "0") == "1"
+
+DATA_ROOT = Path(__file__).resolve().parents[1] / "data" / "restaurants"
+
+
+@dataclass
+class ServingCore:
+    store: MenuStore
+    menu_repo: MenuRepository
+    engine: TurnEngine
+    responder: ResponseBuilder
+    build_seconds: float
+    built_in_pid: int
+
+
+def build_serving_core(restaurant_id: str = "demo") -> ServingCore:
+    started = time.perf_counter()
+    data_root = DATA_ROOT / restaurant_id
+
+    try:
+        store = MenuStore(
+            data_root / "menu.json",
+            data_root / "entity_index.json",
+        )
+    except MenuLoadError as e:
+        raise RuntimeError(f"Failed to load menu: {e}")
+
+    menu_repo = MenuRepository(store)
+
+    return ServingCore(
+        store=store,
+        menu_repo=menu_repo,
+        engine=TurnEngine(StateRouter(), menu_repo),
+        responder=ResponseBuilder(menu_repo),
+        build_seconds=time.perf_counter() - started,
+        built_in_pid=os.getpid(),
+    )
+
+
+# Set in the master by preload(), inherited by forked workers
+_preloaded: Optional[ServingCore] = None
+
+
+def preload(restaurant_id: str = "demo") -> ServingCore:
+    """
+    Builds the serving core and freezes it (master, before fork).
+    """
+    global _preloaded
+
+    # No collection mid-build: a collection would free objects between
+    # the long-lived ones, leaving holes that later allocations in the
+    # workers fill (and so copy) — see gc.freeze()
+    gc.disable()
+    try:
+        _preloaded = build_serving_core(restaurant_id)
+
+        # Caches filled here are shared too (the workers' warm-up
+        # then only confirms them)
+        if WARMUP_ENABLED:
+            warm_engine(_preloaded.engine, _preloaded.responder, load_warmup_calls())
+
+        gc.freeze()
+    finally:
+        gc.enable()
+
+    print(
+        f"[PREFORK] serving core built in {_preloaded.build_seconds * 1000:.1f} ms "
+        f"(pid {_preloaded.built_in_pid}), {gc.get_freeze_count()} objects frozen"
+    )
+    return _preloaded
+
+
+def serving_core(restaurant_id: str = "demo") -> ServingCore:
+    """
+    The preloaded core when the master built one, else a new one.
+    """
+    if _preloaded is not None:
+        return _preloaded
+    return build_serving_core(restaurant_id)
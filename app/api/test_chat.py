@@ -4,29 +4,66 @@ Internal testing chat endpoint.
 Used by the browser-based UI to talk to the same TurnEngine
 that Twilio voice uses.
 
-POST-only by design.
+- POST /test/chat       : one turn per request (load → turn → save)
+- POST /test/chat/batch : scripted conversations, one request
+- WS   /test/ws         : one connection per session; the session
+                          stays resident for the connection and is
+                          saved in the background (app/session/resident.py)
 """
 
-from fastapi import APIRouter, Request
-from pydantic import BaseModel
+import asyncio
+import json
+import os
+import time
 
-from app.session.repository import load_session, save_session
-from app.core.turn_engine import TurnEngine
-from app.core.response_builder import ResponseBuilder
+from fastapi import APIRouter, HTTPException, Request, WebSocket, WebSocketDisconnect
+from pydantic import BaseModel, ValidationError
+
+from app.core.admission import TurnShedError
+from app.core.hypothesis_selector import SpeechHypothesis
+from app.core.turn_runner import AsyncTurnRunner, TurnResult
+from app.session.exceptions import SessionConflictError
+from app.session.resident import ResidentSession
 
 router = APIRouter(prefix="/test", tags=["testing"])
 
+# Conversations of one batch run at a time (their turns still go
+# through admission control: keep this well under MAX_CONCURRENT_TURNS)
+CHAT_BATCH_CONCURRENCY = int(os.getenv("CHAT_BATCH_CONCURRENCY", 8))
+
+# Turns accepted in one batch request
+CHAT_BATCH_MAX_TURNS = int(os.getenv("CHAT_BATCH_MAX_TURNS", 20000))
+
 
 # -------------------------
 # Request / Response models
 # -------------------------
 
-class ChatRequest(BaseModel):
+class ChatHypothesis(BaseModel):
     """
-    Payload sent from the browser UI.
+    Alternative transcript for the same utterance (STT N-best).
+    """
+    text: str
+    confidence: float = 1.0
+
+
+class ChatMessage(BaseModel):
+    """
+    One utterance (a WebSocket message; the session is the connection's).
+
+    Text-only harnesses may add STT-style alternatives;
+    the best-resolving one is picked deterministically.
     """
-    session_id: str
     text: str
+    confidence: float = 1.0
+    alternatives: list[ChatHypothesis] = []
+
+
+class ChatRequest(ChatMessage):
+    """
+    Payload sent from the browser UI (POST).
+    """
+    session_id: str
 
 
 class ChatResponse(BaseModel):
@@ -38,44 +75,234 @@ class ChatResponse(BaseModel):
     last_intent: str | None
 
 
+class ChatConversation(BaseModel):
+    """
+    A scripted conversation: utterances run in order on one session.
+    """
+    session_id: str
+    utterances: list[str | ChatMessage]
+
+
+class ChatBatchRequest(BaseModel):
+    conversations: list[ChatConversation]
+
+
+class ChatTurnResult(ChatResponse):
+    """
+    One turn of a batch; timings_ms are the runner's stages.
+    """
+    timings_ms: dict[str, float]
+
+
+class ChatConversationResult(BaseModel):
+    session_id: str
+    turns: list[ChatTurnResult]
+    # Set when the conversation failed (opening the session, a turn, or
+    # saving it); `turns` holds the turns that completed before
+    error: str | None = None
+    ms: float
+
+
+class ChatBatchResponse(BaseModel):
+    conversations: list[ChatConversationResult]
+    turns: int
+    ms: float
+
+
 # -------------------------
 # Test chat endpoint
 # -------------------------
 
 @router.post("/chat", response_model=ChatResponse)
-def test_chat(req: ChatRequest, request: Request):
+async def test_chat(req: ChatRequest, request: Request):
     """
     Handles a single chat turn from the browser UI.
 
-    - Uses the same TurnEngine as Twilio
+    - Uses the same TurnEngine (and runner) as Twilio
     - Session is keyed by session_id
     """
 
-    # Pull shared engine + responder from app state
-    engine: TurnEngine = request.app.state.engine
-    responder: ResponseBuilder = request.app.state.responder
+    # Pull shared runner from app state
+    runner: AsyncTurnRunner = request.app.state.runner
 
-    # Load (or create) session
-    session = load_session(req.session_id, restaurant_id="demo")
+    # Load → run core FSM pipeline → persist → render (off the loop)
+    try:
+        turn = await runner.run_turn(
+            session_id=req.session_id,
+            restaurant_id="demo",
+            hypotheses=_hypotheses(req),
+        )
+    except SessionConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except TurnShedError as e:
+        raise HTTPException(status_code=503, detail=str(e))
 
-    # Run core FSM pipeline
-    turn_output = engine.process_turn(
-        session=session,
-        user_text=req.text,
-    )
+    return _chat_response(turn)
+
+
+@router.post("/chat/batch", response_model=ChatBatchResponse)
+async def test_chat_batch(req: ChatBatchRequest, request: Request):
+    """
+    Runs scripted conversations in one request.
+
+    - Each conversation's turns run in order, on a session loaded once
+      and saved when the conversation ends (app/session/resident.py)
+    - Independent conversations run concurrently (CHAT_BATCH_CONCURRENCY)
+    - A failure (loading / saving the session, a shed or failing
+      turn) ends its conversation, not the batch: the conversation
+      reports it with the turns that completed
+    """
+    total = sum(len(c.utterances) for c in req.conversations)
+    if total > CHAT_BATCH_MAX_TURNS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"{total} turns in batch (max {CHAT_BATCH_MAX_TURNS})",
+        )
+
+    session_ids = [c.session_id for c in req.conversations]
+    if len(set(session_ids)) != len(session_ids):
+        raise HTTPException(status_code=422, detail="Duplicate session_id in batch")
 
-    # Persist session
-    save_session(session)
+    state = request.app.state
+    runner: AsyncTurnRunner = state.runner
+    limit = asyncio.Semaphore(CHAT_BATCH_CONCURRENCY)
 
-    # Build user-facing text
-    response_text = responder.build(
-        response_key=turn_output.response_key,
-        context=session.conversation_context,
-        payload=turn_output.response_payload,
+    async def converse(conversation: ChatConversation) -> ChatConversationResult:
+        async with limit:
+            started = time.perf_counter()
+            resident = _resident_session(state, conversation.session_id)
+            turns, error = [], None
+
+            try:
+                await resident.open()
+
+                for utterance in conversation.utterances:
+                    if isinstance(utterance, str):
+                        utterance = ChatMessage(text=utterance)
+
+                    async with resident.turn() as session:
+                        turn = await runner.run_loaded_turn(session, _hypotheses(utterance))
+
+                    turns.append(ChatTurnResult(
+                        **_chat_response(turn).model_dump(),
+                        timings_ms=turn.timings_ms,
+                    ))
+            except Exception as e:
+                error = _describe(e)
+            finally:
+                try:
+                    await resident.close()
+                except Exception as e:
+                    error = error or _describe(e)
+
+            if error is None and not resident.saved:
+                error = "Session not saved (superseded or save failed)"
+
+            return ChatConversationResult(
+                session_id=conversation.session_id,
+                turns=turns,
+                error=error,
+                ms=round((time.perf_counter() - started) * 1000, 3),
+            )
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(converse(c) for c in req.conversations))
+
+    return ChatBatchResponse(
+        conversations=results,
+        turns=sum(len(r.turns) for r in results),
+        ms=round((time.perf_counter() - started) * 1000, 3),
     )
 
+
+# -------------------------
+# WebSocket endpoint
+# -------------------------
+
+@router.websocket("/ws")
+async def test_chat_ws(websocket: WebSocket, session_id: str):
+    """
+    Turns over one connection: /test/ws?session_id=...
+
+    - Each text message is a ChatMessage, answered in order with a
+      ChatResponse (or {"status", "detail"} on error; the connection
+      stays open)
+    - The session is loaded once and kept for the connection; turns
+      are saved in the background, and on disconnect
+    """
+    await websocket.accept()
+
+    runner: AsyncTurnRunner = websocket.app.state.runner
+    resident = _resident_session(websocket.app.state, session_id)
+
+    try:
+        await resident.open()
+
+        while True:
+            raw = await websocket.receive_text()
+
+            try:
+                msg = ChatMessage.model_validate_json(raw)
+            except ValidationError as e:
+                await websocket.send_text(_error(422, str(e)))
+                continue
+
+            try:
+                async with resident.turn() as session:
+                    turn = await runner.run_loaded_turn(session, _hypotheses(msg))
+            except TurnShedError as e:
+                await websocket.send_text(_error(503, str(e)))
+                continue
+
+            await websocket.send_text(_chat_response(turn).model_dump_json())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await resident.close()
+
+
+# -------------------------
+# Helpers
+# -------------------------
+
+def _resident_session(state, session_id: str) -> ResidentSession:
+    """
+    Resident sessions go straight to the session backend: they already
+    coalesce their own saves (RESIDENT_SAVE_SECONDS), a write-behind
+    layer underneath would only delay them further. A write still
+    pending in the cache is flushed before loading.
+    """
+    sessions = state.sessions
+    backend = getattr(sessions, "backend", sessions)
+    flush = getattr(sessions, "flush", None)
+
+    async def load(session_id: str, restaurant_id: str):
+        if flush is not None:
+            await flush(session_id)
+        return await backend.load(session_id, restaurant_id)
+
+    return ResidentSession(session_id, "demo", load=load, save=backend.save)
+
+
+def _hypotheses(msg: ChatMessage) -> list[SpeechHypothesis]:
+    return [SpeechHypothesis(msg.text, msg.confidence)] + [
+        SpeechHypothesis(alt.text, alt.confidence)
+        for alt in msg.alternatives
+    ]
+
+
+def _chat_response(turn: TurnResult) -> ChatResponse:
+    session = turn.session
     return ChatResponse(
-        response=response_text,
+        response=turn.response_text,
         state=session.conversation_state.name,
         last_intent=session.last_intent.name if session.last_intent else None,
     )
+
+
+def _error(status: int, detail: str) -> str:
+    return json.dumps({"status": status, "detail": detail})
+
+
+def _describe(e: Exception) -> str:
+    return str(e) or type(e).__name__
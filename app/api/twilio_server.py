@@ -1,23 +1,46 @@
 # app/api/twilio_server.py
+import json
+import time
 from contextlib import asynccontextmanager
-from pathlib import Path
+from dataclasses import asdict
 
 from fastapi import FastAPI, Request, Form
-from fastapi.responses import Response
+from fastapi.responses import FileResponse, JSONResponse, Response
 
-from twilio.twiml.voice_response import VoiceResponse, Gather
-
-#  IMPORT ROUTERS
-from app.api.ui.ui import router as ui_router
-from app.api.test_chat import router as test_chat_router
+from app.api.idempotency import LocalKeyValueStore, WebhookIdempotencyCache, webhook_key
+from app.api.prefork import serving_core
+from app.api.twiml_templates import TwimlTemplates
 
+from app.core.admission import TurnShedError
+from app.core.hypothesis_selector import SpeechHypothesis
+from app.core.metrics import PROMETHEUS_CONTENT_TYPE, REGISTRY
+from app.core.metrics_multiprocess import METRICS_DIR, MultiprocessMetrics
+from app.core.speculation import SpeculativeNLUCache
 from app.core.turn_engine import TurnEngine
-from app.core.response_builder import ResponseBuilder
-from app.menu.repository import MenuRepository
-from app.menu.store import MenuStore
-from app.menu.exceptions import MenuLoadError
-from app.state_machine.state_router import StateRouter
-from app.session.repository import load_session, save_session
+from app.core.turn_log import TURN_LOG_ENABLED, TurnEventLog
+from app.core.turn_runner import AsyncTurnRunner
+from app.core.warmup import WARMUP_ENABLED, WarmupReport, load_warmup_calls, warm_engine, warm_store
+from app.session.cache import (
+    SESSION_AFFINITY_COOKIE,
+    SESSION_CACHE_ENABLED,
+    WriteBehindSessionCache,
+    current_worker_id,
+    format_affinity,
+)
+from app.session.codec import build_session_codec
+from app.session.exceptions import SessionConflictError
+from app.session.repository import build_session_backend
+from app.tts.prompt_cache import TTS_CACHE_ENABLED, PromptAudioCache, build_synthesis_engine
+
+
+# Fixed prompts: audio is synthesized at startup when the
+# prompt audio cache is enabled
+GREETING = "Thank you for calling Compass. What would you like to order?"
+NO_SPEECH_REPROMPT = "Sorry, I didn’t catch that. Could you repeat?"
+CONFLICT_REPROMPT = "Sorry, could you say that again?"
+HOLD_PROMPT = "One moment please."
+
+FIXED_PROMPTS = (GREETING, NO_SPEECH_REPROMPT, CONFLICT_REPROMPT, HOLD_PROMPT)
 
 
 # ----------------------------------------------------------
@@ -28,37 +51,106 @@ from app.session.repository import load_session, save_session
 async def lifespan(app: FastAPI):
     # ---------- INIT ----------
     restaurant_id = "demo"
-
-    project_root = Path(__file__).resolve().parents[2]
-    data_root = project_root / "app" / "data" / "restaurants" / restaurant_id
-
-    try:
-        store = MenuStore(
-            data_root / "menu.json",
-            data_root / "entity_index.json",
-        )
-    except MenuLoadError as e:
-        raise RuntimeError(f"Failed to load menu: {e}")
-
-    menu_repo = MenuRepository(store)
-    router = StateRouter()
-
-    engine = TurnEngine(router, menu_repo)
-    responder = ResponseBuilder(menu_repo)
+    app.state.ready = False
+
+    # Worker identity (affinity hints, turn log segments): taken here,
+    # after the fork — not at import, which may be the master's
+    worker_id = current_worker_id()
+    app.state.worker_id = worker_id
+
+    # /metrics covers every gunicorn worker (METRICS_DIR)
+    shared_metrics = None
+    if METRICS_DIR:
+        shared_metrics = MultiprocessMetrics(METRICS_DIR)
+        await shared_metrics.start()
+    app.state.shared_metrics = shared_metrics
+
+    # Menu / engine / responder: built by the gunicorn master when
+    # preloading (PREFORK_PRELOAD), else here, per worker
+    core = serving_core(restaurant_id)
+    store = core.store
+    engine = core.engine
+    responder = core.responder
 
     # Attach to app state
     app.state.engine = engine
     app.state.responder = responder
+    app.state.speculation = SpeculativeNLUCache()
+    app.state.twiml = TwimlTemplates()
+
+    # Prompt audio played with <Play> instead of Twilio's <Say>
+    prompt_audio = None
+    if TTS_CACHE_ENABLED:
+        prompt_audio = PromptAudioCache(build_synthesis_engine())
+        await prompt_audio.start(warm=FIXED_PROMPTS)
+    app.state.prompt_audio = prompt_audio
+
+    # Session backend (SESSION_BACKEND) lives with the app, not with
+    # the module import — e.g. the Redis pool. Harnesses may provide
+    # their own (app.state.session_backend, see app/perf/asgi_load.py).
+    backend = getattr(app.state, "session_backend", None)
+    if backend is None:
+        backend = build_session_backend(codec=build_session_codec(store))
+    sessions = backend
+
+    # Consecutive turns of a call are served from memory (write-behind)
+    if SESSION_CACHE_ENABLED and backend.supports_delta_writes:
+        sessions = WriteBehindSessionCache(backend, worker_id=worker_id)
+        await sessions.start()
+
+    app.state.sessions = sessions
+
+    # Replays responses to retried webhooks (shares the Redis pool;
+    # in process for the memory / SQLite backends)
+    idempotency_store = getattr(backend, "redis", None)
+    if idempotency_store is None:
+        idempotency_store = LocalKeyValueStore()
+    app.state.idempotency = WebhookIdempotencyCache(idempotency_store)
+
+    # Structured per-turn record, written off the request path
+    events = None
+    if TURN_LOG_ENABLED:
+        events = TurnEventLog(worker_id=worker_id)
+        await events.start()
+
+    app.state.runner = AsyncTurnRunner(
+        engine,
+        responder,
+        load=sessions.load,
+        save=sessions.save,
+        events=events,
+    )
 
     # ✅ REGISTER ROUTERS
+    # Imported here: test / UI routes stay off the import path
+    # (cold start, see app/perf/import_budget.py)
+    from app.api.test_chat import router as test_chat_router
+    from app.api.ui.ui import router as ui_router
+
     app.include_router(test_chat_router)  # /test/chat
     app.include_router(ui_router)         # /ui
 
+    # Warm-up: the first call finds caches and connections ready
+    app.state.warmup = None
+    if WARMUP_ENABLED:
+        app.state.warmup = await warm_up(engine, responder, backend)
+        print(f"[WARMUP] {app.state.warmup.summary()}")
+
+    app.state.ready = True
     print("Twilio server initialized with Compass Voice v2 pipeline")
 
     yield
 
     # ---------- SHUTDOWN ----------
+    app.state.ready = False
+    app.state.runner.shutdown()
+    if events is not None:
+        await events.close()
+    if prompt_audio is not None:
+        await prompt_audio.close()
+    await sessions.close()
+    if shared_metrics is not None:
+        await shared_metrics.close()
     print("Shutting down Compass Voice v2")
 
 
@@ -73,18 +165,61 @@ app = FastAPI(lifespan=lifespan)
 # Helper
 # ----------------------------------------------------------
 
-def gather(action_url: str, say: str | None = None) -> Gather:
-    g = Gather(
-        input="speech",
-        action=action_url,
-        method="POST",
-        timeout=15,
-        speechTimeout="auto",
-        bargeIn=True,
+async def warm_up(engine, responder, backend) -> WarmupReport:
+    """
+    Synthetic calls through the engine / responder / codec, then the
+    session store's connections. Failures are counted, not raised.
+    """
+    started = time.perf_counter()
+    report = warm_engine(
+        engine,
+        responder,
+        load_warmup_calls(),
+        codec=getattr(backend, "codec", None),
     )
-    if say:
-        g.say(say)
-    return g
+
+    try:
+        report.store_connections = await warm_store(backend)
+    except Exception as e:
+        report.errors += 1
+        print(f"[WARMUP] session store: {type(e).__name__}: {e}")
+
+    report.seconds = time.perf_counter() - started
+    return report
+
+
+def twiml_for(request: Request):
+    """
+    Precompiled TwiML documents for this request's base URL.
+    """
+    return request.app.state.twiml.for_request(request)
+
+
+def audio_for(request: Request, text: str):
+    """
+    Prompt audio cache key for `text`, or None (spoken with <Say>).
+    """
+    cache = request.app.state.prompt_audio
+    if cache is None:
+        return None
+    return cache.lookup(text)
+
+
+def twiml(request: Request, body: str, session=None) -> Response:
+    """
+    TwiML response; with a session, also sets the affinity hint cookie
+    (Twilio sends it back on every webhook of the call).
+    """
+    response = Response(body, media_type="application/xml")
+
+    if session is not None and SESSION_AFFINITY_COOKIE:
+        response.set_cookie(
+            SESSION_AFFINITY_COOKIE,
+            format_affinity(session.version, request.app.state.worker_id),
+            httponly=True,
+        )
+
+    return response
 
 
 # ==========================================================
@@ -97,7 +232,12 @@ async def voice(request: Request):
     call_sid = form.get("CallSid")
     restaurant_id = "demo"
 
-    session = load_session(call_sid, restaurant_id)
+    runner: AsyncTurnRunner = request.app.state.runner
+    session = await runner.load_session(
+        call_sid,
+        restaurant_id,
+        request.cookies.get(SESSION_AFFINITY_COOKIE),
+    )
 
     # 🔒 HARD GUARD
     if session.turn_count > 0:
@@ -105,15 +245,17 @@ async def voice(request: Request):
 
     print(f"[CALL START] SID={call_sid}")
 
-    vr = VoiceResponse()
-    vr.append(
-        gather(
-            action_url=str(request.url_for("process_speech")),
-            say="Thank you for calling Compass. What would you like to order?",
-        )
+    request.app.state.speculation.remember_state(
+        call_sid, session.conversation_state
+    )
+
+    body = twiml_for(request).gather_with_say(
+        GREETING,
+        session.turn_count,
+        audio_for(request, GREETING),
     )
 
-    return Response(str(vr), media_type="application/xml")
+    return twiml(request, body, session)
 
 
 # ==========================================================
@@ -124,49 +266,268 @@ async def voice(request: Request):
 async def process_speech(
     request: Request,
     SpeechResult: str = Form(default=""),
+    Confidence: float | None = Form(default=None),
 ):
-    engine: TurnEngine = request.app.state.engine
-    responder: ResponseBuilder = request.app.state.responder
+    idempotency: WebhookIdempotencyCache = request.app.state.idempotency
 
     form = await request.form()
     call_sid = form.get("CallSid")
-    restaurant_id = "demo"
 
     user_text = SpeechResult or ""
+    turn_seq = request.query_params.get("turn")
 
-    print(f"[TWILIO SPEECH] SID={call_sid} TEXT={user_text}")
+    if not user_text.strip():
+        return twiml(request, twiml_for(request).say_then_gather(
+            NO_SPEECH_REPROMPT,
+            turn_seq,
+            audio_for(request, NO_SPEECH_REPROMPT),
+        ))
 
-    session = load_session(call_sid, restaurant_id)
+    key = webhook_key(call_sid, turn_seq, user_text)
 
-    vr = VoiceResponse()
+    # Twilio retries slow webhooks: run the turn once per key and
+    # replay the rendered TwiML (and its affinity cookie) for
+    # duplicates (no NLU, no cart change). Only completed turns are
+    # stored: a shed or conflicting turn raises out of produce(), its
+    # claim is released and the caller's next try runs the turn.
+    produced = {}
 
-    if not user_text.strip():
-        vr.say("Sorry, I didn’t catch that. Could you repeat?")
-        vr.append(gather(str(request.url_for("process_speech"))))
-        return Response(str(vr), media_type="application/xml")
-
-    # -------------------------
-    # CORE V2 PIPELINE
-    # -------------------------
-    turn_output = engine.process_turn(
-        session=session,
-        user_text=user_text,
+    async def produce() -> str:
+        produced["response"] = await speech_turn(request, call_sid, user_text, Confidence)
+        return cacheable_response(produced["response"])
+
+    try:
+        if key is None:
+            return await speech_turn(request, call_sid, user_text, Confidence)
+        body = await idempotency.run(key, produce)
+    except TurnShedError as e:
+        # Overloaded: nothing ran (and nothing is replayed for this
+        # key), the caller holds and speaks again on the same turn
+        print(f"[TWILIO SPEECH] SID={call_sid} {e}")
+        return twiml(request, twiml_for(request).say_then_gather(
+            HOLD_PROMPT,
+            turn_seq,
+            audio_for(request, HOLD_PROMPT),
+        ))
+    except SessionConflictError:
+        # Lost the race to an overlapping webhook of this call:
+        # nothing was saved, ask again on top of the winner's state
+        return twiml(request, twiml_for(request).say_then_gather(
+            CONFLICT_REPROMPT,
+            turn_seq,
+            audio_for(request, CONFLICT_REPROMPT),
+        ))
+
+    if "response" in produced:
+        return produced["response"]
+
+    if body is None:
+        # The original is still running elsewhere: keep the caller waiting
+        return twiml(request, twiml_for(request).say_then_gather(
+            HOLD_PROMPT,
+            turn_seq,
+            audio_for(request, HOLD_PROMPT),
+        ))
+
+    print(f"[TWILIO SPEECH] SID={call_sid} duplicate webhook → replayed")
+    return replayed_response(body)
+
+
+def cacheable_response(response: Response) -> str:
+    """
+    A rendered webhook response as the idempotency cache stores it:
+    the TwiML and its Set-Cookie headers (the affinity hint).
+    """
+    return json.dumps({
+        "body": response.body.decode("utf-8"),
+        "cookies": response.headers.getlist("set-cookie"),
+    })
+
+
+def replayed_response(cached: str) -> Response:
+    try:
+        stored = json.loads(cached)
+    except ValueError:
+        # Stored before cookies were kept: TwiML only
+        stored = {"body": cached, "cookies": []}
+
+    response = Response(stored["body"], media_type="application/xml")
+    for cookie in stored["cookies"]:
+        response.raw_headers.append((b"set-cookie", cookie.encode("latin-1")))
+    return response
+
+
+async def speech_turn(
+    request: Request,
+    call_sid: str,
+    user_text: str,
+    confidence: float | None,
+) -> Response:
+    """
+    One caller utterance through the CORE V2 PIPELINE, rendered as TwiML.
+    Raises TurnShedError / SessionConflictError when the turn did not
+    complete (see process_speech).
+    """
+    engine: TurnEngine = request.app.state.engine
+    runner: AsyncTurnRunner = request.app.state.runner
+    speculation: SpeculativeNLUCache = request.app.state.speculation
+
+    restaurant_id = "demo"
+    template = twiml_for(request)
+
+    speculative = speculation.take(call_sid)
+
+    hypotheses = [
+        SpeechHypothesis(
+            text=user_text,
+            confidence=confidence if confidence is not None else 1.0,
+        )
+    ]
+
+    # Same cleaned text → the engine reuses the analysis as is.
+    # Otherwise (the final extends or revises the last partial) the
+    # partial is a second, weaker hypothesis, scored from its
+    # speculative analysis: it only wins when it resolves and the final
+    # text does not (partials never score on a known intent alone).
+    if (
+        speculative
+        and speculative.cleaned_text
+        and speculative.cleaned_text != engine.clean_text(user_text)
+    ):
+        hypotheses.append(
+            SpeechHypothesis(text=speculative.cleaned_text, confidence=0.0, partial=True)
+        )
+
+    # Session I/O, NLU and rendering all run off the event loop
+    turn = await runner.run_turn(
+        session_id=call_sid,
+        restaurant_id=restaurant_id,
+        hypotheses=hypotheses,
+        analysis=speculative,
+        affinity=request.cookies.get(SESSION_AFFINITY_COOKIE),
+    )
+
+    speculation.remember_state(call_sid, turn.session.conversation_state)
+
+    # Caller text / bot reply / trace are in the turn event log
+    body = template.say_then_gather(
+        turn.response_text,
+        turn.session.turn_count,
+        audio_for(request, turn.response_text),
     )
 
-    save_session(session)
+    return twiml(request, body, turn.session)
+
+
+# ==========================================================
+# PARTIAL SPEECH — /partial_speech (speculative NLU)
+# ==========================================================
+
+@app.post("/partial_speech")
+async def partial_speech(
+    request: Request,
+    CallSid: str = Form(default=""),
+    UnstableSpeechResult: str = Form(default=""),
+    StableSpeechResult: str = Form(default=""),
+):
+    """
+    Twilio partialResultCallback.
+
+    Runs intent + menu resolution on the partial transcript while the
+    caller is still speaking, and caches the result per CallSid.
+    /process_speech reuses it when the final text cleans to the same text,
+    and as a second hypothesis when the final extends (or revises) it.
+
+    Speculative CPU work runs on the turn executor, never on the loop.
+    """
+    engine: TurnEngine = request.app.state.engine
+    runner: AsyncTurnRunner = request.app.state.runner
+    speculation: SpeculativeNLUCache = request.app.state.speculation
+
+    partial_text = UnstableSpeechResult or StableSpeechResult
+    if not CallSid or not partial_text.strip():
+        return Response(status_code=204)
+
+    # Same text as the last partial, or a late partial it extends
+    # → nothing new to compute
+    if speculation.covers(CallSid, engine.clean_text(partial_text)):
+        return Response(status_code=204)
+
+    state = speculation.known_state(CallSid)
+    if state is None:
+        # Call started on another worker
+        session = await runner.load_session(
+            CallSid,
+            "demo",
+            request.cookies.get(SESSION_AFFINITY_COOKIE),
+        )
+        state = session.conversation_state
+        speculation.remember_state(CallSid, state)
+
+    analysis = await runner.call(engine.speculate, partial_text, state)
+    speculation.store(CallSid, analysis)
 
-    response_text = responder.build(
-        response_key=turn_output.response_key,
-        context=session.conversation_context,
-        payload=turn_output.response_payload,
+    return Response(status_code=204)
+
+
+# ==========================================================
+# PROMPT AUDIO — /audio/{key} (TTS cache, played by <Play>)
+# ==========================================================
+
+@app.get("/audio/{key}")
+async def prompt_audio(request: Request, key: str):
+    cache: PromptAudioCache | None = request.app.state.prompt_audio
+
+    path = cache.audio_path(key) if cache is not None else None
+    if path is None:
+        return Response(status_code=404)
+
+    # Content-addressed: the audio behind a key never changes
+    return FileResponse(
+        path,
+        media_type=cache.engine.content_type,
+        headers={"Cache-Control": "public, max-age=86400, immutable"},
     )
 
-    print(f"[BOT → CALLER] {response_text}")
 
-    vr.say(response_text)
-    vr.append(gather(str(request.url_for("process_speech"))))
+# ==========================================================
+# READINESS — /healthz/ready
+# ==========================================================
+
+@app.get("/healthz/ready")
+async def healthz_ready(request: Request):
+    """
+    200 once warm-up is done and the session store answers; 503
+    while starting / shutting down or when the store is unreachable.
+    """
+    state = request.app.state
+    if not getattr(state, "ready", False):
+        return JSONResponse({"status": "starting"}, status_code=503)
+
+    try:
+        store_ok = await state.sessions.ping()
+    except Exception:
+        store_ok = False
+    if not store_ok:
+        return JSONResponse({"status": "session_store_unavailable"}, status_code=503)
+
+    warmup = state.warmup
+    return {
+        "status": "ready",
+        "warmup": asdict(warmup) if warmup is not None else None,
+    }
+
+
+# ==========================================================
+# METRICS — /metrics (Prometheus text format)
+# ==========================================================
 
-    return Response(str(vr), media_type="application/xml")
+@app.get("/metrics")
+async def metrics(request: Request):
+    shared_metrics = request.app.state.shared_metrics
+    if shared_metrics is None:
+        return Response(REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+    return Response(shared_metrics.render(), media_type=PROMETHEUS_CONTENT_TYPE)
 
 
 # ==========================================================
@@ -0,0 +1,197 @@
+# app/api/twiml_templates.py
+"""
+Precompiled TwiML for the Twilio endpoints.
+
+Every webhook answers with one of two fixed documents:
+
+    <Response><Say>…</Say><Gather …/></Response>          (turn / reprompt)
+    <Response><Gather …><Say>…</Say></Gather></Response>  (call greeting)
+
+with <Play>{base}/audio/{key}</Play> in place of <Say> when the prompt
+audio cache has the text (app/tts/prompt_cache.py).
+
+The Gather attributes are constant except for the action URL, so the
+documents are kept as string templates and only the spoken text and
+the action URL are escaped and injected per request. Output is
+byte-identical to the twilio helper library (VoiceResponse / Gather,
+serialized by ElementTree: attributes sorted, `<Say />` when empty);
+see app/perf/twiml_bench.py.
+
+The absolute /process_speech and /partial_speech URLs are resolved
+once per base URL (scheme, host, root path) instead of per request.
+"""
+
+from threading import Lock
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlencode
+
+from starlette.requests import Request
+
+XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8"?>'
+
+# Gather verb settings shared by every prompt
+GATHER_TIMEOUT = 15
+GATHER_SPEECH_TIMEOUT = "auto"
+
+# Cached prompt audio, relative to the base URL (GET /audio/{key})
+AUDIO_PATH = "audio/"
+
+# Distinct base URLs remembered (one per Host the server is reached by)
+MAX_BASE_URLS = 64
+
+
+# =================================================
+# Escaping (same rules as xml.etree.ElementTree)
+# =================================================
+
+def escape_text(text: str) -> str:
+    if "&" in text:
+        text = text.replace("&", "&amp;")
+    if "<" in text:
+        text = text.replace("<", "&lt;")
+    if ">" in text:
+        text = text.replace(">", "&gt;")
+    return text
+
+
+def escape_attr(text: str) -> str:
+    text = escape_text(text)
+    if "\"" in text:
+        text = text.replace("\"", "&quot;")
+    if "\r" in text:
+        text = text.replace("\r", "&#13;")
+    if "\n" in text:
+        text = text.replace("\n", "&#10;")
+    if "\t" in text:
+        text = text.replace("\t", "&#09;")
+    return text
+
+
+def _say(text: Optional[str]) -> str:
+    if not text:
+        return "<Say />"
+    return f"<Say>{escape_text(text)}</Say>"
+
+
+def _play(url: str) -> str:
+    return f"<Play>{escape_text(url)}</Play>"
+
+
+# =================================================
+# Templates
+# =================================================
+
+class GatherTemplate:
+    """
+    TwiML documents for one base URL.
+
+    Holds the escaped Gather attributes around the action URL, and the
+    unescaped /process_speech URL the per-turn action is built from.
+
+    `audio` is a prompt audio cache key: when given, the text is played
+    from /audio/{key} instead of spoken with <Say>.
+    """
+
+    def __init__(self, action_base: str, partial_url: str, base_url: str = ""):
+        self.action_base = action_base
+        self.partial_url = partial_url
+        self.audio_base = f"{base_url}{AUDIO_PATH}"
+
+        # Attributes in sorted order, as the helper library writes them
+        self._open = '<Gather action="'
+        self._close = (
+            '" bargeIn="true" input="speech" method="POST"'
+            f' partialResultCallback="{escape_attr(partial_url)}"'
+            ' partialResultCallbackMethod="POST"'
+            f' speechTimeout="{GATHER_SPEECH_TIMEOUT}" timeout="{GATHER_TIMEOUT}"'
+        )
+
+    def action_url(self, turn_seq) -> str:
+        """
+        /process_speech URL carrying the turn sequence the caller is
+        answering (part of the webhook idempotency key).
+        """
+        if turn_seq is None:
+            return self.action_base
+        return f"{self.action_base}?{urlencode([('turn', str(turn_seq))])}"
+
+    def audio_url(self, key: str) -> str:
+        return f"{self.audio_base}{key}"
+
+    def say_then_gather(self, say: Optional[str], turn_seq, audio: Optional[str] = None) -> str:
+        """
+        <Say> (or <Play>) then an empty <Gather> (turn responses and reprompts).
+        """
+        speech = _play(self.audio_url(audio)) if audio else _say(say)
+        return (
+            f"{XML_DECLARATION}<Response>{speech}"
+            f"{self._open}{escape_attr(self.action_url(turn_seq))}{self._close} /></Response>"
+        )
+
+    def gather_with_say(self, say: Optional[str], turn_seq, audio: Optional[str] = None) -> str:
+        """
+        <Gather> with the <Say> (or <Play>) nested (barge-in on the greeting).
+        """
+        head = f"{XML_DECLARATION}<Response>{self._open}{escape_attr(self.action_url(turn_seq))}{self._close}"
+        if audio:
+            return f"{head}>{_play(self.audio_url(audio))}</Gather></Response>"
+        if not say:
+            return f"{head} /></Response>"
+        return f"{head}>{_say(say)}</Gather></Response>"
+
+
+class TwimlTemplates:
+    """
+    GatherTemplate per base URL of incoming requests.
+
+    Responsibilities:
+    - Resolve url_for("process_speech" / "partial_speech") once per base URL
+    - Render the fixed TwiML documents
+
+    Non-responsibilities:
+    - Choosing what to say
+    - Cookies / response objects
+    """
+
+    def __init__(self, max_base_urls: int = MAX_BASE_URLS):
+        self.max_base_urls = max_base_urls
+        self._templates: Dict[Tuple, GatherTemplate] = {}
+        self._lock = Lock()
+
+    def for_request(self, request: Request) -> GatherTemplate:
+        key = _base_url_key(request.scope)
+
+        template = self._templates.get(key)
+        if template is not None:
+            return template
+
+        template = GatherTemplate(
+            action_base=str(request.url_for("process_speech")),
+            partial_url=str(request.url_for("partial_speech")),
+            base_url=str(request.base_url),
+        )
+
+        with self._lock:
+            if len(self._templates) >= self.max_base_urls:
+                self._templates.clear()
+            self._templates[key] = template
+
+        return template
+
+
+def _base_url_key(scope: dict) -> Tuple:
+    """
+    Everything Request.base_url is derived from.
+    """
+    host = None
+    for name, value in scope.get("headers", ()):
+        if name == b"host":
+            host = value
+            break
+
+    return (
+        scope.get("scheme"),
+        host,
+        tuple(scope.get("server") or ()),
+        scope.get("app_root_path", scope.get("root_path", "")),
+    )
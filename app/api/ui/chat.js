@@ -18,14 +18,41 @@ function addMessage(text, sender) {
   chatWindow.scrollTo({ top: chatWindow.scrollHeight, behavior: "smooth" });
 }
 
+function showReply(data) {
+  addMessage(data.response ?? `⚠️ ${data.detail}`, "bot");
+}
 
-async function sendMessage() {
-  const text = input.value.trim();
-  if (!text) return;
+// ---- Connection ----
+// One WebSocket per chat (/test/ws): the session stays on the server
+// for the connection. Replies come back in order. Falls back to
+// POST /test/chat while the socket is not open.
 
-  addMessage(text, "user");
-  input.value = "";
+let socket = null;
+
+function connect() {
+  const scheme = location.protocol === "https:" ? "wss" : "ws";
+  const ws = new WebSocket(
+    `${scheme}://${location.host}/test/ws?session_id=${encodeURIComponent(sessionId)}`
+  );
+
+  ws.onmessage = e => showReply(JSON.parse(e.data));
+  ws.onclose = () => {
+    if (socket === ws) socket = null;
+  };
+
+  socket = ws;
+}
+
+// Settles once the socket is no longer connecting
+function settled(ws) {
+  return new Promise(resolve => {
+    if (ws.readyState !== WebSocket.CONNECTING) return resolve();
+    ws.addEventListener("open", resolve, { once: true });
+    ws.addEventListener("close", resolve, { once: true });
+  });
+}
 
+async function postMessage(text) {
   const response = await fetch("/test/chat", {
     method: "POST",
     headers: { "Content-Type": "application/json" },
@@ -35,18 +62,40 @@ async function sendMessage() {
     })
   });
 
-  const data = await response.json();
-  addMessage(data.response, "bot");
+  showReply(await response.json());
+}
+
+async function sendMessage() {
+  const text = input.value.trim();
+  if (!text) return;
+
+  addMessage(text, "user");
+  input.value = "";
+
+  if (socket) await settled(socket);
+
+  if (socket && socket.readyState === WebSocket.OPEN) {
+    socket.send(JSON.stringify({ text: text }));
+  } else {
+    await postMessage(text);
+    if (!socket) connect();
+  }
 }
 
 // ---- New Chat ----
 newChatBtn.onclick = () => {
+  if (socket) socket.close();
+  socket = null;
+
   sessionId = newSessionId();
   chatWindow.innerHTML = "";
   addMessage("🆕 New chat started.", "bot");
+  connect();
 };
 
 sendBtn.onclick = sendMessage;
 input.addEventListener("keydown", e => {
   if (e.key === "Enter") sendMessage();
 });
+
+connect();
@@ -1,9 +1,25 @@
 # app/cart/cart.py
 
+from dataclasses import dataclass
 from typing import List, Optional
 from app.cart.cart_item import CartItem
 
 
+@dataclass
+class CartChanges:
+    """
+    Cart delta since the last persist.
+    CartItems are immutable, so membership is the only thing that changes.
+    """
+    added: List[CartItem]
+    removed: List[str]          # cart_item_ids
+    order: List[str]            # cart_item_ids, current order
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added or self.removed)
+
+
 class Cart:
     """
     Aggregate root for the shopping cart.
@@ -13,6 +29,10 @@ class Cart:
     def __init__(self) -> None:
         self._items: List[CartItem] = []
 
+        # Change tracking (None → untracked, everything is new)
+        self._persisted_ids: Optional[List[str]] = None
+        self._dirty = False
+
     # ---------------------------
     # Read operations
     # ---------------------------
@@ -35,16 +55,51 @@ class Cart:
 
     def add_item(self, item: CartItem) -> None:
         self._items.append(item)
+        self._dirty = True
 
     def remove_item(self, cart_item_id: str) -> bool:
         for i, item in enumerate(self._items):
             if item.cart_item_id == cart_item_id:
                 del self._items[i]
+                self._dirty = True
                 return True
         return False
 
     def clear(self) -> None:
         self._items.clear()
+        self._dirty = True
+
+    # ---------------------------
+    # Change tracking
+    # ---------------------------
+
+    def mark_clean(self) -> None:
+        self._persisted_ids = [item.cart_item_id for item in self._items]
+        self._dirty = False
+
+    def pending_changes(self) -> Optional[CartChanges]:
+        """
+        Items added / removed since mark_clean().
+        None when untracked (the whole cart must be written).
+        """
+        if self._persisted_ids is None:
+            return None
+
+        if not self._dirty:
+            return CartChanges(added=[], removed=[], order=[])
+
+        current = [item.cart_item_id for item in self._items]
+        if current == self._persisted_ids:
+            return CartChanges(added=[], removed=[], order=[])
+
+        persisted = set(self._persisted_ids)
+        still_present = set(current)
+
+        return CartChanges(
+            added=[item for item in self._items if item.cart_item_id not in persisted],
+            removed=[cid for cid in self._persisted_ids if cid not in still_present],
+            order=current,
+        )
 
     # ---------------------------
     # Serialization
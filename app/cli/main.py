@@ -1,9 +1,11 @@
 # app/cli/main.py
 
 from pathlib import Path
+import argparse
 import uuid
 
 from app.core.turn_engine import TurnEngine
+from app.core.turn_metrics import stage_report
 from app.core.response_builder import ResponseBuilder
 from app.menu.repository import MenuRepository
 from app.menu.store import MenuStore
@@ -24,6 +26,14 @@ def load_menu_store(restaurant_id: str) -> MenuStore:
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Compass Voice CLI")
+    parser.add_argument(
+        "--metrics",
+        action="store_true",
+        help="print per-stage turn latencies on exit",
+    )
+    args = parser.parse_args()
+
     print("=== Compass Voice (CLI Mode) ===")
     print("Type 'exit' to quit.\n")
 
@@ -66,6 +76,10 @@ def main():
             print("Goodbye!")
             break
 
+        if args.metrics and user_input.lower() == "metrics":
+            print(stage_report())
+            continue
+
         turn_output = engine.process_turn(
             session=session,
             user_text=user_input,
@@ -81,6 +95,12 @@ def main():
 
         print(f"\nBOT: {reply}")
 
+    if args.metrics:
+        print()
+        print(stage_report())
+        print()
+        print(stage_report("handler"))
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,216 @@
+# app/core/admission.py
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Optional
+
+from app.core.metrics import REGISTRY
+
+# Shed turns that cannot finish within the budget (0 → only bound in-flight turns)
+ADMISSION_CONTROL_ENABLED = os.getenv("ADMISSION_CONTROL_ENABLED", "1") == "1"
+
+# Target turn latency, queueing included. Twilio gives up on a
+# webhook after 15 s; a shed turn still has to reach the caller.
+TURN_LATENCY_BUDGET_MS = float(os.getenv("TURN_LATENCY_BUDGET_MS", 3000))
+
+# Turns allowed to wait for a slot, per worker
+MAX_QUEUED_TURNS = int(os.getenv("MAX_QUEUED_TURNS", 64))
+
+# Weight of the newest turn in the service time estimate
+SERVICE_TIME_ALPHA = 0.2
+
+QUEUE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+TURN_ADMISSION = REGISTRY.counter(
+    "turn_admission_total",
+    "Turn admission decisions (admitted / shed_queue_full / shed_budget / shed_timeout)",
+    ("outcome",),
+)
+
+TURNS_IN_FLIGHT = REGISTRY.gauge(
+    "turns_in_flight",
+    "Turns holding a slot in this worker",
+)
+
+TURNS_QUEUED = REGISTRY.gauge(
+    "turns_queued",
+    "Turns waiting for a slot in this worker",
+)
+
+TURN_QUEUE_WAIT_SECONDS = REGISTRY.histogram(
+    "turn_queue_wait_seconds",
+    "Time admitted turns waited for a slot",
+    buckets=QUEUE_BUCKETS,
+)
+
+
+class TurnShedError(Exception):
+    """
+    Raised when a turn is not admitted: it could not finish within
+    the latency budget. Nothing was loaded or changed; the caller is
+    asked to hold and speak again.
+    """
+
+    def __init__(self, reason: str, estimate_ms: Optional[float] = None) -> None:
+        self.reason = reason
+        self.estimate_ms = estimate_ms
+        detail = f" (estimated {estimate_ms:.0f} ms)" if estimate_ms is not None else ""
+        super().__init__(f"Turn shed: {reason}{detail}")
+
+
+class AdmissionController:
+    """
+    Per-worker admission control for turns.
+
+    Responsibilities:
+    -----------------
+    - Bound the turns in flight (slots) and the turns waiting (FIFO)
+    - Estimate a newcomer's completion time from the queue ahead of it
+      and the recent service time; shed it up front when that exceeds
+      the latency budget, or when it waited out its share of the budget
+    - Queue depth / in-flight gauges, queue wait, shed counts
+
+    Non-responsibilities:
+    ---------------------
+    - What a shed turn answers (the endpoint)
+    - Running turns (AsyncTurnRunner)
+
+    Event-loop only (not thread-safe).
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int,
+        *,
+        max_queued: int = MAX_QUEUED_TURNS,
+        budget_ms: Optional[float] = TURN_LATENCY_BUDGET_MS if ADMISSION_CONTROL_ENABLED else None,
+    ) -> None:
+        self.max_in_flight = max_in_flight
+        self.max_queued = max_queued
+        self.budget_ms = budget_ms
+
+        # Recent time a turn holds its slot (None until one finished)
+        self.service_ms: Optional[float] = None
+
+        self._in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def estimate_ms(self, queued_ahead: int) -> Optional[float]:
+        """
+        Expected completion time of a turn arriving behind `queued_ahead`
+        waiting turns, all slots busy.
+        """
+        if self.service_ms is None:
+            return None
+        waves = queued_ahead // self.max_in_flight + 1
+        return waves * self.service_ms + self.service_ms
+
+    @asynccontextmanager
+    async def slot(self):
+        """
+        Holds a turn slot for the block; raises TurnShedError instead
+        of waiting past the budget.
+        """
+        started = time.perf_counter()
+        await self._acquire()
+
+        waited = time.perf_counter() - started
+        TURN_QUEUE_WAIT_SECONDS.observe(waited)
+        TURN_ADMISSION.inc(outcome="admitted")
+
+        held = time.perf_counter()
+        try:
+            yield waited * 1000
+        finally:
+            self._observe_service((time.perf_counter() - held) * 1000)
+            self._release()
+
+    # -------------------------
+    # Internals
+    # -------------------------
+
+    async def _acquire(self) -> None:
+        if self._in_flight < self.max_in_flight and not self._waiters:
+            self._take()
+            return
+
+        if self.budget_ms is not None:
+            if len(self._waiters) >= self.max_queued:
+                self._shed("queue_full")
+
+            estimate = self.estimate_ms(len(self._waiters))
+            if estimate is not None and estimate > self.budget_ms:
+                self._shed("budget", estimate)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        TURNS_QUEUED.set(len(self._waiters))
+
+        try:
+            # The slot is handed over by _release() (waiter result)
+            await asyncio.wait_for(asyncio.shield(waiter), self._max_wait_s())
+        except asyncio.TimeoutError:
+            if not waiter.done():
+                self._remove(waiter)
+                self._shed("timeout", self.budget_ms)
+        except BaseException:
+            if waiter.done() and not waiter.cancelled():
+                self._release()       # handed over, but we are gone
+            else:
+                self._remove(waiter)
+            raise
+
+    def _max_wait_s(self) -> Optional[float]:
+        if self.budget_ms is None:
+            return None
+        # Leave room to run the turn itself
+        return max(self.budget_ms - (self.service_ms or 0.0), 0.0) / 1000
+
+    def _take(self) -> None:
+        self._in_flight += 1
+        TURNS_IN_FLIGHT.set(self._in_flight)
+
+    def _release(self) -> None:
+        self._in_flight -= 1
+
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._take()
+                waiter.set_result(None)
+                break
+
+        TURNS_IN_FLIGHT.set(self._in_flight)
+        TURNS_QUEUED.set(len(self._waiters))
+
+    def _remove(self, waiter: asyncio.Future) -> None:
+        waiter.cancel()
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+        TURNS_QUEUED.set(len(self._waiters))
+
+    def _observe_service(self, ms: float) -> None:
+        if self.service_ms is None:
+            self.service_ms = ms
+        else:
+            self.service_ms += SERVICE_TIME_ALPHA * (ms - self.service_ms)
+
+    @staticmethod
+    def _shed(reason: str, estimate_ms: Optional[float] = None) -> None:
+        TURN_ADMISSION.inc(outcome=f"shed_{reason}")
+        raise TurnShedError(reason, estimate_ms)
@@ -0,0 +1,249 @@
+# app/core/decision_table.py
+"""
+Compiled turn decision table.
+
+Flow control (FlowControlPolicy, FLOW_RULES) and routing (StateRouter,
+ROUTE_RULES) are declared as ordered rules. This module composes both
+with the handler registry into one dense
+state × intent × choice-signal table, built once per TurnEngine.
+Each cell holds the flow action, the effective intent, the route and
+a direct handler reference, so a turn costs one lookup.
+
+Build-time checks (see report()):
+- cells routed to a handler name with no registered handler
+  (e.g. "confirming_item_handler") answer "handler_not_implemented"
+  instead of failing the turn; STATE_TABLE_STRICT=1 refuses to build,
+  STATE_TABLE_VERBOSE=1 prints the summary when an engine is built
+- rules that never decide any cell (shadowed by earlier rules)
+- registered handlers no cell reaches
+
+Usage:
+    python -m app.core.decision_table
+"""
+
+from __future__ import annotations
+
+import os
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from app.core.flow_control.flow_control_policy import FlowControlPolicy
+from app.core.flow_control.flow_decision import FlowAction, FlowDecision
+from app.nlu.choice_signals.choice_signals import ChoiceSignal
+from app.nlu.intent_resolution.intent import Intent
+from app.state_machine.context import ConversationContext
+from app.state_machine.conversation_state import ConversationState
+from app.state_machine.route_result import RouteResult
+from app.state_machine.state_router import StateRouter
+
+# Refuse to build when a reachable cell has no handler
+STATE_TABLE_STRICT = os.getenv("STATE_TABLE_STRICT", "0") == "1"
+
+# Print the build summary for every TurnEngine built
+STATE_TABLE_VERBOSE = os.getenv("STATE_TABLE_VERBOSE", "0") == "1"
+
+NOT_IMPLEMENTED_RESPONSE = "handler_not_implemented"
+
+
+@dataclass(frozen=True)
+class TurnDecision:
+    """
+    Everything decided from (state, intent, choice signal).
+    Shared between turns: read-only.
+    """
+
+    flow: FlowDecision                  # payload-free
+    effective_intent: Intent
+    route: Optional[RouteResult]        # None when flow control ends the turn
+    handler: Optional[object]           # None → no handler runs
+
+
+Cell = Tuple[ConversationState, Intent, ChoiceSignal]
+
+
+class DecisionTable:
+    """
+    Dense turn decision table.
+
+    Responsibilities:
+    - Compile FlowControlPolicy × StateRouter × handlers once
+    - decide(): one lookup per turn
+    - Report missing handlers, dead rules and unreachable handlers
+
+    Non-responsibilities:
+    - Running handlers / applying results (TurnEngine)
+    - Payloads (FlowControlPolicy.payload_for, per turn)
+    """
+
+    def __init__(
+        self,
+        flow_policy: FlowControlPolicy,
+        router: StateRouter,
+        handlers: Mapping[str, object],
+        *,
+        strict: bool = STATE_TABLE_STRICT,
+    ) -> None:
+        self.flow_policy = flow_policy
+        self.router = router
+        self.handlers = handlers
+
+        self._table: List[TurnDecision] = []
+
+        # Build-time findings
+        self.missing: Dict[str, List[Cell]] = defaultdict(list)
+        self._flow_rules_used = set()
+        self._route_rules_used = set()
+        self._handlers_used = set()
+
+        # Same cell order as the flow policy table: no index arithmetic
+        for state in ConversationState:
+            for intent in Intent:
+                for signal in ChoiceSignal:
+                    self._table.append(self._compile(len(self._table), state, intent, signal))
+
+        if strict and self.missing:
+            raise RuntimeError(
+                "Decision table has routes without handlers: "
+                + ", ".join(sorted(self.missing))
+            )
+
+    def decide(
+        self,
+        state: ConversationState,
+        intent: Intent,
+        context: ConversationContext,
+    ) -> TurnDecision:
+        signal = self.flow_policy.signal_for(state, context)
+        return self._table[self.flow_policy.cell(state, intent, signal)]
+
+    # -------------------------
+    # Compilation
+    # -------------------------
+
+    def _compile(
+        self,
+        cell: int,
+        state: ConversationState,
+        intent: Intent,
+        signal: ChoiceSignal,
+    ) -> TurnDecision:
+        flow = self.flow_policy.decision_at(cell)
+        reachable = signal is ChoiceSignal.NONE or state in self.flow_policy.signal_states
+
+        if reachable:
+            self._flow_rules_used.add(self.flow_policy.rule_table[cell])
+
+        if flow.action in (FlowAction.BLOCK, FlowAction.CANCEL):
+            return TurnDecision(flow=flow, effective_intent=intent, route=None, handler=None)
+
+        effective_intent = flow.effective_intent if flow.action == FlowAction.REWRITE else intent
+        route = self.router.lookup(state, effective_intent)
+
+        if reachable:
+            self._route_rules_used.add(self.router.rule_for(state, effective_intent))
+
+        handler = None
+        if route.allowed:
+            handler = self.handlers.get(route.handler_name)
+            if reachable:
+                if handler is None:
+                    self.missing[route.handler_name].append((state, intent, signal))
+                else:
+                    self._handlers_used.add(route.handler_name)
+
+        return TurnDecision(flow=flow, effective_intent=effective_intent, route=route, handler=handler)
+
+    # -------------------------
+    # Report
+    # -------------------------
+
+    def dead_flow_rules(self) -> List[int]:
+        return [n for n in range(len(self.flow_policy.rules)) if n not in self._flow_rules_used]
+
+    def dead_route_rules(self) -> List[int]:
+        return [n for n in range(len(self.router.rules)) if n not in self._route_rules_used]
+
+    def unused_handlers(self) -> List[str]:
+        return sorted(name for name in self.handlers if name not in self._handlers_used)
+
+    def summary(self) -> str:
+        """
+        One line for startup logs.
+        """
+        line = (
+            f"{len(self._table)} cells, {len(self.missing)} missing handlers, "
+            f"{len(self.dead_flow_rules()) + len(self.dead_route_rules())} dead rules"
+        )
+        if self.missing:
+            line += " (" + ", ".join(sorted(self.missing)) + ")"
+        return line
+
+    def report(self) -> str:
+        lines = [f"decision table: {self.summary()}", ""]
+
+        counts: Dict[str, int] = defaultdict(int)
+        for decision in self._table:
+            if decision.route is None:
+                counts[decision.flow.action.value] += 1
+            elif not decision.route.allowed:
+                counts["not_allowed"] += 1
+            elif decision.handler is None:
+                counts[NOT_IMPLEMENTED_RESPONSE] += 1
+            else:
+                counts["handler"] += 1
+        lines.append("cells by outcome: " + ", ".join(f"{k}={v}" for k, v in sorted(counts.items())))
+
+        if self.missing:
+            lines += ["", "routes without a registered handler (answer handler_not_implemented):"]
+            for name, cells in sorted(self.missing.items()):
+                by_state: Dict[str, set] = defaultdict(set)
+                for state, intent, _ in cells:
+                    by_state[state.name].add(intent.name)
+                lines.append(f"  {name}")
+                for state_name, intents in sorted(by_state.items()):
+                    lines.append(f"    {state_name}: {', '.join(sorted(intents))}")
+
+        dead_flow = self.dead_flow_rules()
+        dead_route = self.dead_route_rules()
+        if dead_flow or dead_route:
+            lines += ["", "rules that never decide a cell:"]
+            for n in dead_flow:
+                lines.append(f"  FLOW_RULES[{n}]  {_describe(self.flow_policy.rules[n])}")
+            for n in dead_route:
+                lines.append(f"  ROUTE_RULES[{n}] {_describe(self.router.rules[n])}")
+
+        unused = self.unused_handlers()
+        if unused:
+            lines += ["", "registered handlers no cell reaches: " + ", ".join(unused)]
+
+        return "\n".join(lines)
+
+
+def _describe(rule) -> str:
+    """
+    Rule fields with enum member names, unset fields omitted.
+    """
+    parts = []
+    for name, value in vars(rule).items():
+        if value is None or value == frozenset():
+            continue
+        if isinstance(value, frozenset):
+            value = "{" + ", ".join(sorted(v.name for v in value)) + "}"
+        elif hasattr(value, "name"):
+            value = value.name
+        parts.append(f"{name}={value}")
+    return " ".join(parts)
+
+
+def main() -> None:
+    from app.cli.main import load_menu_store
+    from app.core.turn_engine import TurnEngine
+    from app.menu.repository import MenuRepository
+
+    engine = TurnEngine(StateRouter(), MenuRepository(load_menu_store("demo")))
+    print(engine.decisions.report())
+
+
+if __name__ == "__main__":
+    main()
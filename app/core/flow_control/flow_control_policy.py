@@ -1,5 +1,8 @@
 # app/core/flow_control/flow_control_policy.py
 
+from dataclasses import dataclass
+from typing import FrozenSet, Iterable, List, Optional, Tuple
+
 from app.core.flow_control.flow_decision import FlowDecision, FlowAction
 from app.core.flow_control.slot_interaction import SlotInteraction
 from app.nlu.choice_signals.choice_signals import ChoiceSignal
@@ -35,13 +38,145 @@ CLARIFICATION_INTENTS = {
 }
 
 
+@dataclass(frozen=True)
+class FlowRule:
+    """
+    One mid-flow rule. Matches `intents` (None → any) in `states`
+    (None → any, minus `except_states`) when the choice signal of the
+    user text is in `signals` (None → any).
+    """
+
+    action: FlowAction
+    intents: Optional[FrozenSet[Intent]] = None
+    states: Optional[FrozenSet[ConversationState]] = None
+    signals: Optional[FrozenSet[ChoiceSignal]] = None
+    except_states: FrozenSet[ConversationState] = frozenset()
+    effective_intent: Optional[Intent] = None
+    slot_interaction: Optional[SlotInteraction] = None
+    response_key: Optional[str] = None
+
+    def __post_init__(self) -> None:
+        for name in ("intents", "states", "signals", "except_states"):
+            value = getattr(self, name)
+            if value is not None and not isinstance(value, frozenset):
+                object.__setattr__(self, name, frozenset(value))
+
+    def matches(self, state: ConversationState, intent: Intent, signal: ChoiceSignal) -> bool:
+        if self.intents is not None and intent not in self.intents:
+            return False
+        if self.states is not None and state not in self.states:
+            return False
+        if self.signals is not None and signal not in self.signals:
+            return False
+        return state not in self.except_states
+
+
+# Ordered: the first matching rule decides; no match → PASS
+FLOW_RULES: Tuple[FlowRule, ...] = (
+    # --------------------------------------------------
+    # 1. Explicit intent-level CANCEL (highest priority)
+    # --------------------------------------------------
+    FlowRule(
+        FlowAction.CANCEL,
+        intents={Intent.CANCEL},
+        except_states={ConversationState.IDLE},
+        response_key="flow_guard_confirm_cancel",
+    ),
+
+    # --------------------------------------------------
+    # 2. Slot-level interactions (OPTIONS / SKIP)
+    #    These are NOT intents — they are control signals
+    # --------------------------------------------------
+    # Ensure we stay in the current slot-filling handler.
+    # Otherwise, phrases like "what's available?" can be detected
+    # as ASK_MENU_INFO and get routed away from the slot flow.
+    FlowRule(
+        FlowAction.REWRITE,
+        states=WAITING_STATES,
+        signals={ChoiceSignal.ASK_OPTIONS},
+        effective_intent=Intent.UNKNOWN,
+        slot_interaction=SlotInteraction.ASK_OPTIONS,
+    ),
+    FlowRule(
+        FlowAction.PASS,
+        states=WAITING_STATES,
+        signals={ChoiceSignal.DENY},
+        slot_interaction=SlotInteraction.SKIP,
+    ),
+
+    # --------------------------------------------------
+    # 3. Confirm / deny must always reach handlers
+    # --------------------------------------------------
+    FlowRule(FlowAction.PASS, intents={Intent.CONFIRM, Intent.DENY}),
+
+    # --------------------------------------------------
+    # 4. Clarification / help during slot filling
+    # --------------------------------------------------
+    FlowRule(
+        FlowAction.REWRITE,
+        states=WAITING_STATES,
+        intents=CLARIFICATION_INTENTS,
+        effective_intent=Intent.UNKNOWN,
+    ),
+
+    # --------------------------------------------------
+    # 5. Forbidden global actions mid-flow
+    # --------------------------------------------------
+    FlowRule(
+        FlowAction.BLOCK,
+        states=WAITING_STATES,
+        intents=FORBIDDEN_GLOBAL_INTENTS,
+        response_key="flow_guard_finish_current_step",
+    ),
+)
+
+# 6. Default: allow routing
+_PASS = FlowDecision(action=FlowAction.PASS)
+
+
 class FlowControlPolicy:
     """
     Governs mid-flow behavior.
     Decides whether an intent should pass, be rewritten, blocked, or cancelled.
+
+    The rules (FLOW_RULES) are compiled once into a dense
+    state × intent × choice-signal table of payload-free decisions;
+    payloads (which need the context) are added per turn.
     """
 
-    # app/core/flow_control/flow_control_policy.py
+    def __init__(self, rules: Iterable[FlowRule] = FLOW_RULES) -> None:
+        self.rules: Tuple[FlowRule, ...] = tuple(rules)
+
+        # The choice signal is only resolved where a rule looks at it
+        self.signal_states = frozenset(
+            state
+            for state in ConversationState
+            if any(
+                rule.signals is not None
+                and (rule.states is None or state in rule.states)
+                and state not in rule.except_states
+                for rule in self.rules
+            )
+        )
+
+        intents = list(Intent)
+        signals = list(ChoiceSignal)
+        self._signal_index = {signal: n for n, signal in enumerate(signals)}
+        self._intent_offset = {intent: n * len(signals) for n, intent in enumerate(intents)}
+        self._state_offset = {
+            state: n * len(intents) * len(signals) for n, state in enumerate(ConversationState)
+        }
+
+        # Rule index per cell (None → default PASS), for reports
+        self.rule_table: List[Optional[int]] = []
+        self._table: List[FlowDecision] = []
+
+        for state in ConversationState:
+            for intent in intents:
+                for signal in signals:
+                    index = self._first_match(state, intent, signal)
+                    self.rule_table.append(index)
+                    self._table.append(self._decision(index))
 
     def evaluate(
             self,
@@ -58,72 +193,78 @@ class FlowControlPolicy:
         - Normalizes slot-level interactions
         - Keeps handlers simple and deterministic
         """
+        decision = self.lookup(state, intent, self.signal_for(state, context))
+        payload = self.payload_for(decision, state, context)
+        if payload is None:
+            return decision
 
-        # --------------------------------------------------
-        # 1. Explicit intent-level CANCEL (highest priority)
-        # --------------------------------------------------
-        if intent == Intent.CANCEL and state != ConversationState.IDLE:
-            return FlowDecision(
-                action=FlowAction.CANCEL,
-                response_key="flow_guard_confirm_cancel",
-                response_payload={
-                    "item_name": context.current_item_name,
-                },
-            )
+        return FlowDecision(
+            action=decision.action,
+            effective_intent=decision.effective_intent,
+            slot_interaction=decision.slot_interaction,
+            response_key=decision.response_key,
+            response_payload=payload,
+        )
 
-        # --------------------------------------------------
-        # 2. Slot-level interactions (OPTIONS / SKIP)
-        #    These are NOT intents — they are control signals
-        # --------------------------------------------------
-        if state in WAITING_STATES:
-            signal = resolve_choice_signal(context.last_user_text)
-
-            if signal == ChoiceSignal.ASK_OPTIONS:
-                return FlowDecision(
-                    # Ensure we stay in the current slot-filling handler.
-                    # Otherwise, phrases like "what's available?" can be detected
-                    # as ASK_MENU_INFO and get routed away from the slot flow.
-                    action=FlowAction.REWRITE,
-                    effective_intent=Intent.UNKNOWN,
-                    slot_interaction=SlotInteraction.ASK_OPTIONS,
-                )
-
-            if signal == ChoiceSignal.DENY:
-                return FlowDecision(
-                    action=FlowAction.PASS,
-                    slot_interaction=SlotInteraction.SKIP,
-                )
-
-        # --------------------------------------------------
-        # 3. Confirm / deny must always reach handlers
-        # --------------------------------------------------
-        if intent in {Intent.CONFIRM, Intent.DENY}:
-            return FlowDecision(action=FlowAction.PASS)
-
-        # --------------------------------------------------
-        # 4. Clarification / help during slot filling
-        # --------------------------------------------------
-        if state in WAITING_STATES and intent in CLARIFICATION_INTENTS:
-            return FlowDecision(
-                action=FlowAction.REWRITE,
-                effective_intent=Intent.UNKNOWN,
-            )
+    # -------------------------
+    # Compiled table
+    # -------------------------
 
-        # --------------------------------------------------
-        # 5. Forbidden global actions mid-flow
-        # --------------------------------------------------
-        if state in WAITING_STATES and intent in FORBIDDEN_GLOBAL_INTENTS:
-            return FlowDecision(
-                action=FlowAction.BLOCK,
-                response_key="flow_guard_finish_current_step",
-                response_payload={
-                    "state": state.name,
-                    "current_step": state.name.lower().replace("waiting_for_", ""),
-                    "item_name": context.current_item_name,
-                },
-            )
+    def signal_for(self, state: ConversationState, context: ConversationContext) -> ChoiceSignal:
+        if state not in self.signal_states:
+            return ChoiceSignal.NONE
+        return resolve_choice_signal(context.last_user_text)
+
+    def lookup(self, state: ConversationState, intent: Intent, signal: ChoiceSignal) -> FlowDecision:
+        """
+        Payload-free decision (shared between turns: read-only).
+        """
+        return self._table[self.cell(state, intent, signal)]
+
+    def decision_at(self, cell: int) -> FlowDecision:
+        """
+        Decision of a cell index (cells are ordered state, intent, signal
+        as the enums declare them).
+        """
+        return self._table[cell]
+
+    def cell(self, state: ConversationState, intent: Intent, signal: ChoiceSignal) -> int:
+        return self._state_offset[state] + self._intent_offset[intent] + self._signal_index[signal]
+
+    @staticmethod
+    def payload_for(
+        decision: FlowDecision,
+        state: ConversationState,
+        context: ConversationContext,
+    ) -> Optional[dict]:
+        if decision.action == FlowAction.CANCEL:
+            return {
+                "item_name": context.current_item_name,
+            }
+
+        if decision.action == FlowAction.BLOCK:
+            return {
+                "state": state.name,
+                "current_step": state.name.lower().replace("waiting_for_", ""),
+                "item_name": context.current_item_name,
+            }
+
+        return None
+
+    def _first_match(self, state: ConversationState, intent: Intent, signal: ChoiceSignal) -> Optional[int]:
+        for index, rule in enumerate(self.rules):
+            if rule.matches(state, intent, signal):
+                return index
+        return None
+
+    def _decision(self, index: Optional[int]) -> FlowDecision:
+        if index is None:
+            return _PASS
 
-        # --------------------------------------------------
-        # 6. Default: allow routing
-        # --------------------------------------------------
-        return FlowDecision(action=FlowAction.PASS)
+        rule = self.rules[index]
+        return FlowDecision(
+            action=rule.action,
+            effective_intent=rule.effective_intent,
+            slot_interaction=rule.slot_interaction,
+            response_key=rule.response_key,
+        )
@@ -0,0 +1,213 @@
+# app/core/hypothesis_selector.py
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional
+
+from app.menu.query_result import MenuQueryType
+from app.menu.repository import MenuRepository
+from app.nlu.choice_signals.choice_signals import ChoiceSignal
+from app.nlu.choice_signals.resolver import resolve_choice_signal
+from app.nlu.intent_resolution.intent import Intent
+from app.session.session import Session
+from app.state_machine.conversation_state import ConversationState
+from app.utils.choice_matching import match_choice
+from app.utils.text_utils import split_candidates
+
+if TYPE_CHECKING:
+    from app.core.turn_engine import TurnAnalysis
+
+
+# Weight of a hypothesis that resolves against the menu / current slot.
+# Larger than any STT confidence (0..1), so resolution always dominates.
+RESOLVED_SCORE = 2.0
+
+# Weight of a hypothesis with a known intent but no menu evidence
+INTENT_SCORE = 1.0
+
+MENU_INTENTS = {Intent.ASK_MENU_INFO, Intent.ASK_PRICE}
+
+
+@dataclass(frozen=True)
+class SpeechHypothesis:
+    """
+    One STT alternative for the same utterance.
+    Confidence is the recognizer's score in [0, 1].
+
+    A partial (the last interim transcript of an utterance) is a
+    fallback: it only counts when it resolves (RESOLVED_SCORE), never
+    on a known intent alone — a truncated prefix must not outscore the
+    caller's finished sentence.
+    """
+    text: str
+    confidence: float = 1.0
+    partial: bool = False
+
+
+@dataclass(frozen=True)
+class ScoredHypothesis:
+    hypothesis: SpeechHypothesis
+    analysis: "TurnAnalysis"
+    score: float
+    rank: int  # position in the input (tie-breaker)
+
+
+class HypothesisSelector:
+    """
+    Picks the best interpretation among several STT hypotheses.
+
+    Strategy:
+    ---------
+    1. Clean every hypothesis; identical cleaned texts share ONE analysis
+    2. Score each distinct analysis against the current state:
+       - resolves to a menu item / category / slot choice → RESOLVED_SCORE
+       - otherwise a known intent                           → INTENT_SCORE
+       Partials score only when they resolve
+    3. Add the recognizer confidence
+    4. Highest score wins; ties go to the earliest hypothesis
+
+    Menu lookups go through MenuRepository's memo, so the handler
+    of the winning hypothesis reuses the work done here.
+
+    Deterministic: same inputs → same winner.
+    """
+
+    def __init__(self, menu_repo: MenuRepository) -> None:
+        self.menu_repo = menu_repo
+
+    def select(
+        self,
+        session: Session,
+        hypotheses: List[SpeechHypothesis],
+        *,
+        clean: Callable[[str], str],
+        analyze: Callable[[str, ConversationState], "TurnAnalysis"],
+        known: Iterable[Optional["TurnAnalysis"]] = (),
+    ) -> ScoredHypothesis:
+        if not hypotheses:
+            raise ValueError("At least one hypothesis is required")
+
+        state = session.conversation_state
+
+        # Precomputed analyses (e.g. speculative partials) for this state
+        analyses: Dict[str, "TurnAnalysis"] = {
+            a.cleaned_text: a
+            for a in known
+            if a is not None and a.state == state
+        }
+        resolution_scores: Dict[str, float] = {}
+
+        best: Optional[ScoredHypothesis] = None
+
+        for rank, hypothesis in enumerate(hypotheses):
+            cleaned = clean(hypothesis.text)
+
+            analysis = analyses.get(cleaned)
+            if analysis is None:
+                analysis = analyze(hypothesis.text, state)
+                analyses[cleaned] = analysis
+
+            if cleaned not in resolution_scores:
+                resolution_scores[cleaned] = self._resolution_score(
+                    analysis, session
+                )
+
+            resolution = resolution_scores[cleaned]
+            if hypothesis.partial and resolution < RESOLVED_SCORE:
+                resolution = 0.0
+
+            scored = ScoredHypothesis(
+                hypothesis=hypothesis,
+                analysis=analysis,
+                score=resolution + _clamp(hypothesis.confidence),
+                rank=rank,
+            )
+
+            # Strictly greater → earliest hypothesis wins ties
+            if best is None or scored.score > best.score:
+                best = scored
+
+        return best
+
+    # =================================================
+    # Scoring
+    # =================================================
+
+    def _resolution_score(self, analysis: "TurnAnalysis", session: Session) -> float:
+        if not analysis.cleaned_text:
+            return 0.0
+
+        state = analysis.state
+        intent = analysis.refined_intent
+
+        if state in {
+            ConversationState.WAITING_FOR_SIDE,
+            ConversationState.WAITING_FOR_MODIFIER,
+            ConversationState.WAITING_FOR_SIZE,
+        }:
+            return self._slot_score(analysis, session)
+
+        if state == ConversationState.IDLE:
+            if intent == Intent.ADD_ITEM:
+                resolution = self.menu_repo.resolve_item(analysis.normalized_text)
+                return RESOLVED_SCORE if resolution else 0.0
+
+            if intent in MENU_INTENTS:
+                result = self.menu_repo.resolve_menu_query(analysis.normalized_text)
+                if result.type != MenuQueryType.NOT_FOUND:
+                    return RESOLVED_SCORE
+                return 0.0
+
+        return INTENT_SCORE if intent != Intent.UNKNOWN else 0.0
+
+    def _slot_score(self, analysis: "TurnAnalysis", session: Session) -> float:
+        """
+        During slot filling an utterance "resolves" when it is a control
+        signal (options / skip / yes / cancel) or matches a current choice.
+        """
+        if resolve_choice_signal(analysis.cleaned_text) != ChoiceSignal.NONE:
+            return RESOLVED_SCORE
+
+        choices = self._current_choices(session)
+        if not choices:
+            return 0.0
+
+        chunks = split_candidates(analysis.normalized_text)
+        if chunks and all(match_choice(chunk, choices) for chunk in chunks):
+            return RESOLVED_SCORE
+
+        return 0.0
+
+    def _current_choices(self, session: Session) -> list:
+        ctx = session.conversation_context
+        if not ctx.current_item_id:
+            return []
+
+        try:
+            item = self.menu_repo.get_item(ctx.current_item_id)
+        except KeyError:
+            return []
+
+        state = session.conversation_state
+
+        if state == ConversationState.WAITING_FOR_SIDE:
+            if ctx.current_side_group_index < len(item.side_groups):
+                return item.side_groups[ctx.current_side_group_index].choices
+            return []
+
+        if state == ConversationState.WAITING_FOR_MODIFIER:
+            if ctx.current_modifier_group_index < len(item.modifier_groups):
+                return item.modifier_groups[ctx.current_modifier_group_index].choices
+            return []
+
+        # WAITING_FOR_SIZE: variants matched by label
+        return [
+            SimpleNamespace(name=v.label)
+            for v in (item.pricing.variants or [])
+        ]
+
+
+def _clamp(confidence: float) -> float:
+    return min(max(confidence, 0.0), 1.0)
@@ -0,0 +1,382 @@
+# app/core/metrics.py
+"""
+In-process metrics: counters, gauges and histograms, rendered in the
+Prometheus text exposition format (GET /metrics).
+
+Kept here rather than taken from prometheus_client: besides exposition,
+the same histograms serve the in-process tools — quantile estimates for
+stage reports (app/core/turn_metrics.py) and merging the registries of
+replay worker processes (app/perf/replay.py) — which prometheus_client
+does not offer, and the serving image stays free of another dependency.
+gunicorn workers: see app/core/metrics_multiprocess.py.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from threading import Lock
+from typing import Dict, Iterable, List, Optional, Tuple
+
+LabelValues = Tuple[str, ...]
+
+# Latency buckets (seconds): 10 µs … 2.5 s (most turn stages are sub-ms)
+LATENCY_BUCKETS = (
+    0.00001, 0.000025, 0.00005,
+    0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5,
+    1.0, 2.5,
+)
+
+
+class Counter:
+    """
+    Monotonic counter with optional labels (Prometheus semantics).
+    Safe to increment from the event loop and from executor threads.
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._label_values(labels), 0.0)
+
+    def snapshot(self) -> list:
+        with self._lock:
+            return [[list(key), v] for key, v in self._values.items()]
+
+    def merge_snapshot(self, values: list) -> None:
+        with self._lock:
+            for key, v in values:
+                key = tuple(key)
+                self._values[key] = self._values.get(key, 0.0) + v
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+
+        if not values and not self.labelnames:
+            values = [((), 0.0)]
+
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}"
+            for key, v in values
+        ]
+
+    def _label_values(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+
+class Gauge:
+    """
+    Value that goes up and down (Prometheus semantics), e.g. queue depth.
+    Safe to update from the event loop and from executor threads.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = Lock()
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    value = Counter.value
+    render = Counter.render
+    snapshot = Counter.snapshot
+    merge_snapshot = Counter.merge_snapshot
+    _label_values = Counter._label_values
+
+
+class Histogram:
+    """
+    Cumulative histogram with optional labels (Prometheus semantics).
+    observe() is one bisect and one locked update: cheap enough for
+    every stage of every turn.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+
+        # label values → [per-bucket counts (+Inf last), sum]
+        self._series: Dict[LabelValues, list] = {}
+        self._lock = Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._label_values(labels)
+        index = bisect_left(self.buckets, value)
+
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = [[0] * (len(self.buckets) + 1), 0.0]
+                self._series[key] = series
+            series[0][index] += 1
+            series[1] += value
+
+    def count(self, **labels: str) -> int:
+        return sum(self._matching(labels)[0])
+
+    def quantile(self, q: float, **labels: str) -> Optional[float]:
+        """
+        Estimated q-quantile over all series matching `labels` (a subset
+        of the label names), interpolated inside the bucket like
+        PromQL's histogram_quantile. None without observations.
+        """
+        counts, _ = self._matching(labels)
+        total = sum(counts)
+        if not total:
+            return None
+
+        rank = q * total
+        seen = 0
+        for index, n in enumerate(counts):
+            if n and seen + n >= rank:
+                if index == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index]
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+
+        return self.buckets[-1]
+
+    def series(self) -> List[LabelValues]:
+        with self._lock:
+            return sorted(self._series)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            series = sorted(
+                (key, (list(counts), total)) for key, (counts, total) in self._series.items()
+            )
+
+        lines: List[str] = []
+        names = self.labelnames + ("le",)
+
+        for key, (counts, total) in series:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(names, key + (le,))} {cumulative}"
+                )
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+
+        return lines
+
+    def export(self) -> Dict[LabelValues, list]:
+        with self._lock:
+            return {key: [list(counts), total] for key, (counts, total) in self._series.items()}
+
+    def merge(self, exported: Dict[LabelValues, list]) -> None:
+        with self._lock:
+            for key, (counts, total) in exported.items():
+                series = self._series.setdefault(key, [[0] * (len(self.buckets) + 1), 0.0])
+                series[0] = [a + b for a, b in zip(series[0], counts)]
+                series[1] += total
+
+    def snapshot(self) -> list:
+        return [[list(key), series] for key, series in self.export().items()]
+
+    def merge_snapshot(self, values: list) -> None:
+        self.merge({tuple(key): series for key, series in values})
+
+    def _matching(self, labels: Dict[str, str]) -> Tuple[List[int], float]:
+        unknown = set(labels) - set(self.labelnames)
+        if unknown:
+            raise ValueError(f"{self.name} has no labels {tuple(unknown)}")
+
+        positions = [(self.labelnames.index(n), str(v)) for n, v in labels.items()]
+        counts = [0] * (len(self.buckets) + 1)
+        total = 0.0
+
+        with self._lock:
+            for key, (series_counts, series_total) in self._series.items():
+                if all(key[i] == v for i, v in positions):
+                    counts = [a + b for a, b in zip(counts, series_counts)]
+                    total += series_total
+
+        return counts, total
+
+    _label_values = Counter._label_values
+
+
+class MetricsRegistry:
+    """
+    Process-wide metric registry.
+
+    Responsibilities:
+    -----------------
+    - Own metric instances (get-or-create by name)
+    - Merge histograms exported by other processes (replay workers)
+    - Snapshot / merge every metric (gunicorn workers, see
+      app/core/metrics_multiprocess.py)
+    - Render all metrics in the Prometheus text exposition format
+
+    Non-responsibilities:
+    ---------------------
+    - Sharing snapshots between processes (metrics_multiprocess)
+    """
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, object] = {}
+        self._lock = Lock()
+
+    def counter(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter, name, help_text, labelnames)
+
+    def gauge(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge, name, help_text, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram, name, help_text, labelnames, buckets=buckets)
+
+    def get(self, name: str):
+        return self._metrics.get(name)
+
+    def export(self) -> Dict[str, dict]:
+        """
+        Picklable snapshot of every histogram, for merging the
+        registries of worker processes (see merge()).
+        """
+        return {
+            name: metric.export()
+            for name, metric in self._metrics.items()
+            if isinstance(metric, Histogram)
+        }
+
+    def merge(self, exported: Dict[str, dict]) -> None:
+        for name, series in exported.items():
+            metric = self._metrics.get(name)
+            if isinstance(metric, Histogram):
+                metric.merge(series)
+
+    def snapshot(self) -> Dict[str, dict]:
+        """
+        JSON-serialisable copy of every metric, for merging into
+        another process's registry (see merge_snapshot()).
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+
+        return {
+            metric.name: {
+                "kind": metric.kind,
+                "help": metric.help_text,
+                "labelnames": list(metric.labelnames),
+                "buckets": list(getattr(metric, "buckets", ())),
+                "values": metric.snapshot(),
+            }
+            for metric in metrics
+        }
+
+    def merge_snapshot(self, snapshot: Dict[str, dict]) -> None:
+        """
+        Adds a snapshot to this registry: counters, gauges and
+        histogram buckets are summed.
+        """
+        for name, entry in snapshot.items():
+            cls = _KINDS[entry["kind"]]
+            options = {"buckets": entry["buckets"]} if cls is Histogram else {}
+            metric = self._register(cls, name, entry["help"], tuple(entry["labelnames"]), **options)
+            metric.merge_snapshot(entry["values"])
+
+    def render(self) -> str:
+        lines: List[str] = []
+
+        for metric in sorted(self._metrics.values(), key=lambda m: m.name):
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+
+        return "\n".join(lines) + "\n"
+
+    def _register(self, cls, name: str, help_text: str, labelnames: Tuple[str, ...], **options):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = cls(name, help_text, labelnames, **options)
+                self._metrics[name] = metric
+            elif not isinstance(metric, cls) or metric.labelnames != labelnames:
+                raise ValueError(f"Metric {name} already registered with another shape")
+            return metric
+
+
+_KINDS = {cls.kind: cls for cls in (Counter, Gauge, Histogram)}
+
+
+def _format_labels(names: Tuple[str, ...], values: LabelValues) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{n}="{_escape(v)}"' for n, v in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+# Shared by every module of the worker process
+REGISTRY = MetricsRegistry()
+
+# Content type of REGISTRY.render()
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
@@ -0,0 +1,170 @@
+# app/core/metrics_multiprocess.py
+
+from __future__ import annotations
+
+import asyncio
+import glob
+import json
+import os
+import time
+from typing import Optional
+
+from app.core.metrics import REGISTRY, MetricsRegistry
+
+# Shared by the workers of one gunicorn master (unset → this process only)
+METRICS_DIR = os.getenv("METRICS_DIR") or None
+
+# How stale another worker's numbers may be in a scrape
+METRICS_SNAPSHOT_SECONDS = float(os.getenv("METRICS_SNAPSHOT_SECONDS", 5.0))
+
+SNAPSHOT_PATTERN = "metrics-*.json"
+
+
+class MultiprocessMetrics:
+    """
+    One scrape, every gunicorn worker.
+
+    Each worker has its own REGISTRY and a scrape of /metrics reaches
+    one of them. With METRICS_DIR set, every worker writes a snapshot
+    of its registry to the shared directory, and /metrics renders all
+    snapshots merged.
+
+    Responsibilities:
+    -----------------
+    - Write this worker's snapshot every METRICS_SNAPSHOT_SECONDS
+      (and on close), off the event loop
+    - render(): the other workers' snapshots + this worker's live
+      registry, counters / gauges / histograms summed
+
+    Non-responsibilities:
+    ---------------------
+    - Metric semantics (app/core/metrics.py)
+    - Clearing the directory / retiring exited workers (master hooks,
+      clear_snapshots() / retire_worker(), see app/api/gunicorn_conf.py)
+
+    Snapshots are named metrics-<pid>-<started>.json, so a restarted
+    worker never overwrites an exited one's totals. An exited worker's
+    counters and histograms keep counting; its gauges are dropped.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        *,
+        registry: MetricsRegistry = REGISTRY,
+        snapshot_seconds: float = METRICS_SNAPSHOT_SECONDS,
+    ) -> None:
+        self.directory = os.path.abspath(directory)
+        self.registry = registry
+        self.snapshot_seconds = snapshot_seconds
+
+        # Taken here, in the worker (not at import: preload)
+        self.path = os.path.join(
+            self.directory,
+            f"metrics-{os.getpid()}-{time.time_ns()}.json",
+        )
+
+        self._writer: Optional[asyncio.Task] = None
+
+    # =================================================
+    # Lifecycle
+    # =================================================
+
+    async def start(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        await asyncio.to_thread(self.write_snapshot)
+        self._writer = asyncio.create_task(self._write_loop())
+
+    async def close(self) -> None:
+        """
+        Stops the writer; the last snapshot keeps this worker's totals.
+        """
+        if self._writer is not None:
+            self._writer.cancel()
+            try:
+                await self._writer
+            except asyncio.CancelledError:
+                pass
+            self._writer = None
+
+        await asyncio.to_thread(self.write_snapshot, gauges=False)
+
+    # =================================================
+    # Snapshots
+    # =================================================
+
+    def write_snapshot(self, *, gauges: bool = True) -> None:
+        snapshot = self.registry.snapshot()
+        if not gauges:
+            snapshot = _without_gauges(snapshot)
+        _write_json(self.path, snapshot)
+
+    def render(self) -> str:
+        merged = MetricsRegistry()
+
+        for path in sorted(glob.glob(os.path.join(self.directory, SNAPSHOT_PATTERN))):
+            if path == self.path:
+                continue
+            snapshot = _read_json(path)
+            if snapshot is not None:
+                merged.merge_snapshot(snapshot)
+
+        # This worker: live, not its last snapshot
+        merged.merge_snapshot(self.registry.snapshot())
+        return merged.render()
+
+    # =================================================
+    # Internals
+    # =================================================
+
+    async def _write_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.snapshot_seconds)
+            try:
+                await asyncio.to_thread(self.write_snapshot)
+            except OSError as e:
+                print(f"[METRICS] Snapshot failed: {e}")
+
+
+# =================================================
+# Master hooks
+# =================================================
+
+def clear_snapshots(directory: str) -> None:
+    """
+    Removes every snapshot: counters start from zero with the master.
+    """
+    for path in glob.glob(os.path.join(directory, SNAPSHOT_PATTERN)):
+        os.remove(path)
+
+
+def retire_worker(directory: str, pid: int) -> None:
+    """
+    Drops the gauges of an exited worker (e.g. one that was killed
+    before its lifespan closed); its counters and histograms stay.
+    """
+    for path in glob.glob(os.path.join(directory, f"metrics-{pid}-*.json")):
+        snapshot = _read_json(path)
+        if snapshot is not None:
+            _write_json(path, _without_gauges(snapshot))
+
+
+def _without_gauges(snapshot: dict) -> dict:
+    return {name: entry for name, entry in snapshot.items() if entry["kind"] != "gauge"}
+
+
+def _write_json(path: str, value: dict) -> None:
+    # Readers see the old or the new snapshot, never half of one
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(value, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def _read_json(path: str) -> Optional[dict]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        # Removed meanwhile
+        return None
@@ -29,6 +29,7 @@ from app.responses.item_responses import (
     clarify_modifier_choice,
     item_added_successfully,
 )
+from app.responses.slot_prompts import SlotPromptCache
 from app.responses.menu_responses import (
     show_category_response,
     show_item_info_response,
@@ -51,11 +52,14 @@ class ResponseBuilder:
     Responsibilities:
     - Dispatch response_key → response function
     - Provide context + menu_repo + payload
+    - Hand slot responses their cached SlotPrompt (static text is
+      built once per (item, group) per menu snapshot)
     - Never contain formatting or business logic
     """
 
     def __init__(self, menu_repo: MenuRepository):
         self.menu_repo = menu_repo
+        self.slot_prompts = SlotPromptCache(menu_repo)
         self._registry: Dict[str, ResponseFn] = self._build_registry()
 
     def build(
@@ -72,6 +76,15 @@ class ResponseBuilder:
 
         return renderer(context, self.menu_repo, payload)
 
+    def invalidate_menu_cache(self) -> None:
+        """
+        Drop cached slot prompts and menu resolutions (call after
+        reloading the menu). A replaced menu_repo.store is also
+        detected on the next build / lookup.
+        """
+        self.slot_prompts.invalidate()
+        self.menu_repo.invalidate_cache()
+
     # --------------------------------------------------
     # Registry
     # --------------------------------------------------
@@ -82,6 +95,9 @@ class ResponseBuilder:
         One response_key → one function.
         """
 
+        side = self.slot_prompts.side
+        modifier = self.slot_prompts.modifier
+
         return {
             # -------------------------
             # Flow control / guards
@@ -101,23 +117,23 @@ class ResponseBuilder:
             # Item build flow
             # -------------------------
             "confirm_item": self._confirm_item,
-            "ask_for_side": lambda c, m, p: ask_for_side(c, m),
-            "ask_for_modifier": lambda c, m, p: ask_for_modifier(c, m),
+            "ask_for_side": lambda c, m, p: ask_for_side(c, m, side(c)),
+            "ask_for_modifier": lambda c, m, p: ask_for_modifier(c, m, modifier(c)),
             "ask_for_size": lambda c, m, p: ask_for_size(c, m),
             "ask_for_quantity": lambda c, m, p: ask_item_quantity(p),
 
             # Required enforcement
-            "required_side_cannot_skip": lambda c, m, p: required_side_cannot_skip(c, m),
-            "required_modifier_cannot_skip": lambda c, m, p: required_modifier_cannot_skip(c, m),
+            "required_side_cannot_skip": lambda c, m, p: required_side_cannot_skip(c, m, side(c)),
+            "required_modifier_cannot_skip": lambda c, m, p: required_modifier_cannot_skip(c, m, modifier(c)),
             "required_size_cannot_skip": lambda c, m, p: required_size_cannot_skip(c, m),
 
             # Repeats / clarifications
-            "repeat_side_options": repeat_side_options,
-            "list_side_options": list_side_options,
-            "clarify_side_choice": clarify_side_choice,
-            "repeat_modifier_options": repeat_modifier_options,
-            "list_modifier_options": list_modifier_options,
-            "clarify_modifier_choice": clarify_modifier_choice,
+            "repeat_side_options": lambda c, m, p: repeat_side_options(c, m, p, side(c)),
+            "list_side_options": lambda c, m, p: list_side_options(c, m, p, side(c)),
+            "clarify_side_choice": lambda c, m, p: clarify_side_choice(c, m, p, side(c)),
+            "repeat_modifier_options": lambda c, m, p: repeat_modifier_options(c, m, p, modifier(c)),
+            "list_modifier_options": lambda c, m, p: list_modifier_options(c, m, p, modifier(c)),
+            "clarify_modifier_choice": lambda c, m, p: clarify_modifier_choice(c, m, p, modifier(c)),
 
             # Completion
             "item_added_successfully": lambda c, m, p: item_added_successfully(p),
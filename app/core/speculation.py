@@ -0,0 +1,167 @@
+# app/core/speculation.py
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from typing import Optional
+
+from app.core.turn_engine import TurnAnalysis
+from app.state_machine.conversation_state import ConversationState
+
+
+@dataclass
+class _CallEntry:
+    state: Optional[ConversationState] = None
+    analysis: Optional[TurnAnalysis] = None
+    touched_at: float = 0.0
+
+
+class SpeculativeNLUCache:
+    """
+    Per-call cache of speculative NLU results.
+
+    Twilio sends partial transcripts while the caller is still talking.
+    Each partial is analyzed ahead of time and kept here, keyed by CallSid,
+    so the final /process_speech turn can skip NLU and menu scoring.
+
+    Responsibilities:
+    -----------------
+    - Remember the conversation state each call is currently in
+      (partials must be analyzed in the state the final turn will see)
+    - Keep only the LATEST analysis per call: the longest partial
+      (a late partial the kept one extends never replaces it)
+    - Bound memory (max calls + TTL for abandoned calls)
+
+    Non-responsibilities:
+    ---------------------
+    - Deciding whether an analysis still applies (TurnEngine does that)
+    """
+
+    def __init__(self, max_calls: int = 4096, ttl_seconds: float = 120.0):
+        self.max_calls = max_calls
+        self.ttl_seconds = ttl_seconds
+
+        self._entries: "OrderedDict[str, _CallEntry]" = OrderedDict()
+        self._lock = Lock()
+
+    # =================================================
+    # Public API
+    # =================================================
+
+    def remember_state(self, call_sid: str, state: ConversationState) -> None:
+        """
+        Records the state the NEXT turn of this call will start in.
+        Any analysis computed for an older state is dropped.
+        """
+        with self._lock:
+            entry = self._touch(call_sid)
+            if entry.state != state:
+                entry.analysis = None
+            entry.state = state
+
+    def known_state(self, call_sid: str) -> Optional[ConversationState]:
+        with self._lock:
+            entry = self._get_live(call_sid)
+            return entry.state if entry else None
+
+    def store(self, call_sid: str, analysis: TurnAnalysis) -> None:
+        """
+        Keeps the analysis unless it was computed for a stale state
+        (late partials can arrive after the turn already moved on) or
+        the kept analysis already extends it (partials are analyzed
+        concurrently and may finish out of order).
+        """
+        with self._lock:
+            entry = self._touch(call_sid)
+            if entry.state is not None and entry.state != analysis.state:
+                return
+
+            kept = entry.analysis
+            if (
+                kept is not None
+                and kept.state == analysis.state
+                and extends(kept.cleaned_text, analysis.cleaned_text)
+            ):
+                return
+
+            entry.state = analysis.state
+            entry.analysis = analysis
+
+    def latest(self, call_sid: str) -> Optional[TurnAnalysis]:
+        with self._lock:
+            entry = self._get_live(call_sid)
+            return entry.analysis if entry else None
+
+    def covers(self, call_sid: str, cleaned_text: str) -> bool:
+        """
+        True when the kept analysis is for this text or extends it:
+        analyzing the text would add nothing. The kept analysis is
+        always for the call's current state (remember_state drops it
+        on a state change).
+        """
+        with self._lock:
+            entry = self._get_live(call_sid)
+            return bool(
+                entry
+                and entry.analysis
+                and extends(entry.analysis.cleaned_text, cleaned_text)
+            )
+
+    def take(self, call_sid: str) -> Optional[TurnAnalysis]:
+        """
+        Returns and clears the latest analysis for a call.
+        A speculative result is only ever offered to one turn.
+        """
+        with self._lock:
+            entry = self._get_live(call_sid)
+            if not entry:
+                return None
+
+            analysis, entry.analysis = entry.analysis, None
+            return analysis
+
+    def forget(self, call_sid: str) -> None:
+        with self._lock:
+            self._entries.pop(call_sid, None)
+
+    # =================================================
+    # Internals (caller holds the lock)
+    # =================================================
+
+    def _get_live(self, call_sid: str) -> Optional[_CallEntry]:
+        entry = self._entries.get(call_sid)
+        if not entry:
+            return None
+
+        if time.monotonic() - entry.touched_at > self.ttl_seconds:
+            del self._entries[call_sid]
+            return None
+
+        return entry
+
+    def _touch(self, call_sid: str) -> _CallEntry:
+        entry = self._get_live(call_sid)
+        if entry is None:
+            entry = _CallEntry()
+            self._entries[call_sid] = entry
+
+        entry.touched_at = time.monotonic()
+        self._entries.move_to_end(call_sid)
+
+        while len(self._entries) > self.max_calls:
+            self._entries.popitem(last=False)
+
+        return entry
+
+
+def extends(text: str, prefix: str) -> bool:
+    """
+    True when `text` is `prefix` or continues it with more words
+    ("i want a chicken taco" extends "i want a chicken", not "i want a chick").
+    """
+    if text == prefix:
+        return True
+    return bool(prefix) and text.startswith(prefix) and text[len(prefix)] == " "
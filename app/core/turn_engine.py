@@ -1,10 +1,14 @@
 # app/core/turn_engine.py
-from dataclasses import dataclass
-from typing import Optional
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
 
 from app.cart.read_models.cart_summary_builder import CartSummaryBuilder
+from app.core.decision_table import NOT_IMPLEMENTED_RESPONSE, STATE_TABLE_VERBOSE, DecisionTable
 from app.core.flow_control.flow_control_policy import FlowControlPolicy
 from app.core.flow_control.flow_decision import FlowAction
+from app.core.hypothesis_selector import HypothesisSelector, SpeechHypothesis
+from app.core.turn_metrics import observe_stages
 from app.nlu.intent_refinement.intent_refiner import IntentRefiner
 from app.nlu.intent_resolution.intent import Intent
 from app.nlu.intent_resolution.intent_resolver import resolve_intent
@@ -34,11 +38,74 @@ from app.state_machine.state_router import StateRouter
 from app.menu.repository import MenuRepository
 
 
+@dataclass
+class TurnTrace:
+    """
+    How one turn was processed (written to the turn event log).
+
+    Filled in by process_turn; the runner adds its own stages
+    (load / save / render) to `timings_ms`.
+    """
+    raw_text: str = ""
+    cleaned_text: str = ""
+    normalized_text: str = ""
+    state_before: Optional[str] = None
+    state_after: Optional[str] = None
+    intent: Optional[str] = None
+    refined_intent: Optional[str] = None
+    flow_action: Optional[str] = None
+    effective_intent: Optional[str] = None
+    handler: Optional[str] = None
+    speculative: bool = False
+
+    # stage → milliseconds
+    timings_ms: Dict[str, float] = field(default_factory=dict)
+
+    # Cart delta of this turn
+    cart_added: List[dict] = field(default_factory=list)
+    cart_removed: List[str] = field(default_factory=list)
+
+
+class _StageClock:
+    """
+    Records the time since the previous lap under a stage name.
+    """
+
+    def __init__(self, timings_ms: Dict[str, float]) -> None:
+        self.timings_ms = timings_ms
+        self._last = time.perf_counter()
+
+    def lap(self, stage: str) -> None:
+        now = time.perf_counter()
+        self.timings_ms[stage] = round((now - self._last) * 1000, 3)
+        self._last = now
+
+
 # Internal DTO for Turn Result
 @dataclass
 class TurnOutput:
     response_key: str
     response_payload: Optional[dict] = None
+    trace: Optional[TurnTrace] = None
+
+
+@dataclass(frozen=True)
+class TurnAnalysis:
+    """
+    Pure NLU interpretation of one utterance in one conversation state.
+
+    Depends only on (text, state) and the immutable menu,
+    so it can be computed ahead of the turn (e.g. from partial
+    STT transcripts) and reused by process_turn.
+    """
+    state: ConversationState
+    cleaned_text: str
+    intent_result: IntentResult
+    normalized_text: str
+    refined_intent: Intent
+
+    # NLU stage → milliseconds (cleanup, stt_noise, intent, normalize, refine)
+    timings_ms: Dict[str, float] = field(default_factory=dict, compare=False)
 
 
 class TurnEngine:
@@ -56,6 +123,7 @@ class TurnEngine:
         self.intent_refiner = IntentRefiner(menu_repo)
 
         self.flow_policy = FlowControlPolicy()
+        self.hypothesis_selector = HypothesisSelector(menu_repo)
 
         # Explicit handler registry
         self.handlers = {
@@ -86,118 +154,246 @@ class TurnEngine:
             "waiting_for_quantity_handler": WaitingForQuantityHandler(),
         }
 
+        # Flow control × routing × handlers, compiled once
+        self.decisions = DecisionTable(self.flow_policy, router, self.handlers)
+        # Full report: python -m app.core.decision_table
+        if STATE_TABLE_VERBOSE:
+            print(f"[STATE TABLE] {self.decisions.summary()}")
+
     # app/core/turn_engine.py
 
-    def process_turn(self, session: Session, user_text: str) -> TurnOutput:
+    # --------------------------------------------------
+    # NLU (pure, reusable)
+    # --------------------------------------------------
+
+    @staticmethod
+    def clean_text(user_text: str) -> str:
         """
-        Executes a single conversational turn.
+        Basic cleanup (ASR / text noise).
+        This is the identity used to match speculative analyses.
+        """
+        return clean_stt_noise(basic_cleanup(user_text))
 
-        Responsibilities:
-        - Normalize and resolve intent
-        - Apply flow control (mid-flow governance)
-        - Route to the correct handler
-        - Apply resulting state mutations
+    def analyze(self, user_text: str, state: ConversationState) -> TurnAnalysis:
         """
+        Runs the pure NLU stages for a single utterance.
 
-        # ---------------------------
-        # Preserve raw input for flow-level reasoning
-        # ---------------------------
-        session.conversation_context.last_user_text = user_text
+        No session access and no side effects:
+        safe to run speculatively on partial transcripts.
+        """
+        timings_ms: Dict[str, float] = {}
+        clock = _StageClock(timings_ms)
 
-        # ---------------------------
-        # Basic cleanup (ASR / text noise)
-        # ---------------------------
-        preclean_text = basic_cleanup(user_text)
-        stt_cleaned_text = clean_stt_noise(preclean_text)
+        # Same two steps as clean_text(), timed separately
+        basic_text = basic_cleanup(user_text)
+        clock.lap("cleanup")
+        stt_cleaned_text = clean_stt_noise(basic_text)
+        clock.lap("stt_noise")
 
         # ---------------------------
         # NLU: Intent detection
         # ---------------------------
         intent_result = resolve_intent(
             stt_cleaned_text,
-            state=session.conversation_state,
+            state=state,
         )
+        clock.lap("intent")
 
         normalized_text = self.normalizer.normalize(
             text=stt_cleaned_text,
             intent=intent_result.intent,
-            state=session.conversation_state,
+            state=state,
         )
+        clock.lap("normalize")
 
         refined_intent = self.intent_refiner.refine(
             intent=intent_result.intent,
             normalized_text=normalized_text,
-            state=session.conversation_state,
+            state=state,
+        )
+        clock.lap("refine")
+
+        return TurnAnalysis(
+            state=state,
+            cleaned_text=stt_cleaned_text,
+            intent_result=intent_result,
+            normalized_text=normalized_text,
+            refined_intent=refined_intent,
+            timings_ms=timings_ms,
         )
 
+    def speculate(self, user_text: str, state: ConversationState) -> TurnAnalysis:
+        """
+        Analyzes a (partial) utterance ahead of the real turn and
+        warms the menu resolutions its handler is likely to need.
+
+        Menu results land in MenuRepository's memo, so the handler
+        of the final turn gets them for free when the text matches.
+        """
+        analysis = self.analyze(user_text, state)
+
+        if not analysis.normalized_text:
+            return analysis
+
+        if analysis.refined_intent == Intent.ADD_ITEM:
+            self.menu_repo.resolve_item(analysis.normalized_text)
+        elif analysis.refined_intent in {Intent.ASK_MENU_INFO, Intent.ASK_PRICE}:
+            self.menu_repo.resolve_menu_query(analysis.normalized_text)
+
+        return analysis
+
+    # --------------------------------------------------
+    # Turn execution
+    # --------------------------------------------------
+
+    def process_turn(
+        self,
+        session: Session,
+        user_text: str,
+        analysis: Optional[TurnAnalysis] = None,
+    ) -> TurnOutput:
+        """
+        Executes a single conversational turn.
+
+        Responsibilities:
+        - Normalize and resolve intent
+        - Apply flow control (mid-flow governance)
+        - Route to the correct handler
+        - Apply resulting state mutations
+
+        analysis:
+            Optional precomputed (speculative) NLU result.
+            Reused only if it was computed for the same state
+            and the same cleaned text; otherwise NLU runs again.
+        """
+
+        trace = TurnTrace(
+            raw_text=user_text,
+            state_before=session.conversation_state.name,
+        )
+        clock = _StageClock(trace.timings_ms)
+        cart_before = {item.cart_item_id for item in session.cart.get_items()}
+
         # ---------------------------
-        # FLOW CONTROL (authoritative)
+        # Preserve raw input for flow-level reasoning
         # ---------------------------
-        flow_decision = self.flow_policy.evaluate(
-            state=session.conversation_state,
-            intent=refined_intent,
-            context=session.conversation_context,
-        )
+        session.conversation_context.last_user_text = user_text
+
+        # ---------------------------
+        # NLU (reuse speculation when it still applies)
+        # ---------------------------
+        trace.speculative = self._analysis_applies(analysis, session, user_text)
+        if not trace.speculative:
+            analysis = self.analyze(user_text, session.conversation_state)
+            # Speculative NLU ran off the turn's critical path: not timed here
+            trace.timings_ms.update(analysis.timings_ms)
+
+        intent_result = analysis.intent_result
+        normalized_text = analysis.normalized_text
+        refined_intent = analysis.refined_intent
+
+        trace.cleaned_text = analysis.cleaned_text
+        trace.normalized_text = normalized_text
+        trace.intent = intent_result.intent.name
+        trace.refined_intent = refined_intent.name
+        clock.lap("nlu")
+
+        # ---------------------------
+        # FLOW CONTROL + ROUTING (one table lookup)
+        # ---------------------------
+        state = session.conversation_state
+        decision = self.decisions.decide(state, refined_intent, session.conversation_context)
+        flow_decision = decision.flow
 
         # Slot interaction is contextual, not an intent
         session.conversation_context.slot_interaction = flow_decision.slot_interaction
 
+        trace.flow_action = flow_decision.action.value
+        clock.lap("flow")
+
         # ---------------------------
         # BLOCKED turn (no handler execution)
         # ---------------------------
         if flow_decision.action == FlowAction.BLOCK:
             session.turn_count += 1
-            return TurnOutput(
-                response_key=flow_decision.response_key,
-                response_payload=flow_decision.response_payload,
+            return self._traced(
+                TurnOutput(
+                    response_key=flow_decision.response_key,
+                    response_payload=self.flow_policy.payload_for(
+                        flow_decision, state, session.conversation_context
+                    ),
+                ),
+                trace, session, cart_before,
             )
 
         # ---------------------------
         # CANCELLED flow (reset state)
         # ---------------------------
         if flow_decision.action == FlowAction.CANCEL:
+            response_payload = self.flow_policy.payload_for(
+                flow_decision, state, session.conversation_context
+            )
             session.conversation_context.reset()
             session.conversation_state = ConversationState.IDLE
             session.turn_count += 1
 
-            return TurnOutput(
-                response_key="flow_guard_cancelled",
-                response_payload=flow_decision.response_payload,
+            return self._traced(
+                TurnOutput(
+                    response_key="flow_guard_cancelled",
+                    response_payload=response_payload,
+                ),
+                trace, session, cart_before,
             )
 
         # ---------------------------
         # Intent rewrite (rare but allowed)
         # ---------------------------
-        effective_intent = (
-            flow_decision.effective_intent
-            if flow_decision.action == FlowAction.REWRITE
-            else refined_intent
-        )
+        effective_intent = decision.effective_intent
 
         intent_result = IntentResult(
             intent=effective_intent,
             raw_text=intent_result.raw_text,
         )
+        trace.effective_intent = effective_intent.name
 
         # ---------------------------
-        # ROUTING
+        # ROUTING (precomputed)
         # ---------------------------
-        route = self.router.route(
-            state=session.conversation_state,
-            intent_result=intent_result,
-        )
+        route = decision.route
+
+        clock.lap("route")
 
         if not route.allowed:
             session.turn_count += 1
-            return TurnOutput(
-                response_key="intent_not_allowed",
-                response_payload={
-                    "state": session.conversation_state.name,
-                    "intent": intent_result.intent.name,
-                },
+            return self._traced(
+                TurnOutput(
+                    response_key="intent_not_allowed",
+                    response_payload={
+                        "state": state.name,
+                        "intent": intent_result.intent.name,
+                    },
+                ),
+                trace, session, cart_before,
             )
 
-        handler = self.handlers[route.handler_name]
+        handler = decision.handler
+        trace.handler = route.handler_name
+
+        # Routed to a handler that was never registered (see
+        # DecisionTable.report): answer instead of failing the turn
+        if handler is None:
+            session.turn_count += 1
+            return self._traced(
+                TurnOutput(
+                    response_key=NOT_IMPLEMENTED_RESPONSE,
+                    response_payload={
+                        "state": state.name,
+                        "intent": intent_result.intent.name,
+                        "handler": route.handler_name,
+                    },
+                ),
+                trace, session, cart_before,
+            )
 
         # ---------------------------
         # HANDLER EXECUTION
@@ -208,6 +404,7 @@ class TurnEngine:
             user_text=normalized_text,
             session=session,
         )
+        clock.lap("handler")
 
         # ---------------------------
         # APPLY SIDE EFFECTS
@@ -222,12 +419,103 @@ class TurnEngine:
         session.last_intent = intent_result.intent
         session.last_response_key = result.response_key
         session.turn_count += 1
+        clock.lap("apply")
 
-        return TurnOutput(
-            response_key=result.response_key,
-            response_payload=result.response_payload,
+        return self._traced(
+            TurnOutput(
+                response_key=result.response_key,
+                response_payload=result.response_payload,
+            ),
+            trace, session, cart_before,
         )
 
+    def process_hypotheses(
+        self,
+        session: Session,
+        hypotheses: List[SpeechHypothesis],
+        analysis: Optional[TurnAnalysis] = None,
+    ) -> TurnOutput:
+        """
+        Executes a single turn for several STT alternatives of one utterance.
+
+        All hypotheses are analyzed and scored in one pass
+        (see HypothesisSelector); only the winner mutates the session.
+
+        analysis:
+            Optional precomputed (speculative) NLU result,
+            reused for whichever hypothesis it matches.
+        """
+        if len(hypotheses) == 1:
+            return self.process_turn(session, hypotheses[0].text, analysis=analysis)
+
+        started = time.perf_counter()
+
+        best = self.hypothesis_selector.select(
+            session,
+            hypotheses,
+            clean=self.clean_text,
+            analyze=self.analyze,
+            known=[analysis],
+        )
+
+        selected_ms = round((time.perf_counter() - started) * 1000, 3)
+
+        output = self.process_turn(
+            session,
+            best.hypothesis.text,
+            analysis=best.analysis,
+        )
+        output.trace.timings_ms["select"] = selected_ms
+        observe_stages(output.trace, {"select": selected_ms})
+
+        return output
+
+    def _analysis_applies(
+        self,
+        analysis: Optional[TurnAnalysis],
+        session: Session,
+        user_text: str,
+    ) -> bool:
+        if analysis is None:
+            return False
+
+        if analysis.state != session.conversation_state:
+            return False
+
+        return analysis.cleaned_text == self.clean_text(user_text)
+
+    @staticmethod
+    def _traced(
+        output: TurnOutput,
+        trace: TurnTrace,
+        session: Session,
+        cart_before: set,
+    ) -> TurnOutput:
+        """
+        Completes the trace (final state, cart delta), attaches it and
+        records the engine stage timings (turn_stage_seconds).
+        """
+        trace.state_after = session.conversation_state.name
+
+        items = session.cart.get_items()
+        trace.cart_added = [
+            {
+                "item_id": item.item_id,
+                "quantity": item.quantity,
+                "variant_id": item.variant_id,
+            }
+            for item in items
+            if item.cart_item_id not in cart_before
+        ]
+        trace.cart_removed = sorted(
+            cart_before - {item.cart_item_id for item in items}
+        )
+
+        observe_stages(trace)
+
+        output.trace = trace
+        return output
+
     def _apply_command(self, session: Session, command: dict) -> None:
         command_type = command["type"]
 
@@ -0,0 +1,305 @@
+# app/core/turn_log.py
+
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import glob
+import gzip
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, List, Optional
+
+from app.core.metrics import REGISTRY
+from app.session.cache import current_worker_id
+
+# Opt-in: it writes every caller utterance to local disk
+TURN_LOG_ENABLED = os.getenv("TURN_LOG_ENABLED", "0") == "1"
+TURN_LOG_DIR = os.getenv("TURN_LOG_DIR", "turn_logs")
+
+# A batch is written every N seconds, or as soon as it holds N events
+TURN_LOG_FLUSH_SECONDS = float(os.getenv("TURN_LOG_FLUSH_SECONDS", 1.0))
+TURN_LOG_BATCH_SIZE = int(os.getenv("TURN_LOG_BATCH_SIZE", 256))
+
+# Events beyond this are dropped (the disk must never slow a turn down)
+TURN_LOG_MAX_BUFFERED = int(os.getenv("TURN_LOG_MAX_BUFFERED", 10_000))
+
+# A new segment file is started past this size (compressed) or age
+TURN_LOG_SEGMENT_MAX_BYTES = int(os.getenv("TURN_LOG_SEGMENT_MAX_BYTES", 64 * 1024 * 1024))
+TURN_LOG_SEGMENT_MAX_SECONDS = float(os.getenv("TURN_LOG_SEGMENT_MAX_SECONDS", 60 * 60))
+
+# Retention of closed segments (whole directory, all workers; 0 → no limit):
+# older ones are deleted first, at startup and on every rotation
+TURN_LOG_RETENTION_BYTES = int(os.getenv("TURN_LOG_RETENTION_BYTES", 1024 * 1024 * 1024))
+TURN_LOG_RETENTION_SECONDS = float(os.getenv("TURN_LOG_RETENTION_SECONDS", 7 * 24 * 60 * 60))
+
+SEGMENT_PATTERN = "turns-*.jsonl.gz"
+
+TURN_EVENTS = REGISTRY.counter(
+    "turn_events_total",
+    "Turn event log records by outcome",
+    ("outcome",),
+)
+
+
+class TurnEventLog:
+    """
+    Append-only log of processed turns (call transcript + turn trace).
+
+    Responsibilities:
+    -----------------
+    - Accept turn events from the request path without blocking
+      (record() only appends to an in-memory buffer)
+    - Write them in batches from a background task: JSON lines,
+      gzip-compressed, one gzip member per batch
+    - Rotate segment files by size / age; never rewrite a segment
+    - Retention: delete the oldest closed segments past the directory's
+      size / age budget (TURN_LOG_RETENTION_*)
+
+    Non-responsibilities:
+    ---------------------
+    - Deciding what an event contains (AsyncTurnRunner)
+    - Shipping closed segments elsewhere
+
+    Segments are named turns-<worker>-<opened>-<seq>.jsonl.gz, so
+    several workers can share one directory. A batch that cannot be
+    written is dropped and counted, the turn is never failed.
+    """
+
+    def __init__(
+        self,
+        directory: str = TURN_LOG_DIR,
+        *,
+        flush_seconds: float = TURN_LOG_FLUSH_SECONDS,
+        batch_size: int = TURN_LOG_BATCH_SIZE,
+        max_buffered: int = TURN_LOG_MAX_BUFFERED,
+        segment_max_bytes: int = TURN_LOG_SEGMENT_MAX_BYTES,
+        segment_max_seconds: float = TURN_LOG_SEGMENT_MAX_SECONDS,
+        retention_bytes: int = TURN_LOG_RETENTION_BYTES,
+        retention_seconds: float = TURN_LOG_RETENTION_SECONDS,
+        worker_id: Optional[str] = None,
+    ) -> None:
+        # Absolute: a relative TURN_LOG_DIR must not follow the cwd
+        self.directory = os.path.abspath(directory)
+        self.flush_seconds = flush_seconds
+        self.batch_size = batch_size
+        self.max_buffered = max_buffered
+        self.segment_max_bytes = segment_max_bytes
+        self.segment_max_seconds = segment_max_seconds
+        self.retention_bytes = retention_bytes
+        self.retention_seconds = retention_seconds
+        self.worker_id = worker_id or current_worker_id()
+
+        self._buffer: List[dict] = []
+        self._wakeup = asyncio.Event()
+        self._flusher: Optional[asyncio.Task] = None
+
+        # Segment state is only touched on the writer thread
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="turn-log")
+        self._segment_path: Optional[str] = None
+        self._segment_bytes = 0
+        self._segment_opened = 0.0
+        self._segment_seq = 0
+
+    # -------------------------
+    # Lifecycle
+    # -------------------------
+
+    async def start(self) -> None:
+        if self._flusher is None:
+            os.makedirs(self.directory, exist_ok=True)
+            print(f"[TURN LOG] Writing to {self.directory}")
+
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self._writer, self._prune)
+
+            self._flusher = asyncio.create_task(self._flush_loop())
+
+    async def close(self) -> None:
+        """
+        Stops the flusher and writes what is still buffered.
+        """
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+
+        await self.flush()
+        self._writer.shutdown(wait=True)
+
+    # -------------------------
+    # Request path
+    # -------------------------
+
+    def record(self, event: dict) -> None:
+        """
+        Buffers one event. The event must not be mutated afterwards
+        (it is serialized later, on the writer thread).
+        """
+        if len(self._buffer) >= self.max_buffered:
+            TURN_EVENTS.inc(outcome="dropped")
+            return
+
+        self._buffer.append(event)
+        TURN_EVENTS.inc(outcome="recorded")
+
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    # -------------------------
+    # Flushing
+    # -------------------------
+
+    async def flush(self) -> None:
+        if not self._buffer:
+            return
+
+        batch, self._buffer = self._buffer, []
+
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(self._writer, self._write_batch, batch)
+            TURN_EVENTS.inc(len(batch), outcome="written")
+        except Exception as e:
+            TURN_EVENTS.inc(len(batch), outcome="failed")
+            print(f"[TURN LOG] Dropped {len(batch)} events: {e}")
+
+    async def _flush_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            await self.flush()
+
+    # -------------------------
+    # Writer thread
+    # -------------------------
+
+    def _write_batch(self, batch: List[dict]) -> None:
+        lines = "".join(
+            json.dumps(event, default=_json_default, ensure_ascii=False) + "\n"
+            for event in batch
+        )
+        member = gzip.compress(lines.encode("utf-8"), compresslevel=6)
+
+        path = self._segment_for(len(member))
+        with open(path, "ab") as f:
+            f.write(member)
+
+        self._segment_bytes += len(member)
+
+    def _segment_for(self, size: int) -> str:
+        now = time.time()
+
+        rotate = (
+            self._segment_path is None
+            or self._segment_bytes + size > self.segment_max_bytes
+            or now - self._segment_opened >= self.segment_max_seconds
+        )
+
+        if rotate:
+            self._segment_seq += 1
+            opened = time.strftime("%Y%m%dT%H%M%S", time.gmtime(now))
+            self._segment_path = os.path.join(
+                self.directory,
+                f"turns-{self.worker_id}-{opened}-{self._segment_seq:04d}.jsonl.gz",
+            )
+            self._segment_bytes = 0
+            self._segment_opened = now
+
+            self._prune()
+
+        return self._segment_path
+
+    def _prune(self) -> None:
+        removed = prune_segments(
+            self.directory,
+            max_bytes=self.retention_bytes,
+            max_age_seconds=self.retention_seconds,
+            keep=(self._segment_path,),
+        )
+        if removed:
+            TURN_EVENTS.inc(removed, outcome="segments_pruned")
+
+
+# =================================================
+# Retention
+# =================================================
+
+def prune_segments(
+    directory: str,
+    *,
+    max_bytes: int,
+    max_age_seconds: float,
+    keep: Iterable[Optional[str]] = (),
+) -> int:
+    """
+    Deletes segments last written more than `max_age_seconds` ago, then
+    the oldest ones until the rest fit in `max_bytes` (0 → no limit).
+    Returns how many were deleted.
+    """
+    keep = {path for path in keep if path}
+    segments = []
+    for path in glob.glob(os.path.join(directory, SEGMENT_PATTERN)):
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        segments.append((st.st_mtime, st.st_size, path))
+
+    # Oldest first
+    segments.sort()
+    total = sum(size for _, size, _ in segments)
+    now = time.time()
+    removed = 0
+
+    for mtime, size, path in segments:
+        expired = max_age_seconds > 0 and now - mtime > max_age_seconds
+        over = max_bytes > 0 and total > max_bytes
+        if not (expired or over):
+            break
+        if path in keep:
+            continue
+
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+
+    return removed
+
+
+# =================================================
+# Reading
+# =================================================
+
+def iter_turn_events(directory: str = TURN_LOG_DIR) -> Iterator[dict]:
+    """
+    Every event of every segment in `directory`, segment by segment
+    (each segment in write order). A truncated last batch — a worker
+    killed mid-write — ends its segment instead of failing.
+    """
+    for path in sorted(glob.glob(os.path.join(directory, SEGMENT_PATTERN))):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            try:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+            except (EOFError, gzip.BadGzipFile, json.JSONDecodeError) as e:
+                print(f"[TURN LOG] Truncated segment {path}: {e}")
+
+
+def _json_default(value):
+    if dataclasses.is_dataclass(value):
+        return dataclasses.asdict(value)
+    raise TypeError(f"Not JSON serializable: {type(value).__name__}")
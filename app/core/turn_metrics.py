@@ -0,0 +1,124 @@
+# app/core/turn_metrics.py
+
+from __future__ import annotations
+
+import os
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from app.core.metrics import REGISTRY, Histogram
+
+TURN_STAGE_METRICS_ENABLED = os.getenv("TURN_STAGE_METRICS_ENABLED", "1") == "1"
+
+# Report order. Engine: NLU sub-stages (+ their sum "nlu"), hypothesis
+# selection, flow control, routing, handler, side effects.
+# Runner / replay: queue, load, process, save, render, total.
+STAGE_ORDER = (
+    "cleanup", "stt_noise", "intent", "normalize", "refine", "nlu",
+    "select", "flow", "route", "handler", "apply",
+    "queue", "load", "process", "save", "render", "total",
+)
+
+TURN_STAGE_SECONDS = REGISTRY.histogram(
+    "turn_stage_seconds",
+    "Turn processing time per stage",
+    ("stage", "state", "intent", "handler"),
+)
+
+
+# Synthetic turns (warm-up) are not traffic: see paused()
+_paused = False
+
+
+@contextmanager
+def paused():
+    """
+    Stage timings are not recorded inside the block (single-threaded
+    startup work only).
+    """
+    global _paused
+    _paused = True
+    try:
+        yield
+    finally:
+        _paused = False
+
+
+def observe_stages(trace, timings_ms: Optional[Dict[str, float]] = None) -> None:
+    """
+    Records stage durations (milliseconds) of one turn, labeled by the
+    state the turn started in, the intent acted on and the handler.
+    Defaults to every stage already on the trace.
+    """
+    if not TURN_STAGE_METRICS_ENABLED or _paused or trace is None:
+        return
+
+    state = trace.state_before or "none"
+    intent = trace.effective_intent or trace.refined_intent or "none"
+    handler = trace.handler or "none"
+
+    for stage, ms in (timings_ms if timings_ms is not None else trace.timings_ms).items():
+        TURN_STAGE_SECONDS.observe(
+            ms / 1000,
+            stage=stage,
+            state=state,
+            intent=intent,
+            handler=handler,
+        )
+
+
+def stage_report(
+    group_by: Optional[str] = None,
+    histogram: Histogram = TURN_STAGE_SECONDS,
+    limit: int = 20,
+) -> str:
+    """
+    Human-readable latency table from the stage histogram
+    (quantiles are bucket estimates).
+
+    group_by: "state" | "intent" | "handler" → one row per
+    (stage, label value), slowest p99 first, at most `limit` rows.
+    """
+    label_index = histogram.labelnames.index(group_by) if group_by else None
+
+    rows: List[tuple] = []
+    stages = sorted(
+        {key[0] for key in histogram.series()},
+        key=lambda s: STAGE_ORDER.index(s) if s in STAGE_ORDER else len(STAGE_ORDER),
+    )
+
+    for stage in stages:
+        if label_index is None:
+            groups = [None]
+        else:
+            groups = sorted({k[label_index] for k in histogram.series() if k[0] == stage})
+
+        for group in groups:
+            labels = {"stage": stage}
+            if group is not None:
+                labels[group_by] = group
+
+            count = histogram.count(**labels)
+            if count:
+                rows.append((
+                    stage,
+                    group,
+                    count,
+                    histogram.quantile(0.5, **labels) * 1000,
+                    histogram.quantile(0.9, **labels) * 1000,
+                    histogram.quantile(0.99, **labels) * 1000,
+                ))
+
+    if group_by:
+        rows = sorted(rows, key=lambda r: r[5], reverse=True)[:limit]
+
+    group_title = group_by or ""
+    lines = [
+        f"{'stage':<10}{group_title:<28}{'count':>8}{'~p50 ms':>10}{'~p90 ms':>10}{'~p99 ms':>10}"
+    ]
+    for stage, group, count, p50, p90, p99 in rows:
+        lines.append(
+            f"{stage:<10}{(group or ''):<28}{count:>8}{p50:>10.3f}{p90:>10.3f}{p99:>10.3f}"
+        )
+
+    return "\n".join(lines)
@@ -0,0 +1,293 @@
+# app/core/turn_runner.py
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from app.core.admission import AdmissionController
+from app.core.hypothesis_selector import SpeechHypothesis
+from app.core.metrics import REGISTRY
+from app.core.response_builder import ResponseBuilder
+from app.core.turn_engine import TurnAnalysis, TurnEngine, TurnOutput
+from app.core.turn_log import TurnEventLog
+from app.core.turn_metrics import observe_stages
+from app.session.exceptions import SessionConflictError
+from app.session.session import Session
+
+# Threads for CPU-bound NLU / menu scoring / response rendering
+TURN_EXECUTOR_WORKERS = int(os.getenv("TURN_EXECUTOR_WORKERS", 4))
+
+# Max turns in flight per worker process (queued turns wait on the
+# loop, within the latency budget — see app/core/admission.py)
+MAX_CONCURRENT_TURNS = int(os.getenv("MAX_CONCURRENT_TURNS", 32))
+
+# A turn that loses a save race (overlapping webhooks for one call):
+# "retry" → re-run it on the winner's session, "reject" → give up
+SESSION_CONFLICT_POLICY = os.getenv("SESSION_CONFLICT_POLICY", "retry")
+SESSION_CONFLICT_RETRIES = int(os.getenv("SESSION_CONFLICT_RETRIES", 2))
+
+# Shared with the write-behind cache (app/session/cache.py)
+SESSION_CONFLICTS = REGISTRY.counter(
+    "session_conflicts_total",
+    "Turns that lost an optimistic-concurrency race on save",
+    ("outcome",),
+)
+
+
+# load(session_id, restaurant_id, affinity) — see app/session/cache.py
+LoadFn = Callable[[str, str, Optional[str]], Awaitable[Session]]
+SaveFn = Callable[[Session], Awaitable[None]]
+
+
+@dataclass
+class TurnResult:
+    session: Session
+    output: TurnOutput
+    response_text: str
+    # Stage → ms (queue, load, process, save, render, total)
+    timings_ms: Dict[str, float] = field(default_factory=dict)
+
+
+class AsyncTurnRunner:
+    """
+    Executes turns without blocking the event loop.
+
+    Responsibilities:
+    -----------------
+    - Await session I/O on the loop (async repository)
+    - Offload CPU-bound work (NLU, menu scoring, response rendering)
+      to a bounded thread pool
+    - Bound the number of turns in flight per worker; shed turns that
+      cannot finish within the latency budget (TurnShedError)
+    - Keep endpoint code async and free of blocking calls
+    - Time the turn's stages (turn_stage_seconds) and hand one event
+      per turn to the turn event log (if any)
+
+    Non-responsibilities:
+    ---------------------
+    - Conversational logic (TurnEngine)
+    - Text rendering (ResponseBuilder)
+    """
+
+    def __init__(
+        self,
+        engine: TurnEngine,
+        responder: ResponseBuilder,
+        *,
+        load: LoadFn,
+        save: SaveFn,
+        max_workers: int = TURN_EXECUTOR_WORKERS,
+        max_concurrent_turns: int = MAX_CONCURRENT_TURNS,
+        conflict_policy: str = SESSION_CONFLICT_POLICY,
+        conflict_retries: int = SESSION_CONFLICT_RETRIES,
+        events: Optional[TurnEventLog] = None,
+    ) -> None:
+        if conflict_policy not in ("retry", "reject"):
+            raise ValueError(f"Unknown session conflict policy: {conflict_policy}")
+
+        self.engine = engine
+        self.responder = responder
+
+        self._load = load
+        self._save = save
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="turn",
+        )
+        self.admission = AdmissionController(max_concurrent_turns)
+
+        self._conflict_retries = conflict_retries if conflict_policy == "retry" else 0
+
+        self._events = events
+
+    # =================================================
+    # Public API
+    # =================================================
+
+    async def run_turn(
+        self,
+        session_id: str,
+        restaurant_id: str,
+        hypotheses: List[SpeechHypothesis],
+        analysis: Optional[TurnAnalysis] = None,
+        affinity: Optional[str] = None,
+    ) -> TurnResult:
+        """
+        Load → process → save → render, one turn, off the loop.
+        `affinity` is the caller's session affinity hint, if any.
+
+        If another turn of the same call saved first, the turn is re-run
+        on the fresh session (up to `conflict_retries` times) and then
+        rejected with SessionConflictError. Nothing is overwritten.
+        This covers the write-behind cache too: its save() claims the
+        version in Redis, so a turn overlapping one on another worker
+        fails here, not at write-back.
+
+        Raises TurnShedError (before loading anything) when the worker
+        cannot run the turn within the latency budget.
+        """
+        started = time.perf_counter()
+
+        async with self.admission.slot():
+            timings = {"queue": _elapsed_ms(started)}
+            attempt = 0
+
+            while True:
+                stage = time.perf_counter()
+                session = await self.load_session(session_id, restaurant_id, affinity)
+                timings["load"] = _elapsed_ms(stage)
+
+                stage = time.perf_counter()
+                output = await self.call(
+                    self.engine.process_hypotheses,
+                    session,
+                    hypotheses,
+                    analysis,
+                )
+                timings["process"] = _elapsed_ms(stage)
+
+                try:
+                    stage = time.perf_counter()
+                    await self._save(session)
+                    timings["save"] = _elapsed_ms(stage)
+                    break
+                except SessionConflictError as e:
+                    if attempt >= self._conflict_retries:
+                        SESSION_CONFLICTS.inc(outcome="rejected")
+                        print(f"[TURN] Rejected: {e}")
+                        raise
+
+                    SESSION_CONFLICTS.inc(outcome="retried")
+                    attempt += 1
+
+            stage = time.perf_counter()
+            response_text = await self.call(
+                self.responder.build,
+                output.response_key,
+                session.conversation_context,
+                output.response_payload,
+            )
+            timings["render"] = _elapsed_ms(stage)
+
+        timings["total"] = _elapsed_ms(started)
+        observe_stages(output.trace, timings)
+
+        if self._events is not None:
+            self._record(session, restaurant_id, hypotheses, output, response_text, timings, attempt)
+
+        return TurnResult(
+            session=session,
+            output=output,
+            response_text=response_text,
+            timings_ms=timings,
+        )
+
+    async def run_loaded_turn(
+        self,
+        session: Session,
+        hypotheses: List[SpeechHypothesis],
+        analysis: Optional[TurnAnalysis] = None,
+    ) -> TurnResult:
+        """
+        Process → render, one turn, on a session the caller holds and
+        persists (e.g. a connection-resident session, see
+        app/session/resident.py). Admission, stage timings and the
+        turn event log are as in run_turn.
+        """
+        started = time.perf_counter()
+
+        async with self.admission.slot():
+            timings = {"queue": _elapsed_ms(started)}
+
+            stage = time.perf_counter()
+            output = await self.call(
+                self.engine.process_hypotheses,
+                session,
+                hypotheses,
+                analysis,
+            )
+            timings["process"] = _elapsed_ms(stage)
+
+            stage = time.perf_counter()
+            response_text = await self.call(
+                self.responder.build,
+                output.response_key,
+                session.conversation_context,
+                output.response_payload,
+            )
+            timings["render"] = _elapsed_ms(stage)
+
+        timings["total"] = _elapsed_ms(started)
+        observe_stages(output.trace, timings)
+
+        if self._events is not None:
+            self._record(session, session.restaurant_id, hypotheses, output, response_text, timings, 0)
+
+        return TurnResult(
+            session=session,
+            output=output,
+            response_text=response_text,
+            timings_ms=timings,
+        )
+
+    async def load_session(
+        self,
+        session_id: str,
+        restaurant_id: str,
+        affinity: Optional[str] = None,
+    ) -> Session:
+        return await self._load(session_id, restaurant_id, affinity)
+
+    async def call(self, fn: Callable, *args, **kwargs):
+        """
+        Runs a blocking callable on the turn executor.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor,
+            partial(fn, *args, **kwargs),
+        )
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    # =================================================
+    # Internals
+    # =================================================
+
+    def _record(
+        self,
+        session: Session,
+        restaurant_id: str,
+        hypotheses: List[SpeechHypothesis],
+        output: TurnOutput,
+        response_text: str,
+        timings: dict,
+        retries: int,
+    ) -> None:
+        trace = output.trace
+        if trace is not None:
+            trace.timings_ms.update(timings)
+
+        self._events.record({
+            "ts": time.time(),
+            "session_id": session.session_id,
+            "restaurant_id": restaurant_id,
+            "turn": session.turn_count,
+            "hypotheses": [[h.text, h.confidence, h.partial] for h in hypotheses],
+            "response_key": output.response_key,
+            "response_text": response_text,
+            "retries": retries,
+            "trace": trace,
+        })
+
+
+def _elapsed_ms(since: float) -> float:
+    return round((time.perf_counter() - since) * 1000, 3)
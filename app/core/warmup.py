@@ -0,0 +1,236 @@
+# app/core/warmup.py
+"""
+Startup warm-up of the turn hot path.
+
+The first call after a deploy otherwise pays for what steady-state
+calls find ready: first-touch growth of the menu / NLU caches, the
+slot prompt cache, the session codec's first encode and the session
+store's connection setup. The lifespan runs a set of synthetic calls
+through TurnEngine.process_turn / process_hypotheses and
+ResponseBuilder.build against in-memory sessions (nothing is stored),
+opens the session store's connections, and only then reports ready
+(GET /healthz/ready).
+
+Responsibilities:
+-----------------
+- Synthetic calls (WARMUP_SCRIPT or the built-in set) through the
+  engine, the responder and the session codec
+- Pre-opening the session store (Redis pool + CAS script)
+
+Non-responsibilities:
+---------------------
+- Readiness state / endpoint (twilio_server)
+- Stage metrics: warm-up turns are not recorded
+
+Usage:
+    python -m app.core.warmup     # first call vs steady state, cold and warm
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+from app.core.hypothesis_selector import SpeechHypothesis
+from app.core.response_builder import ResponseBuilder
+from app.core.turn_engine import TurnEngine
+from app.core.turn_metrics import paused
+from app.session.codec import SessionCodec
+from app.session.session import Session
+
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "1") == "1"
+
+# Text file of synthetic calls: one utterance per line, calls
+# separated by a blank line (default: WARMUP_CALLS)
+WARMUP_SCRIPT = os.getenv("WARMUP_SCRIPT")
+
+# Times the call set is replayed
+WARMUP_ROUNDS = int(os.getenv("WARMUP_ROUNDS", 2))
+
+# Session store connections opened before ready (capped by the pool)
+WARMUP_STORE_CONNECTIONS = int(os.getenv("WARMUP_STORE_CONNECTIONS", 4))
+
+# Covers every handler a caller reaches in the first turns:
+# ordering with side / modifier / quantity slots, cart overlays,
+# menu info, prices, removal, cancel, checkout and payment
+WARMUP_CALLS: List[List[str]] = [
+    [
+        "i want a chicken taco",
+        "what are my options",
+        "coke",
+        "no",
+        "two",
+        "what's in my cart",
+        "that's all",
+        "yes",
+        "i paid",
+    ],
+    [
+        "what drinks do you have",
+        "how much is the burrito",
+        "add a burrito",
+        "skip",
+        "no",
+        "one",
+        "show me the menu",
+        "remove the burrito",
+        "yes",
+    ],
+    [
+        "hello",
+        "i'd like a burger with fries",
+        "cancel",
+        "yes",
+        "what's my total",
+        "clear my cart",
+        "blah blah",
+    ],
+]
+
+# STT alternatives for process_hypotheses (multi-hypothesis webhooks)
+WARMUP_HYPOTHESES: List[List[SpeechHypothesis]] = [
+    [SpeechHypothesis("i want a chicken taco", 0.8), SpeechHypothesis("i want a chicken tackle", 0.6)],
+    [SpeechHypothesis("coke", 0.7), SpeechHypothesis("cook", 0.5)],
+]
+
+
+@dataclass
+class WarmupReport:
+    calls: int = 0
+    turns: int = 0
+    errors: int = 0
+    store_connections: int = 0
+    seconds: float = 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.calls} calls / {self.turns} turns in {self.seconds * 1000:.0f} ms, "
+            f"{self.errors} errors, {self.store_connections} store connections"
+        )
+
+
+def load_warmup_calls(path: Optional[str] = WARMUP_SCRIPT) -> List[List[str]]:
+    if not path:
+        return WARMUP_CALLS
+
+    calls, call = [], []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            text = line.strip()
+            if text:
+                call.append(text)
+            elif call:
+                calls.append(call)
+                call = []
+    if call:
+        calls.append(call)
+    return calls
+
+
+def warm_engine(
+    engine: TurnEngine,
+    responder: ResponseBuilder,
+    calls: Sequence[Sequence[str]],
+    *,
+    codec: Optional[SessionCodec] = None,
+    rounds: int = WARMUP_ROUNDS,
+    restaurant_id: str = "demo",
+    report: Optional[WarmupReport] = None,
+) -> WarmupReport:
+    """
+    Runs `calls` through the engine and the responder (and the codec).
+    A failing turn ends its call and is counted, never raised: warm-up
+    must not keep a worker from starting.
+    """
+    report = report or WarmupReport()
+
+    with paused():
+        for round_no in range(rounds):
+            for n, call in enumerate(calls):
+                session = Session(session_id=f"warmup-{round_no}-{n}", restaurant_id=restaurant_id)
+                report.calls += 1
+                try:
+                    for text in call:
+                        _turn(engine, responder, session, engine.process_turn(session, text))
+                        report.turns += 1
+                        if codec is not None:
+                            codec.decode(codec.encode(session))
+                except Exception as e:
+                    report.errors += 1
+                    print(f"[WARMUP] call {n} failed: {type(e).__name__}: {e}")
+
+            for n, hypotheses in enumerate(WARMUP_HYPOTHESES):
+                session = Session(session_id=f"warmup-{round_no}-h{n}", restaurant_id=restaurant_id)
+                try:
+                    _turn(engine, responder, session, engine.process_hypotheses(session, hypotheses))
+                    report.turns += 1
+                except Exception as e:
+                    report.errors += 1
+                    print(f"[WARMUP] hypotheses {n} failed: {type(e).__name__}: {e}")
+
+    return report
+
+
+async def warm_store(backend, connections: int = WARMUP_STORE_CONNECTIONS) -> int:
+    """
+    Pre-opens the session store (backends with warm(), e.g. Redis);
+    others are pinged. Returns the connections opened.
+    """
+    warm = getattr(backend, "warm", None)
+    if warm is not None:
+        return await warm(connections)
+
+    await backend.ping()
+    return 0
+
+
+def _turn(engine: TurnEngine, responder: ResponseBuilder, session: Session, output) -> None:
+    responder.build(output.response_key, session.conversation_context, output.response_payload)
+
+
+# =================================================
+# First call vs steady state
+# =================================================
+
+def _call_ms(engine: TurnEngine, responder: ResponseBuilder, call: Sequence[str], session_id: str) -> float:
+    session = Session(session_id=session_id, restaurant_id="demo")
+    started = time.perf_counter()
+    for text in call:
+        _turn(engine, responder, session, engine.process_turn(session, text))
+    return (time.perf_counter() - started) * 1000
+
+
+def main() -> None:
+    import subprocess
+    import sys
+
+    if "--child" in sys.argv:
+        from app.api.prefork import build_serving_core
+
+        core = build_serving_core()
+        if sys.argv[-1] == "warm":
+            warm_engine(core.engine, core.responder, load_warmup_calls())
+
+        # Not in WARMUP_CALLS: no text-keyed cache has seen it
+        call = ["can i get a chicken taco", "sprite", "no", "three", "show my cart", "that's it"]
+        first = _call_ms(core.engine, core.responder, call, "first")
+        steady = sorted(_call_ms(core.engine, core.responder, call, f"s{n}") for n in range(50))[25]
+        print(f"{first:.2f} {steady:.2f}")
+        return
+
+    print(f"{'':<10}{'first call ms':>15}{'steady ms':>11}")
+    for mode in ("cold", "warm"):
+        done = subprocess.run(
+            [sys.executable, "-m", "app.core.warmup", "--child", mode],
+            capture_output=True, text=True, check=True,
+        )
+        first, steady = done.stdout.split()[-2:]
+        print(f"{mode:<10}{float(first):>15.2f}{float(steady):>11.2f}")
+    print()
+    print("one 6-turn call (engine + responder), not in the warm-up set; steady = median of 50")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,16 @@
 # app/menu/repository.py
 
+from collections import OrderedDict
+from threading import Lock
+
 from app.menu.query_result import MenuQueryResult, MenuQueryType
 from app.menu.store import MenuStore
 from app.menu.models import *
 from app.utils.item_matching import score_item
 
+# Sentinel for memo misses (None is a valid cached resolution)
+_MISS = object()
+
 
 class MenuRepository:
     """
@@ -34,9 +40,54 @@ class MenuRepository:
     - Perform conversational logic
     """
 
-    def __init__(self, store: MenuStore):
+    def __init__(self, store: MenuStore, *, resolution_cache_size: int = 1024):
         self.store = store
 
+        # Bounded memo of resolution results, valid for one MenuStore:
+        # a replaced self.store (menu reload) empties it, and results
+        # computed against the old store are not kept.
+        # Lets speculative NLU (partial transcripts) warm the final turn.
+        self._resolution_cache_size = resolution_cache_size
+        self._resolution_cache: "OrderedDict[tuple, object]" = OrderedDict()
+        self._resolution_store = store
+        self._resolution_lock = Lock()
+
+    # =================================================
+    # Resolution memo
+    # =================================================
+
+    def invalidate_cache(self) -> None:
+        """
+        Drop memoized resolutions (call after reloading the menu).
+        A replaced self.store is also detected on the next lookup.
+        """
+        with self._resolution_lock:
+            self._resolution_cache.clear()
+            self._resolution_store = self.store
+
+    def _memo_get(self, key: tuple, store: MenuStore):
+        with self._resolution_lock:
+            if store is not self._resolution_store:
+                self._resolution_cache.clear()
+                self._resolution_store = store
+                return _MISS
+            if key not in self._resolution_cache:
+                return _MISS
+            self._resolution_cache.move_to_end(key)
+            return self._resolution_cache[key]
+
+    def _memo_put(self, key: tuple, value, store: MenuStore) -> None:
+        if self._resolution_cache_size <= 0:
+            return
+
+        with self._resolution_lock:
+            if store is not self._resolution_store:
+                return
+            self._resolution_cache[key] = value
+            self._resolution_cache.move_to_end(key)
+            while len(self._resolution_cache) > self._resolution_cache_size:
+                self._resolution_cache.popitem(last=False)
+
     # =================================================
     # Item Resolution
     # =================================================
@@ -52,8 +103,20 @@ class MenuRepository:
         3. Select the highest-scoring item above confidence threshold
 
         This method NEVER short-circuits early.
+        Results are memoized per text (see _memo_get).
         """
 
+        key = ("item", text)
+        store = self.store
+        cached = self._memo_get(key, store)
+        if cached is not _MISS:
+            return cached
+
+        resolution = self._resolve_item(text)
+        self._memo_put(key, resolution, store)
+        return resolution
+
+    def _resolve_item(self, text: str) -> Optional[ItemResolution]:
         candidates: Dict[str, MenuItem] = {}
 
         # -------------------------------------------------
@@ -116,6 +179,17 @@ class MenuRepository:
         5. Weak fallback
         """
 
+        key = ("menu_query", text, limit)
+        store = self.store
+        cached = self._memo_get(key, store)
+        if cached is not _MISS:
+            return cached
+
+        result = self._resolve_menu_query(text, limit=limit)
+        self._memo_put(key, result, store)
+        return result
+
+    def _resolve_menu_query(self, text: str, *, limit: int) -> MenuQueryResult:
         norm_text = text.strip().lower()
         tokens = set(norm_text.split())
 
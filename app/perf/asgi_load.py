@@ -0,0 +1,371 @@
+# app/perf/asgi_load.py
+"""
+In-process load test of the Twilio webhook server.
+
+Drives app.api.twilio_server:app through raw ASGI calls (no sockets,
+no HTTP client) with N concurrent simulated callers. Each caller posts
+the same form bodies Twilio does: /voice, then for every utterance of
+the scenario a few /partial_speech callbacks and the final
+/process_speech, following the Gather action URL (turn sequence) and
+the affinity cookie from each response.
+
+Redis is replaced by an in-process session backend that still pays
+encoding and a simulated round trip per call.
+
+Reports per concurrency level: throughput, p50/p95/p99 latency per
+endpoint, non-200 responses, and event-loop lag.
+
+Usage:
+    python -m app.perf.asgi_load --callers 1 10 50 100 --redis-latency-ms 1
+    python -m app.perf.asgi_load --callers 200 --scenario calls.txt --think-ms 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import re
+import statistics
+import tempfile
+import time
+from collections import defaultdict
+from html import unescape
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+from app.session.session import Session
+
+# One complete order: item → side → two modifier groups → quantity →
+# cart → checkout
+SCENARIO = [
+    "i want a chicken taco",
+    "coke",
+    "no",
+    "no",
+    "one",
+    "what's in my cart",
+    "that's all",
+    "yes",
+]
+
+# Loop-lag probe interval
+PROBE_INTERVAL_S = 0.005
+
+_ACTION = re.compile(r'<Gather[^>]*\saction="([^"]+)"')
+
+
+# =================================================
+# Redis stand-in
+# =================================================
+
+class SimulatedLatencyBackend:
+    """
+    Wraps a session backend and adds a fixed round-trip delay per call.
+    """
+
+    def __init__(self, inner, latency_s: float) -> None:
+        self.inner = inner
+        self.latency_s = latency_s
+        self.codec = inner.codec
+        self.supports_delta_writes = False
+
+    async def load(self, session_id: str, restaurant_id: str, affinity: Optional[str] = None) -> Session:
+        await self._round_trip()
+        return await self.inner.load(session_id, restaurant_id, affinity)
+
+    async def save(self, session: Session) -> None:
+        await self._round_trip()
+        await self.inner.save(session)
+
+    async def read_version(self, session_id: str) -> Optional[int]:
+        await self._round_trip()
+        return await self.inner.read_version(session_id)
+
+    async def ping(self) -> bool:
+        return await self.inner.ping()
+
+    async def close(self) -> None:
+        await self.inner.close()
+
+    async def _round_trip(self) -> None:
+        if self.latency_s:
+            await asyncio.sleep(self.latency_s)
+
+
+# =================================================
+# Raw ASGI client
+# =================================================
+
+async def asgi_post(
+    app,
+    path: str,
+    form: Dict[str, str],
+    *,
+    query: str = "",
+    cookies: Optional[Dict[str, str]] = None,
+) -> Tuple[int, List[Tuple[bytes, bytes]], bytes]:
+    """
+    One form POST straight into the ASGI app.
+    Returns (status, headers, body).
+    """
+    body = urlencode(form).encode("utf-8")
+
+    headers = [
+        (b"host", b"loadtest"),
+        (b"content-type", b"application/x-www-form-urlencoded"),
+        (b"content-length", str(len(body)).encode("ascii")),
+    ]
+    if cookies:
+        cookie = "; ".join(f"{k}={v}" for k, v in cookies.items())
+        headers.append((b"cookie", cookie.encode("utf-8")))
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode("utf-8"),
+        "query_string": query.encode("utf-8"),
+        "root_path": "",
+        "headers": headers,
+        "client": ("127.0.0.1", 0),
+        "server": ("loadtest", 80),
+    }
+
+    request_sent = False
+    response_done = asyncio.Event()
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await response_done.wait()
+        return {"type": "http.disconnect"}
+
+    status = 0
+    response_headers: List[Tuple[bytes, bytes]] = []
+    chunks: List[bytes] = []
+
+    async def send(message):
+        nonlocal status, response_headers
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            response_headers = list(message.get("headers", []))
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                response_done.set()
+
+    await app(scope, receive, send)
+    return status, response_headers, b"".join(chunks)
+
+
+def _update_cookies(cookies: Dict[str, str], headers: List[Tuple[bytes, bytes]]) -> None:
+    for name, value in headers:
+        if name.lower() == b"set-cookie":
+            pair = value.decode("latin-1").split(";", 1)[0]
+            key, _, val = pair.partition("=")
+            cookies[key.strip()] = val.strip().strip('"')
+
+
+def _next_action(body: bytes) -> Tuple[str, str]:
+    """
+    (path, query) of the Gather action in a TwiML response.
+    """
+    match = _ACTION.search(body.decode("utf-8"))
+    if not match:
+        return "/process_speech", ""
+    url = urlsplit(unescape(match.group(1)))
+    return url.path, url.query
+
+
+# =================================================
+# Simulated caller
+# =================================================
+
+class Stats:
+    def __init__(self) -> None:
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def record(self, endpoint: str, status: int, seconds: float) -> None:
+        self.latencies[endpoint].append(seconds)
+        if status >= 400:
+            self.errors[endpoint] += 1
+
+
+async def caller(app, call_sid: str, scenario: List[str], stats: Stats, args) -> None:
+    cookies: Dict[str, str] = {}
+    think_s = args.think_ms / 1000
+
+    started = time.perf_counter()
+    status, headers, body = await asgi_post(
+        app, "/voice",
+        {"CallSid": call_sid, "From": "+15550100", "To": "+15550199", "CallStatus": "ringing"},
+        cookies=cookies,
+    )
+    stats.record("voice", status, time.perf_counter() - started)
+    _update_cookies(cookies, headers)
+
+    action_path, action_query = _next_action(body)
+
+    for text in scenario:
+        # Caller speaking: partial transcripts arrive first
+        words = text.split()
+        for n in range(1, min(args.partials, len(words)) + 1):
+            prefix = " ".join(words[: max(1, len(words) * n // (args.partials + 1))])
+            started = time.perf_counter()
+            status, _, _ = await asgi_post(
+                app, "/partial_speech",
+                {"CallSid": call_sid, "UnstableSpeechResult": prefix, "StableSpeechResult": ""},
+                cookies=cookies,
+            )
+            stats.record("partial_speech", status, time.perf_counter() - started)
+
+        started = time.perf_counter()
+        status, headers, body = await asgi_post(
+            app, action_path,
+            {"CallSid": call_sid, "SpeechResult": text, "Confidence": "0.92"},
+            query=action_query,
+            cookies=cookies,
+        )
+        stats.record("process_speech", status, time.perf_counter() - started)
+        _update_cookies(cookies, headers)
+
+        action_path, action_query = _next_action(body)
+
+        if think_s:
+            await asyncio.sleep(think_s)
+
+
+async def _probe_loop_lag(stop: asyncio.Event, lags: List[float]) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL_S)
+        lags.append(time.perf_counter() - started - PROBE_INTERVAL_S)
+
+
+def _shed_count() -> float:
+    from app.core.admission import TURN_ADMISSION
+    return sum(
+        TURN_ADMISSION.value(outcome=outcome)
+        for outcome in ("shed_queue_full", "shed_budget", "shed_timeout")
+    )
+
+
+async def run_level(app, level: int, run_id: int, scenario: List[str], args) -> dict:
+    stats = Stats()
+    shed_before = _shed_count()
+    lags: List[float] = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_probe_loop_lag(stop, lags))
+
+    started = time.perf_counter()
+    await asyncio.gather(*[
+        caller(app, f"CA{run_id:04d}{level:05d}{n:06d}", scenario, stats, args)
+        for n in range(level)
+    ])
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await probe
+
+    requests = sum(len(v) for v in stats.latencies.values())
+    speech = stats.latencies["process_speech"]
+
+    return {
+        "callers": level,
+        "requests": requests,
+        "req_per_s": requests / elapsed,
+        "turns_per_s": len(speech) / elapsed,
+        "latency_ms": {
+            endpoint: (_pct(values, 50), _pct(values, 95), _pct(values, 99))
+            for endpoint, values in stats.latencies.items()
+        },
+        "errors": sum(stats.errors.values()),
+        # Turns answered with "one moment please" (admission control)
+        "shed": int(_shed_count() - shed_before),
+        "loop_lag_p99_ms": _pct(lags, 99),
+        "loop_lag_max_ms": max(lags) * 1000 if lags else 0.0,
+    }
+
+
+def _pct(values: List[float], pct: int) -> float:
+    if not values:
+        return 0.0
+    if len(values) == 1:
+        return values[0] * 1000
+    return statistics.quantiles(values, n=100, method="inclusive")[pct - 1] * 1000
+
+
+# =================================================
+# Driver
+# =================================================
+
+async def run(args, scenario: List[str]) -> List[dict]:
+    # Imported here: the server reads its configuration at import time
+    from app.api.twilio_server import app, lifespan
+    from app.cli.main import load_menu_store
+    from app.session.backends.memory_backend import MemorySessionBackend
+    from app.session.codec import build_session_codec
+
+    app.state.session_backend = SimulatedLatencyBackend(
+        MemorySessionBackend(codec=build_session_codec(load_menu_store("demo"))),
+        args.redis_latency_ms / 1000,
+    )
+
+    results = []
+    async with lifespan(app):
+        for run_id, level in enumerate(args.callers):
+            results.append(await run_level(app, level, run_id, scenario, args))
+
+    return results
+
+
+def print_results(results: List[dict]) -> None:
+    print(
+        f"{'callers':>8}{'requests':>10}{'req/s':>9}{'turns/s':>9}"
+        f"{'speech p50':>12}{'p95':>9}{'p99':>9}{'voice p99':>11}"
+        f"{'errors':>8}{'shed':>7}{'lag p99':>9}{'lag max':>9}"
+    )
+    for r in results:
+        speech = r["latency_ms"].get("process_speech", (0.0, 0.0, 0.0))
+        voice = r["latency_ms"].get("voice", (0.0, 0.0, 0.0))
+        print(
+            f"{r['callers']:>8}{r['requests']:>10}{r['req_per_s']:>9.1f}{r['turns_per_s']:>9.1f}"
+            f"{speech[0]:>12.2f}{speech[1]:>9.2f}{speech[2]:>9.2f}{voice[2]:>11.2f}"
+            f"{r['errors']:>8}{r['shed']:>7}{r['loop_lag_p99_ms']:>9.2f}{r['loop_lag_max_ms']:>9.2f}"
+        )
+    print()
+    print("latencies and loop lag in ms")
+
+
+def load_scenario(path: Optional[str]) -> List[str]:
+    if not path:
+        return SCENARIO
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="In-process ASGI load test of the Twilio webhooks")
+    parser.add_argument("--callers", type=int, nargs="+", default=[1, 10, 50, 100])
+    parser.add_argument("--scenario", help="text file, one caller utterance per line")
+    parser.add_argument("--redis-latency-ms", type=float, default=1.0)
+    parser.add_argument("--partials", type=int, default=2, help="partial transcripts per utterance")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="pause between turns")
+    args = parser.parse_args()
+
+    # Keep the turn event log of the run out of the working directory
+    os.environ.setdefault("TURN_LOG_DIR", tempfile.mkdtemp(prefix="asgi_load_turns_"))
+
+    results = asyncio.run(run(args, load_scenario(args.scenario)))
+    print_results(results)
+
+
+if __name__ == "__main__":
+    main()
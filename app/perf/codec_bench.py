@@ -0,0 +1,163 @@
+# app/perf/codec_bench.py
+"""
+Session codec benchmark: legacy JSON vs compact binary.
+
+Builds realistic sessions from the demo menu (mid-flow context plus
+carts of increasing size) and reports encoded size and encode/decode
+timings per codec.
+
+Also replays a long scripted catering call through the TurnEngine and
+compares bytes written per turn: full SET of the session vs. the
+hash delta (changed fields only).
+
+Usage:
+    python -m app.perf.codec_bench --cart-sizes 0 3 10 30 --iterations 2000
+    python -m app.perf.codec_bench --catering-items 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import List
+
+from app.cart.cart_item import CartItem
+from app.cli.main import load_menu_store
+from app.core.turn_engine import TurnEngine
+from app.menu.repository import MenuRepository
+from app.menu.store import MenuStore
+from app.nlu.intent_resolution.intent import Intent
+from app.session.codec import BinarySessionCodec, JsonSessionCodec, MenuIdInterner
+from app.session.session import Session
+from app.state_machine.conversation_state import ConversationState
+from app.state_machine.state_router import StateRouter
+
+# One catering line item: add → side → no modifiers → quantity
+CATERING_ITEM_SCRIPT = [
+    "i want a chicken taco",
+    "coke",
+    "no",
+    "two",
+]
+
+
+def build_session(store: MenuStore, cart_size: int) -> Session:
+    """
+    Session mid-way through building an item, with `cart_size` items
+    (each with its first side / modifier choices) already in the cart.
+    """
+    items = [i for i in store.items.values() if i.side_groups or i.modifier_groups]
+    items = items or list(store.items.values())
+
+    session = Session(session_id="CA" + "0" * 32, restaurant_id="demo")
+    session.conversation_state = ConversationState.WAITING_FOR_MODIFIER
+    session.turn_count = 2 * cart_size + 3
+    session.last_intent = Intent.ADD_ITEM
+    session.last_response_key = "ask_for_modifier"
+
+    for n in range(cart_size):
+        item = items[n % len(items)]
+        session.cart.add_item(
+            CartItem.create(
+                item_id=item.item_id,
+                quantity=1 + n % 3,
+                variant_id=item.pricing.variants[0].variant_id if item.pricing.variants else None,
+                sides={g.group_id: [g.choices[0].item_id] for g in item.side_groups if g.choices},
+                modifiers={g.group_id: [g.choices[0].modifier_id] for g in item.modifier_groups if g.choices},
+            )
+        )
+
+    current = items[0]
+    ctx = session.conversation_context
+    ctx.current_item_id = current.item_id
+    ctx.current_item_name = current.name
+    ctx.pending_action = "add"
+    ctx.current_side_group_index = len(current.side_groups)
+    ctx.selected_side_groups = {
+        g.group_id: [g.choices[0].item_id] for g in current.side_groups if g.choices
+    }
+
+    return session
+
+
+def catering_write_volume(store: MenuStore, items: int) -> None:
+    """
+    Bytes sent to Redis per turn: full SET (JSON / binary) vs. hash delta.
+    """
+    codec = BinarySessionCodec(MenuIdInterner(store))
+    json_codec = JsonSessionCodec()
+    engine = TurnEngine(StateRouter(), MenuRepository(store))
+    session = Session(session_id="CA" + "1" * 32, restaurant_id="demo")
+
+    script = CATERING_ITEM_SCRIPT * items + ["show my cart", "that's all"]
+    json_total = full_total = delta_total = 0
+
+    for text in script:
+        engine.process_turn(session, text)
+
+        json_total += len(json_codec.encode(session))
+        full_total += len(codec.encode(session))
+
+        write = codec.encode_changes(session)
+        delta_total += sum(len(k) + len(v) for k, v in write.fields.items())
+        delta_total += sum(len(k) for k in write.delete)
+        session.mark_clean()
+
+    turns = len(script)
+    print(
+        f"\ncatering call: {turns} turns, {len(session.cart.get_items())} cart lines\n"
+        f"  JSON SET   : {json_total:>8} B total  {json_total / turns:>8.0f} B/turn\n"
+        f"  binary SET : {full_total:>8} B total  {full_total / turns:>8.0f} B/turn\n"
+        f"  hash delta : {delta_total:>8} B total  {delta_total / turns:>8.0f} B/turn"
+        f"  ({delta_total / full_total:.2f}x)"
+    )
+
+
+def _time_per_op(fn, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Session codec benchmark")
+    parser.add_argument("--restaurant", default="demo")
+    parser.add_argument("--cart-sizes", type=int, nargs="+", default=[0, 3, 10, 30])
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--catering-items", type=int, default=20)
+    args = parser.parse_args()
+
+    store = load_menu_store(args.restaurant)
+    codecs = [
+        ("json", JsonSessionCodec()),
+        ("binary", BinarySessionCodec(MenuIdInterner(store))),
+    ]
+
+    print(f"{'cart':>5}  {'codec':<7}{'bytes':>8}{'ratio':>8}{'encode µs':>12}{'decode µs':>12}")
+
+    for cart_size in args.cart_sizes:
+        session = build_session(store, cart_size)
+        baseline: List[int] = []
+
+        for name, codec in codecs:
+            raw = codec.encode(session)
+            assert codec.decode(raw).cart.to_dict() == session.cart.to_dict()
+
+            if not baseline:
+                baseline.append(len(raw))
+
+            encode_us = _time_per_op(lambda: codec.encode(session), args.iterations)
+            decode_us = _time_per_op(lambda: codec.decode(raw), args.iterations)
+
+            print(
+                f"{cart_size:>5}  {name:<7}{len(raw):>8}{len(raw) / baseline[0]:>8.2f}"
+                f"{encode_us:>12.1f}{decode_us:>12.1f}"
+            )
+
+    if args.catering_items:
+        catering_write_volume(store, args.catering_items)
+
+
+if __name__ == "__main__":
+    main()
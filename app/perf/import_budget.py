@@ -0,0 +1,250 @@
+# app/perf/import_budget.py
+"""
+Cold-start budget: what importing the entry points costs.
+
+Each module is imported in a fresh interpreter under `-X importtime`
+(best of --runs). The check fails (exit code 1) when:
+- the import takes longer than IMPORT_BUDGET_MS, or app/ modules
+  spend more than IMPORT_APP_BUDGET_MS in their own bodies
+- a module that belongs off the import path gets imported
+  (session backends, test / UI routes, TTS engines, ...)
+- app code does I/O while being imported (files, sockets, SQLite,
+  subprocesses; seen through an audit hook)
+
+Interpreter startup (site, .pth files) is not counted: only what the
+import of the module itself pulls in.
+
+Usage:
+    python -m app.perf.import_budget
+    python -m app.perf.import_budget --modules app.cli.main --runs 5 --top 15
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# Budgets per entry point (machine dependent: set them for the CI box)
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", 900))
+IMPORT_APP_BUDGET_MS = float(os.getenv("IMPORT_APP_BUDGET_MS", 150))
+
+DEFAULT_MODULES = ("app.api.twilio_server", "app.cli.main")
+
+# Imported on demand only (lifespan, factories), never by an import
+OFF_IMPORT_PATH = (
+    "twilio",
+    "redis",
+    "sqlite3",
+    "app.session.backends.redis_backend",
+    "app.session.backends.memory_backend",
+    "app.session.backends.sqlite_backend",
+    "app.api.test_chat",
+    "app.api.ui.ui",
+    "app.tts.stub_engine",
+)
+
+# Per entry point, on top of OFF_IMPORT_PATH
+ENTRY_POINT_FORBIDDEN = {
+    "app.cli.main": ("fastapi", "starlette", "pydantic"),
+}
+
+IO_EVENTS = (
+    "open",
+    "socket.connect",
+    "socket.getaddrinfo",
+    "sqlite3.connect",
+    "subprocess.Popen",
+)
+
+# Runs in the child: records I/O whose innermost caller outside the
+# stdlib is app code (not the import system loading a module, not a
+# third-party package), then imports the module. Events go to stdout
+# as JSON.
+_CHILD = r"""
+import json, sys, sysconfig
+root = {root!r}
+paths = sysconfig.get_paths()
+packages = (paths["purelib"], paths["platlib"])
+stdlib = (paths["stdlib"], paths["platstdlib"])
+events = []
+def hook(event, args):
+    if event not in {events!r}:
+        return
+    frame = sys._getframe(1)
+    while frame is not None:
+        path = frame.f_code.co_filename
+        if path.startswith(("<frozen importlib", "<frozen zipimport")) or path.startswith(packages):
+            return
+        if not (path.startswith("<") or path.startswith(stdlib)):
+            if path.startswith(root):
+                events.append([event, str(args[0] if args else "")[:200], path, frame.f_lineno])
+            return
+        frame = frame.f_back
+sys.addaudithook(hook)
+import {module}
+print(json.dumps(events))
+"""
+
+
+@dataclass
+class ImportProfile:
+    module: str
+    total_us: int = 0
+    # name → (self µs, cumulative µs), best of runs
+    modules: Dict[str, Tuple[int, int]] = field(default_factory=dict)
+    # direct imports of the module → cumulative µs
+    direct: Dict[str, int] = field(default_factory=dict)
+    io: List[list] = field(default_factory=list)
+
+    @property
+    def app_self_us(self) -> int:
+        return sum(s for name, (s, _) in self.modules.items() if _is_app(name))
+
+    def top_app(self, n: int) -> List[Tuple[str, int]]:
+        ranked = sorted(
+            ((name, s) for name, (s, _) in self.modules.items() if _is_app(name)),
+            key=lambda pair: -pair[1],
+        )
+        return ranked[:n]
+
+    def top_level(self, n: int) -> List[Tuple[str, int]]:
+        """
+        Largest direct imports (cumulative), e.g. fastapi.
+        """
+        return sorted(self.direct.items(), key=lambda pair: -pair[1])[:n]
+
+
+def _is_app(name: str) -> bool:
+    return name == "app" or name.startswith("app.")
+
+
+def parse_importtime(stderr: str, module: str) -> List[Tuple[str, int, int, int]]:
+    """
+    (name, depth, self µs, cumulative µs) of everything the import of
+    `module` pulled in, the module itself last.
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip(" "))) // 2
+        rows.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+
+    # The module's own tree: the depth-0 row of `module` and the
+    # deeper rows right before it (earlier depth-0 rows are site)
+    end = max(n for n, row in enumerate(rows) if row[0] == module and row[1] == 0)
+    start = end
+    while start > 0 and rows[start - 1][1] > 0:
+        start -= 1
+    return rows[start:end + 1]
+
+
+def profile_module(module: str, runs: int) -> ImportProfile:
+    profile = ImportProfile(module)
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(
+        p for p in (str(PROJECT_ROOT), os.environ.get("PYTHONPATH")) if p
+    ))
+    child = _CHILD.format(root=str(PROJECT_ROOT), events=IO_EVENTS, module=module)
+
+    for _ in range(runs):
+        done = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", child],
+            cwd=PROJECT_ROOT,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        if done.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{done.stderr[-2000:]}")
+
+        rows = parse_importtime(done.stderr, module)
+        total = rows[-1][3]
+        if not profile.total_us or total < profile.total_us:
+            profile.total_us = total
+
+        for name, depth, self_us, cumulative_us in rows:
+            best = profile.modules.get(name)
+            if best is None or self_us < best[0]:
+                profile.modules[name] = (self_us, cumulative_us)
+            if depth == 1:
+                profile.direct[name] = min(profile.direct.get(name, cumulative_us), cumulative_us)
+
+        # Same code every run: the last run's events stand for all
+        profile.io = json.loads(done.stdout.strip().splitlines()[-1])
+
+    return profile
+
+
+def check(profile: ImportProfile, budget_ms: float, app_budget_ms: float) -> List[str]:
+    failures = []
+
+    if profile.total_us / 1000 > budget_ms:
+        failures.append(f"import takes {profile.total_us / 1000:.1f} ms (budget {budget_ms:.0f} ms)")
+
+    if profile.app_self_us / 1000 > app_budget_ms:
+        failures.append(
+            f"app modules take {profile.app_self_us / 1000:.1f} ms (budget {app_budget_ms:.0f} ms)"
+        )
+
+    forbidden = OFF_IMPORT_PATH + ENTRY_POINT_FORBIDDEN.get(profile.module, ())
+    for name in forbidden:
+        if any(m == name or m.startswith(name + ".") for m in profile.modules):
+            failures.append(f"imports {name} (belongs off the import path)")
+
+    for event, target, path, line in profile.io:
+        where = os.path.relpath(path, PROJECT_ROOT)
+        failures.append(f"I/O at import: {event} {target} ({where}:{line})")
+
+    return failures
+
+
+def report(profile: ImportProfile, top: int) -> None:
+    print(f"\nimport {profile.module}")
+    print(f"  total        {profile.total_us / 1000:8.1f} ms")
+    print(f"  app (self)   {profile.app_self_us / 1000:8.1f} ms")
+
+    print("  largest direct imports (cumulative):")
+    for name, us in profile.top_level(top):
+        print(f"    {us / 1000:8.1f} ms  {name}")
+
+    print("  largest app modules (self):")
+    for name, us in profile.top_app(top):
+        print(f"    {us / 1000:8.1f} ms  {name}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import-time (cold start) budget check")
+    parser.add_argument("--modules", nargs="+", default=list(DEFAULT_MODULES))
+    parser.add_argument("--runs", type=int, default=3, help="fresh interpreters per module (best of)")
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument("--app-budget-ms", type=float, default=IMPORT_APP_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    failed = False
+    for module in args.modules:
+        profile = profile_module(module, args.runs)
+        report(profile, args.top)
+
+        failures = check(profile, args.budget_ms, args.app_budget_ms)
+        for failure in failures:
+            print(f"  ❌ {failure}")
+        if not failures:
+            print("  ✅ within budget")
+        failed = failed or bool(failures)
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+# app/perf/menu_bench.py
+"""
+Menu scaling benchmark: how menu loading and menu resolution grow with
+menu size, on synthetic menus (see app/perf/menu_generator.py).
+
+Per scale it measures:
+- MenuStore load time, and retained / peak memory of the load
+  (tracemalloc)
+- MenuRepository.resolve_item        (exact, alias, partial, miss)
+- MenuRepository.resolve_menu_query  (category, item, vague)
+- match_choice                       (side group choices, category items)
+- CartSummaryBuilder.build           (10-item cart with sides / modifiers)
+
+Resolution memoization is disabled so every call does the full work.
+Each operation runs for a time budget (at least 3 calls). The report
+ends with the fitted growth exponent per operation (time ∝ items^k:
+k ≈ 0 constant, k ≈ 1 linear).
+
+Needs no services. Usage:
+    python -m app.perf.menu_bench --scales 1000 10000 100000
+    python -m app.perf.menu_bench --scales 1000 5000 --modifier-groups 4 --choices 12 --cache-dir /tmp/menus
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import math
+import random
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+from app.cart.cart import Cart
+from app.cart.cart_item import CartItem
+from app.cart.read_models.cart_summary_builder import CartSummaryBuilder
+from app.menu.repository import MenuRepository
+from app.menu.store import MenuStore
+from app.perf.menu_generator import MenuShape, generate_menu, write_menu
+from app.utils.choice_matching import match_choice
+
+OPERATIONS = (
+    "resolve_item",
+    "resolve_menu_query",
+    "match_choice_group",
+    "match_choice_category",
+    "cart_summary",
+)
+
+CART_SIZE = 10
+
+
+# =================================================
+# Timing helpers
+# =================================================
+
+def _time_calls(fn: Callable[[], object], budget_s: float, min_calls: int = 3) -> Tuple[float, int]:
+    """
+    Mean seconds per call of fn(), running for ~budget_s.
+    """
+    calls = 0
+    started = time.perf_counter()
+
+    while True:
+        fn()
+        calls += 1
+        elapsed = time.perf_counter() - started
+        if calls >= min_calls and elapsed >= budget_s:
+            return elapsed / calls, calls
+
+
+def _cycle(callables: List[Callable[[], object]]) -> Callable[[], object]:
+    """
+    One callable that runs the given ones round-robin.
+    """
+    state = {"n": 0}
+
+    def run():
+        fn = callables[state["n"] % len(callables)]
+        state["n"] += 1
+        return fn()
+
+    return run
+
+
+# =================================================
+# Per-scale measurement
+# =================================================
+
+def prepare_menu(shape: MenuShape, cache_dir: Path) -> Tuple[Path, Path, float]:
+    """
+    Generated menu files for `shape` (reused from cache_dir if present).
+    Returns (menu_path, entity_index_path, generation seconds).
+    """
+    directory = cache_dir / (
+        f"items{shape.items}-s{shape.side_groups_per_item}-m{shape.modifier_groups_per_item}"
+        f"-c{shape.choices_per_group}-seed{shape.seed}"
+    )
+    menu_path = directory / "menu.json"
+    index_path = directory / "entity_index.json"
+
+    if menu_path.exists() and index_path.exists():
+        return menu_path, index_path, 0.0
+
+    started = time.perf_counter()
+    menu, entity_index = generate_menu(shape)
+    write_menu(directory, menu, entity_index)
+    return menu_path, index_path, time.perf_counter() - started
+
+
+def measure_scale(shape: MenuShape, cache_dir: Path, budget_s: float, memory: bool) -> Dict[str, float]:
+    menu_path, index_path, generated_s = prepare_menu(shape, cache_dir)
+
+    result: Dict[str, float] = {
+        "items": shape.items,
+        "generate_s": generated_s,
+        "menu_mb": menu_path.stat().st_size / 1e6,
+    }
+
+    # ---- load ----
+    gc.collect()
+    started = time.perf_counter()
+    store = MenuStore(menu_path, index_path)
+    result["load_s"] = time.perf_counter() - started
+
+    if memory:
+        del store
+        gc.collect()
+        tracemalloc.start()
+        store = MenuStore(menu_path, index_path)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result["retained_mb"] = current / 1e6
+        result["peak_mb"] = peak / 1e6
+
+    repo = MenuRepository(store, resolution_cache_size=0)
+    rng = random.Random(shape.seed)
+    items = list(store.items.values())
+    sample = rng.sample(items, min(20, len(items)))
+
+    # ---- resolve_item ----
+    item_queries = []
+    for item in sample[:5]:
+        name = item.name.lower()
+        item_queries.append(name)                          # exact
+        item_queries.append(" ".join(name.split()[1:]))    # alias
+        item_queries.append(" ".join(name.split()[1:3]))   # partial
+    item_queries.append("purple unicorn smoothie")         # miss
+
+    result["resolve_item"], _ = _time_calls(
+        _cycle([lambda q=q: repo.resolve_item(q) for q in item_queries]),
+        budget_s,
+    )
+
+    # ---- resolve_menu_query ----
+    category_names = [c["name"].lower() for c in list(store.categories.values())[:3]]
+    menu_queries = category_names + [sample[0].name.lower(), "something with chicken"]
+
+    result["resolve_menu_query"], _ = _time_calls(
+        _cycle([lambda q=q: repo.resolve_menu_query(q) for q in menu_queries]),
+        budget_s,
+    )
+
+    # ---- match_choice ----
+    with_sides = [i for i in sample if i.side_groups] or sample
+    group_choices = with_sides[0].side_groups[0].choices if with_sides[0].side_groups else []
+    choice_texts = [c.name.lower() for c in group_choices[:2]] + ["the second one", "large coke please"]
+
+    result["match_choice_group"], _ = _time_calls(
+        _cycle([lambda t=t: match_choice(t, group_choices) for t in choice_texts]),
+        budget_s,
+    )
+
+    category = next(iter(store.categories.values()))
+    category_items = [store.get_item(i) for i in category["item_ids"] if i in store.items]
+    category_texts = [category_items[0].name.lower(), "the chicken one", "spicy"]
+
+    result["match_choice_category"], _ = _time_calls(
+        _cycle([lambda t=t: match_choice(t, category_items) for t in category_texts]),
+        budget_s,
+    )
+
+    # ---- cart summary ----
+    cart = _build_cart(sample, rng)
+    summary = CartSummaryBuilder(repo)
+
+    result["cart_summary"], _ = _time_calls(lambda: summary.build(cart), budget_s)
+
+    return result
+
+
+def _build_cart(items, rng: random.Random) -> Cart:
+    cart = Cart()
+
+    for n in range(CART_SIZE):
+        item = items[n % len(items)]
+        variant_id = item.pricing.variants[0].variant_id if item.pricing.mode == "variant" else None
+
+        cart.add_item(CartItem.create(
+            item_id=item.item_id,
+            quantity=rng.randint(1, 3),
+            variant_id=variant_id,
+            sides={g.group_id: [g.choices[0].item_id] for g in item.side_groups if g.choices},
+            modifiers={g.group_id: [g.choices[0].modifier_id] for g in item.modifier_groups if g.choices},
+        ))
+
+    return cart
+
+
+# =================================================
+# Report
+# =================================================
+
+def growth_exponent(scales: List[int], seconds: List[float]) -> float:
+    """
+    Least-squares slope of log(time) over log(items).
+    """
+    if len(scales) < 2:
+        return float("nan")
+
+    xs = [math.log(s) for s in scales]
+    ys = [math.log(max(t, 1e-12)) for t in seconds]
+    mx = sum(xs) / len(xs)
+    my = sum(ys) / len(ys)
+
+    var = sum((x - mx) ** 2 for x in xs)
+    return sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / var if var else float("nan")
+
+
+def print_report(results: List[Dict[str, float]], memory: bool) -> None:
+    """
+    One row per metric, one column per scale, then the growth exponent.
+    """
+    scales = [int(r["items"]) for r in results]
+
+    rows: List[Tuple[str, str, float]] = [
+        ("menu.json", "MB", 1.0),
+        ("load", "s", 1.0),
+    ]
+    if memory:
+        rows += [("retained", "MB", 1.0), ("peak", "MB", 1.0)]
+    rows += [(op, "ms", 1000.0) for op in OPERATIONS]
+
+    keys = {
+        "menu.json": "menu_mb",
+        "load": "load_s",
+        "retained": "retained_mb",
+        "peak": "peak_mb",
+    }
+
+    print(f"{'metric':<28}" + "".join(f"{s:>12}" for s in scales) + f"{'k':>8}")
+
+    for name, unit, factor in rows:
+        key = keys.get(name, name)
+        values = [r[key] for r in results]
+        k = growth_exponent(scales, values)
+
+        print(
+            f"{name + ' (' + unit + ')':<28}"
+            + "".join(f"{v * factor:>12.4f}" for v in values)
+            + (f"{k:>8.2f}" if not math.isnan(k) else f"{'':>8}")
+        )
+
+    print()
+    print("k: fitted growth exponent, value ∝ items^k (0 constant, 1 linear)")
+
+
+# =================================================
+# CLI
+# =================================================
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Menu scaling benchmark on synthetic menus")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--side-groups", type=int, default=1)
+    parser.add_argument("--modifier-groups", type=int, default=1)
+    parser.add_argument("--choices", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--budget-s", type=float, default=1.0, help="time per operation per scale")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc load")
+    parser.add_argument("--cache-dir", type=Path, default=None, help="keep generated menus here")
+    args = parser.parse_args()
+
+    temp = None
+    cache_dir = args.cache_dir
+    if cache_dir is None:
+        temp = tempfile.TemporaryDirectory(prefix="menu_bench_")
+        cache_dir = Path(temp.name)
+
+    try:
+        results = []
+        for scale in args.scales:
+            shape = MenuShape(
+                items=scale,
+                side_groups_per_item=args.side_groups,
+                modifier_groups_per_item=args.modifier_groups,
+                choices_per_group=args.choices,
+                seed=args.seed,
+            )
+            results.append(measure_scale(shape, cache_dir, args.budget_s, not args.no_memory))
+            print(f"  measured {scale} items", flush=True)
+
+        print()
+        print_report(results, not args.no_memory)
+    finally:
+        if temp is not None:
+            temp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
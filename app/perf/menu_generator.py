@@ -0,0 +1,359 @@
+# app/perf/menu_generator.py
+"""
+Synthetic menu generator: valid menu.json / entity_index.json pairs
+at any scale, with the same schema as app/data/restaurants/demo.
+
+Menus are built from shared vocabularies (adjectives, proteins, dishes,
+styles), so item names overlap token-wise the way real menus do
+("Spicy Chicken Taco", "Spicy Chicken Burrito", ...). Side and modifier
+groups come from a shared pool and are attached to many items, like
+the demo's "Can Drinks" group. Generation is deterministic per seed.
+
+Usage:
+    python -m app.perf.menu_generator --items 10000 --out /tmp/menus/10k
+    python -m app.perf.menu_generator --items 1000 --side-groups 3 --modifier-groups 4 --choices 12
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import random
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ADJECTIVES = [
+    "spicy", "smoky", "crispy", "grilled", "classic", "loaded", "golden",
+    "fiery", "honey", "garlic", "zesty", "cheesy", "roasted", "tangy",
+    "sweet", "savory", "herb", "lemon", "chipotle", "buffalo", "teriyaki",
+    "bbq", "cajun", "pesto", "truffle", "sesame", "ranch", "mango",
+    "jalapeno", "maple",
+]
+
+PROTEINS = [
+    "chicken", "beef", "pork", "shrimp", "fish", "turkey", "veggie",
+    "tofu", "lamb", "steak", "bacon", "ham", "salmon", "tuna", "egg",
+    "mushroom", "bean", "sausage", "chorizo", "brisket", "duck", "crab",
+    "falafel", "paneer", "tempeh",
+]
+
+DISHES = [
+    "taco", "burrito", "burger", "sandwich", "wrap", "bowl", "salad",
+    "pizza", "quesadilla", "melt", "sub", "plate", "platter", "skewer",
+    "slider", "nachos", "fries", "soup", "roll", "flatbread", "panini",
+    "pasta", "noodles", "rice", "tostada", "enchilada", "gyro", "hoagie",
+    "bagel", "croissant",
+]
+
+STYLES = [
+    "", "deluxe", "supreme", "special", "combo", "feast", "lite", "jumbo",
+    "mini", "royale", "original", "double", "triple", "house", "street",
+]
+
+CATEGORY_WORDS = [
+    "tacos", "burritos", "burgers", "sandwiches", "wraps", "bowls",
+    "salads", "pizzas", "plates", "platters", "sides", "drinks",
+    "desserts", "breakfast", "kids", "specials", "combos", "sliders",
+    "soups", "noodles",
+]
+
+SIDE_NAMES = [
+    "coke", "sprite", "fanta", "lemonade", "iced tea", "water", "fries",
+    "onion rings", "coleslaw", "chips", "salsa", "guacamole", "side salad",
+    "rice", "beans", "corn", "fruit cup", "cookie", "brownie", "pickles",
+]
+
+MODIFIER_NAMES = [
+    "extra cheese", "no onions", "add bacon", "jalapenos", "sour cream",
+    "avocado", "extra sauce", "no tomato", "lettuce", "pickled onions",
+    "hot sauce", "mild sauce", "gluten free bun", "double meat", "egg",
+    "mushrooms", "peppers", "olives", "spinach", "feta",
+]
+
+SIZE_VARIANTS = [("small", "Small", 0), ("medium", "Medium", 150), ("large", "Large", 300)]
+
+
+@dataclass
+class MenuShape:
+    items: int
+    categories: int = 0                 # 0 → items / 50 (at least 5)
+    side_groups_per_item: int = 1
+    modifier_groups_per_item: int = 1
+    choices_per_group: int = 5
+    group_pool: int = 0                 # 0 → items / 20 (at least 10)
+    variant_ratio: float = 0.15
+    seed: int = 0
+
+
+class _Ids:
+    def __init__(self, rng: random.Random) -> None:
+        self._rng = rng
+
+    def new(self) -> str:
+        return str(uuid.UUID(int=self._rng.getrandbits(128), version=4))
+
+
+# =================================================
+# Generation
+# =================================================
+
+def generate_menu(shape: MenuShape) -> Tuple[dict, Dict[str, object]]:
+    """
+    Returns (menu, entity_index) as JSON-ready dicts.
+    """
+    rng = random.Random(shape.seed)
+    ids = _Ids(rng)
+
+    names = _item_names(shape.items, rng)
+    side_pool, modifier_pool = _group_pools(shape, rng, ids)
+    categories = _categories(shape, ids)
+    category_list = list(categories.values())
+
+    items: Dict[str, dict] = {}
+
+    for index, name in enumerate(names):
+        item_id = ids.new()
+        category = category_list[index % len(category_list)]
+        category["item_ids"].append(item_id)
+
+        items[item_id] = {
+            "item_id": item_id,
+            "name": name,
+            "description": "",
+            "status": "active",
+            "categories": [category["category_id"]],
+            "pricing": _pricing(rng, shape.variant_ratio),
+            "side_groups": rng.sample(side_pool, min(shape.side_groups_per_item, len(side_pool))),
+            "modifier_groups": rng.sample(modifier_pool, min(shape.modifier_groups_per_item, len(modifier_pool))),
+            "aliases": _aliases(name),
+            "available": True,
+        }
+
+    menu = {"categories": categories, "items": items}
+    return menu, build_entity_index(menu)
+
+
+def build_entity_index(menu: dict) -> Dict[str, object]:
+    """
+    Entity index in the demo's format: normalized name → entry
+    (a list of entries when several entities share a name).
+    """
+    index: Dict[str, object] = {}
+
+    def add(key: str, entry: dict) -> None:
+        key = key.lower().strip()
+        if not key:
+            return
+        existing = index.get(key)
+        if existing is None:
+            index[key] = entry
+        elif isinstance(existing, list):
+            if entry not in existing:
+                existing.append(entry)
+        elif existing != entry:
+            index[key] = [existing, entry]
+
+    for category in menu["categories"].values():
+        add(category["name"], {"type": "category", "category_id": category["category_id"]})
+
+    seen_groups = set()
+    for item in menu["items"].values():
+        entry = {"type": "item", "item_id": item["item_id"]}
+        add(item["name"], entry)
+        for alias in item["aliases"]:
+            add(alias, entry)
+
+        for group in item["modifier_groups"]:
+            if group["group_id"] in seen_groups:
+                continue
+            seen_groups.add(group["group_id"])
+            for choice in group["choices"]:
+                add(choice["name"], {
+                    "type": "modifier",
+                    "modifier_id": choice["modifier_id"],
+                    "group_id": group["group_id"],
+                })
+
+    return index
+
+
+def write_menu(directory: Path, menu: dict, entity_index: dict) -> Tuple[Path, Path]:
+    directory.mkdir(parents=True, exist_ok=True)
+
+    menu_path = directory / "menu.json"
+    index_path = directory / "entity_index.json"
+
+    with open(menu_path, "w", encoding="utf-8") as f:
+        json.dump(menu, f)
+    with open(index_path, "w", encoding="utf-8") as f:
+        json.dump(entity_index, f)
+
+    return menu_path, index_path
+
+
+# =================================================
+# Helpers
+# =================================================
+
+def _item_names(count: int, rng: random.Random) -> List[str]:
+    """
+    `count` unique names from the shared vocabularies
+    (adjective protein dish [style]), shuffled, then numbered
+    editions once the vocabulary is exhausted.
+    """
+    combos = list(itertools.product(ADJECTIVES, PROTEINS, DISHES, STYLES))
+    rng.shuffle(combos)
+
+    names: List[str] = []
+    edition = 1
+    while len(names) < count:
+        for adjective, protein, dish, style in combos:
+            words = [adjective, protein, dish] + ([style] if style else [])
+            if edition > 1:
+                words.append(f"no {edition}")
+            names.append(" ".join(words).title())
+            if len(names) == count:
+                break
+        edition += 1
+
+    return names
+
+
+def _aliases(name: str) -> List[str]:
+    lowered = name.lower()
+    words = lowered.split()
+    # "spicy chicken taco deluxe" → also "chicken taco deluxe"
+    return [lowered, " ".join(words[1:])] if len(words) > 2 else [lowered]
+
+
+def _pricing(rng: random.Random, variant_ratio: float) -> dict:
+    base = rng.randrange(299, 1999)
+
+    if rng.random() < variant_ratio:
+        return {
+            "mode": "variant",
+            "variants": [
+                {"variant_id": vid, "label": label, "price_cents": base + extra}
+                for vid, label, extra in SIZE_VARIANTS
+            ],
+            "currency": "USD",
+        }
+
+    return {"mode": "fixed", "price_cents": base, "currency": "USD"}
+
+
+def _categories(shape: MenuShape, ids: _Ids) -> Dict[str, dict]:
+    count = shape.categories or max(5, shape.items // 50)
+
+    categories: Dict[str, dict] = {}
+    for n in range(count):
+        word = CATEGORY_WORDS[n % len(CATEGORY_WORDS)]
+        round_ = n // len(CATEGORY_WORDS)
+        name = word.title() if round_ == 0 else f"{word.title()} {round_ + 1}"
+
+        category_id = ids.new()
+        categories[category_id] = {
+            "category_id": category_id,
+            "name": name,
+            "item_ids": [],
+        }
+
+    return categories
+
+
+def _group_pools(shape: MenuShape, rng: random.Random, ids: _Ids) -> Tuple[List[dict], List[dict]]:
+    pool_size = shape.group_pool or max(10, shape.items // 20)
+
+    side_pool = [
+        {
+            "group_id": ids.new(),
+            "name": f"Side Choice {n + 1}",
+            "is_required": n % 3 == 0,
+            "min_selector": 1,
+            "max_selector": 1 if n % 2 == 0 else 2,
+            "choices": [
+                {
+                    "item_id": ids.new(),
+                    "name": _choice_name(SIDE_NAMES, n, c),
+                    "pricing": {
+                        "mode": "fixed",
+                        "price_cents": rng.choice([0, 0, 99, 149, 199]),
+                        "currency": "USD",
+                    },
+                }
+                for c in range(shape.choices_per_group)
+            ],
+        }
+        for n in range(pool_size)
+    ]
+
+    modifier_pool = [
+        {
+            "group_id": ids.new(),
+            "name": f"Customize {n + 1}",
+            "is_required": False,
+            "min_selector": 1,
+            "max_selector": shape.choices_per_group,
+            "choices": [
+                {
+                    "modifier_id": ids.new(),
+                    "name": _choice_name(MODIFIER_NAMES, n, c),
+                    "price_cents": rng.choice([0, 50, 99, 150]),
+                }
+                for c in range(shape.choices_per_group)
+            ],
+        }
+        for n in range(pool_size)
+    ]
+
+    return side_pool, modifier_pool
+
+
+def _choice_name(vocabulary: List[str], group: int, choice: int) -> str:
+    """
+    Distinct names within a group; shared across groups.
+    """
+    word = vocabulary[(group + choice) % len(vocabulary)]
+    round_ = choice // len(vocabulary)
+    return word.title() if round_ == 0 else f"{word.title()} {round_ + 1}"
+
+
+# =================================================
+# CLI
+# =================================================
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a synthetic menu.json / entity_index.json")
+    parser.add_argument("--items", type=int, required=True)
+    parser.add_argument("--out", type=Path, required=True, help="output directory")
+    parser.add_argument("--categories", type=int, default=0)
+    parser.add_argument("--side-groups", type=int, default=1, help="side groups per item")
+    parser.add_argument("--modifier-groups", type=int, default=1, help="modifier groups per item")
+    parser.add_argument("--choices", type=int, default=5, help="choices per group")
+    parser.add_argument("--group-pool", type=int, default=0, help="distinct groups of each kind")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    shape = MenuShape(
+        items=args.items,
+        categories=args.categories,
+        side_groups_per_item=args.side_groups,
+        modifier_groups_per_item=args.modifier_groups,
+        choices_per_group=args.choices,
+        group_pool=args.group_pool,
+        seed=args.seed,
+    )
+
+    menu, entity_index = generate_menu(shape)
+    menu_path, index_path = write_menu(args.out, menu, entity_index)
+
+    print(f"{len(menu['items'])} items, {len(menu['categories'])} categories")
+    print(f"  {menu_path} ({menu_path.stat().st_size / 1e6:.1f} MB)")
+    print(f"  {index_path} ({index_path.stat().st_size / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
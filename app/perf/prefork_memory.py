@@ -0,0 +1,201 @@
+# app/perf/prefork_memory.py
+"""
+Pre-fork benchmark: startup time and memory per worker count, with
+the serving core built per worker vs preloaded in the master
+(PREFORK_PRELOAD, app/api/prefork.py).
+
+Each configuration runs in a fresh interpreter that plays the gunicorn
+master: it forks the workers (importing the app and building the core
+in each, or once before forking when preloading). Every worker then
+serves a few scripted calls through the TurnEngine / ResponseBuilder
+and runs a full GC collection, as a warm worker would have, before
+the master reads /proc/<pid>/smaps_rollup of every process.
+
+- ready ms : master start → every worker warm
+- RSS      : resident, shared pages counted once per process
+- PSS      : proportional (shared pages split between processes);
+             the sum over processes is the real footprint
+- private  : pages only that worker has (its copies)
+
+Linux only (/proc). The HTTP server itself is not started.
+
+Usage:
+    python -m app.perf.prefork_memory
+    python -m app.perf.prefork_memory --workers 1 2 4 8 --calls 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+# Nothing from the app is imported here: in per-worker mode the
+# master must not hold the app before forking
+SCRIPT = [
+    "i want a chicken taco",
+    "coke",
+    "no",
+    "two",
+    "show my cart",
+    "that's all",
+]
+
+SMAPS_FIELDS = ("Rss", "Pss", "Private_Clean", "Private_Dirty")
+
+
+def read_memory_kb(pid: int) -> Dict[str, int]:
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            name, _, rest = line.partition(":")
+            if name in SMAPS_FIELDS:
+                values[name] = int(rest.split()[0])
+    return {
+        "rss": values["Rss"],
+        "pss": values["Pss"],
+        "private": values["Private_Clean"] + values["Private_Dirty"],
+    }
+
+
+# =================================================
+# Worker / master (child interpreter)
+# =================================================
+
+def _serve_calls(calls: int) -> None:
+    from app.api.prefork import serving_core
+    from app.session.session import Session
+
+    core = serving_core()
+    for n in range(calls):
+        session = Session(session_id=f"prefork-{os.getpid()}-{n}", restaurant_id="demo")
+        for text in SCRIPT:
+            output = core.engine.process_turn(session, text)
+            core.responder.build(output.response_key, session.conversation_context, output.response_payload)
+
+    gc.collect()
+
+
+def _worker(ready_fd: int, release_fd: int, calls: int, preload: bool) -> None:
+    if not preload:
+        # gunicorn without preload_app: the worker imports the app
+        import app.api.twilio_server  # noqa: F401
+
+    _serve_calls(calls)
+
+    os.write(ready_fd, b"r")
+    os.read(release_fd, 1)        # parked until the master has measured
+    os._exit(0)
+
+
+def run_master(workers: int, calls: int, preload: bool) -> dict:
+    started = time.perf_counter()
+
+    if preload:
+        import app.api.twilio_server  # noqa: F401
+        from app.api.prefork import preload as preload_core
+        preload_core()
+
+    ready_r, ready_w = os.pipe()
+    release_r, release_w = os.pipe()
+
+    pids = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            os.close(ready_r)
+            os.close(release_w)
+            _worker(ready_w, release_r, calls, preload)
+        pids.append(pid)
+
+    os.close(ready_w)
+    os.close(release_r)
+
+    for _ in range(workers):
+        if not os.read(ready_r, 1):
+            raise RuntimeError("a worker exited before it was ready")
+    ready_ms = (time.perf_counter() - started) * 1000
+
+    result = {
+        "workers": workers,
+        "preload": preload,
+        "ready_ms": ready_ms,
+        "master": read_memory_kb(os.getpid()),
+        "worker_memory": [read_memory_kb(pid) for pid in pids],
+    }
+
+    os.close(release_w)
+    for pid in pids:
+        os.waitpid(pid, 0)
+
+    return result
+
+
+# =================================================
+# Report
+# =================================================
+
+def run_configuration(workers: int, calls: int, preload: bool) -> dict:
+    command = [
+        sys.executable, "-m", "app.perf.prefork_memory",
+        "--master", "--workers", str(workers), "--calls", str(calls),
+    ]
+    if preload:
+        command.append("--preload")
+
+    done = subprocess.run(command, capture_output=True, text=True)
+    if done.returncode != 0:
+        raise RuntimeError(f"configuration failed:\n{done.stderr[-2000:]}")
+    return json.loads(done.stdout.strip().splitlines()[-1])
+
+
+def print_results(results: List[dict]) -> None:
+    print(
+        f"{'mode':<12}{'workers':>8}{'ready ms':>10}"
+        f"{'RSS MB':>9}{'PSS MB':>9}{'private MB/worker':>19}"
+    )
+    for r in results:
+        processes = [r["master"]] + r["worker_memory"]
+        rss = sum(p["rss"] for p in processes) / 1024
+        pss = sum(p["pss"] for p in processes) / 1024
+        private = sum(p["private"] for p in r["worker_memory"]) / len(r["worker_memory"]) / 1024
+        mode = "preload" if r["preload"] else "per-worker"
+        print(
+            f"{mode:<12}{r['workers']:>8}{r['ready_ms']:>10.0f}"
+            f"{rss:>9.1f}{pss:>9.1f}{private:>19.1f}"
+        )
+
+    print()
+    print("RSS / PSS: master + workers; PSS is the memory actually used")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Startup time and memory: preloaded vs per-worker serving core")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--calls", type=int, default=20, help="scripted calls per worker before measuring")
+    parser.add_argument("--master", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--preload", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.master:
+        print(json.dumps(run_master(args.workers[0], args.calls, args.preload)))
+        return
+
+    if not os.path.exists("/proc/self/smaps_rollup"):
+        sys.exit("needs Linux /proc/<pid>/smaps_rollup")
+
+    results = []
+    for workers in args.workers:
+        for preload in (False, True):
+            results.append(run_configuration(workers, args.calls, preload))
+
+    print_results(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,405 @@
+# app/perf/replay.py
+"""
+Offline transcript replay: drives recorded conversations through the
+TurnEngine at full speed, without Twilio, Redis or the HTTP stack.
+
+Input (any mix):
+- a turn event log directory or segment (see app/core/turn_log.py)
+- a JSONL file, one turn per line:
+    {"session_id": "...", "text": "...", "response_key": "..."}
+  (response_key optional; "hypotheses": [[text, confidence(, partial)], ...]
+  may replace "text")
+
+Sessions are partitioned across a process pool (a session's turns
+always run in order, in one worker). Each worker interleaves its
+sessions turn by turn against an in-memory session backend, so every
+turn pays load → process_hypotheses → save → ResponseBuilder.build.
+
+Reports turns/s, per-stage latency percentiles and every turn whose
+response_key differs from the recording. --metrics adds the
+turn_stage_seconds histograms of all workers (per handler / state /
+intent breakdown); --metrics-out writes them in Prometheus text format. Exits non-zero when the
+divergence or throughput gates fail, so it can gate performance changes.
+
+Usage:
+    python -m app.perf.replay turn_logs/ --workers 4 --repeat 20
+    python -m app.perf.replay calls.jsonl --max-divergence 0 --min-turns-per-s 500
+    python -m app.perf.replay --synthetic-sessions 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import statistics
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.cli.main import load_menu_store
+from app.core.hypothesis_selector import SpeechHypothesis
+from app.core.response_builder import ResponseBuilder
+from app.core.turn_engine import TurnEngine
+from app.core.metrics import REGISTRY
+from app.core.turn_log import SEGMENT_PATTERN, iter_turn_events
+from app.core.turn_metrics import observe_stages, stage_report
+from app.menu.repository import MenuRepository
+from app.session.backends.memory_backend import MemorySessionBackend
+from app.session.codec import build_session_codec
+from app.state_machine.state_router import StateRouter
+
+# Conversation used by --synthetic-sessions (no recorded response keys)
+SYNTHETIC_SCRIPT = [
+    "i want a chicken taco",
+    "coke",
+    "no",
+    "two",
+    "show my cart",
+    "that's all",
+]
+
+# Stages reported, in table order (engine stages come from TurnTrace)
+STAGES = ("load", "nlu", "select", "flow", "route", "handler", "apply", "save", "render", "total")
+
+# Divergences printed in the report
+MAX_DIVERGENCES_SHOWN = 20
+
+
+@dataclass
+class ReplayTurn:
+    # (text, confidence, partial)
+    hypotheses: List[Tuple[str, float, bool]]
+    response_key: Optional[str] = None
+
+
+@dataclass
+class Conversation:
+    session_id: str
+    restaurant_id: str = "demo"
+    turns: List[ReplayTurn] = field(default_factory=list)
+
+
+@dataclass
+class WorkerReport:
+    turns: int
+    started: float
+    finished: float
+    timings_ms: Dict[str, List[float]]
+    divergences: List[dict]
+    metrics: Dict[str, dict]
+
+
+# =================================================
+# Corpus
+# =================================================
+
+def load_corpus(paths: Iterable[str]) -> List[Conversation]:
+    """
+    Conversations from turn logs / JSONL files, turns in recorded order.
+    """
+    rows: Dict[str, List[Tuple[float, int, str, ReplayTurn]]] = defaultdict(list)
+
+    seq = 0
+    for path in paths:
+        for event in _iter_events(path):
+            session_id = event["session_id"]
+            hypotheses = event.get("hypotheses") or [[event["text"], 1.0]]
+
+            turn = ReplayTurn(
+                hypotheses=[
+                    (h[0], float(h[1]), bool(h[2]) if len(h) > 2 else False)
+                    for h in hypotheses
+                ],
+                response_key=event.get("response_key"),
+            )
+
+            # Turn logs: order by turn number (workers flush independently);
+            # plain JSONL: file order
+            order = event.get("turn", 0)
+            rows[session_id].append((order, seq, event.get("restaurant_id", "demo"), turn))
+            seq += 1
+
+    conversations = []
+    for session_id, turns in rows.items():
+        turns.sort(key=lambda row: (row[0], row[1]))
+        conversations.append(
+            Conversation(
+                session_id=session_id,
+                restaurant_id=turns[0][2],
+                turns=[row[3] for row in turns],
+            )
+        )
+
+    return conversations
+
+
+def synthetic_corpus(sessions: int) -> List[Conversation]:
+    return [
+        Conversation(
+            session_id=f"synthetic-{n}",
+            turns=[ReplayTurn(hypotheses=[(text, 1.0, False)]) for text in SYNTHETIC_SCRIPT],
+        )
+        for n in range(sessions)
+    ]
+
+
+def repeat_corpus(conversations: List[Conversation], repeat: int) -> List[Conversation]:
+    """
+    Each conversation `repeat` times, under distinct session ids.
+    """
+    if repeat <= 1:
+        return conversations
+
+    return [
+        Conversation(
+            session_id=f"{c.session_id}#{n}",
+            restaurant_id=c.restaurant_id,
+            turns=c.turns,
+        )
+        for n in range(repeat)
+        for c in conversations
+    ]
+
+
+def _iter_events(path: str) -> Iterator[dict]:
+    if os.path.isdir(path):
+        yield from iter_turn_events(path)
+        return
+
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+# =================================================
+# Worker process
+# =================================================
+
+def _partition(conversations: List[Conversation], workers: int) -> List[List[Conversation]]:
+    """
+    Whole conversations, dealt round-robin: balanced, and the same
+    split on every run of the same corpus.
+    """
+    parts = [conversations[n::workers] for n in range(workers)]
+    return [part for part in parts if part]
+
+
+def _replay_partition(conversations: List[Conversation]) -> WorkerReport:
+    store = load_menu_store("demo")
+    menu_repo = MenuRepository(store)
+    engine = TurnEngine(StateRouter(), menu_repo)
+    responder = ResponseBuilder(menu_repo)
+    backend = MemorySessionBackend(
+        max_sessions=len(conversations) + 1,
+        codec=build_session_codec(store),
+    )
+
+    return asyncio.run(_drive(engine, responder, backend, conversations))
+
+
+async def _drive(
+    engine: TurnEngine,
+    responder: ResponseBuilder,
+    backend: MemorySessionBackend,
+    conversations: List[Conversation],
+) -> WorkerReport:
+    timings: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+    divergences: List[dict] = []
+    turns = 0
+
+    started = time.time()
+
+    # Round-robin: turn n of every session, then turn n + 1, ...
+    depth = max(len(c.turns) for c in conversations)
+    for index in range(depth):
+        for conversation in conversations:
+            if index >= len(conversation.turns):
+                continue
+
+            turn = conversation.turns[index]
+            hypotheses = [SpeechHypothesis(*h) for h in turn.hypotheses]
+
+            t0 = time.perf_counter()
+            session = await backend.load(conversation.session_id, conversation.restaurant_id)
+            t1 = time.perf_counter()
+            output = engine.process_hypotheses(session, hypotheses)
+            t2 = time.perf_counter()
+            await backend.save(session)
+            t3 = time.perf_counter()
+            responder.build(output.response_key, session.conversation_context, output.response_payload)
+            t4 = time.perf_counter()
+
+            measured = {
+                "load": (t1 - t0) * 1000,
+                "save": (t3 - t2) * 1000,
+                "render": (t4 - t3) * 1000,
+                "total": (t4 - t0) * 1000,
+            }
+            observe_stages(output.trace, measured)
+
+            for stage, ms in measured.items():
+                timings[stage].append(ms)
+            for stage, ms in output.trace.timings_ms.items():
+                if stage in timings:
+                    timings[stage].append(ms)
+
+            if turn.response_key is not None and output.response_key != turn.response_key:
+                divergences.append({
+                    "session_id": conversation.session_id,
+                    "turn": index + 1,
+                    "text": turn.hypotheses[0][0],
+                    "expected": turn.response_key,
+                    "actual": output.response_key,
+                })
+
+            turns += 1
+
+    return WorkerReport(
+        turns=turns,
+        started=started,
+        finished=time.time(),
+        timings_ms=timings,
+        divergences=divergences,
+        metrics=REGISTRY.export(),
+    )
+
+
+# =================================================
+# Run + report
+# =================================================
+
+def replay(conversations: List[Conversation], workers: int) -> dict:
+    parts = _partition(conversations, workers)
+
+    if len(parts) == 1:
+        reports = [_replay_partition(parts[0])]
+    else:
+        with ProcessPoolExecutor(max_workers=len(parts)) as pool:
+            reports = list(pool.map(_replay_partition, parts))
+
+        # Stage histograms were recorded in the worker processes
+        for report in reports:
+            REGISTRY.merge(report.metrics)
+
+    timings: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+    divergences: List[dict] = []
+    for report in reports:
+        for stage, values in report.timings_ms.items():
+            timings[stage].extend(values)
+        divergences.extend(report.divergences)
+
+    # Wall time of the replay itself (menu load / process start excluded)
+    elapsed = max(r.finished for r in reports) - min(r.started for r in reports)
+    turns = sum(r.turns for r in reports)
+
+    return {
+        "sessions": len(conversations),
+        "workers": len(parts),
+        "turns": turns,
+        "elapsed_s": elapsed,
+        "turns_per_s": turns / elapsed if elapsed > 0 else 0.0,
+        "stages_ms": {
+            stage: {
+                "p50": _pct(values, 50),
+                "p90": _pct(values, 90),
+                "p99": _pct(values, 99),
+                "max": max(values) if values else 0.0,
+            }
+            for stage, values in timings.items()
+            if values
+        },
+        "divergences": divergences,
+    }
+
+
+def print_report(result: dict) -> None:
+    print(
+        f"sessions={result['sessions']} workers={result['workers']} "
+        f"turns={result['turns']} elapsed={result['elapsed_s']:.2f}s "
+        f"turns/s={result['turns_per_s']:.1f}"
+    )
+    print()
+    print(f"{'stage':<10}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for stage, pct in result["stages_ms"].items():
+        print(
+            f"{stage:<10}{pct['p50']:>10.3f}{pct['p90']:>10.3f}"
+            f"{pct['p99']:>10.3f}{pct['max']:>10.3f}"
+        )
+
+    divergences = result["divergences"]
+    print()
+    print(f"response_key divergences: {len(divergences)}")
+    for d in divergences[:MAX_DIVERGENCES_SHOWN]:
+        print(f"  {d['session_id']} turn {d['turn']} {d['text']!r}: {d['expected']} → {d['actual']}")
+    if len(divergences) > MAX_DIVERGENCES_SHOWN:
+        print(f"  ... {len(divergences) - MAX_DIVERGENCES_SHOWN} more")
+
+
+def _pct(values: List[float], pct: int) -> float:
+    if not values:
+        return 0.0
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[pct - 1]
+
+
+# =================================================
+# CLI
+# =================================================
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay recorded conversations through the TurnEngine")
+    parser.add_argument("paths", nargs="*", help=f"turn log dirs ({SEGMENT_PATTERN}) or JSONL files")
+    parser.add_argument("--synthetic-sessions", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=1, help="replay each conversation N times")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--max-divergence", type=int, default=None, help="fail above this many divergences")
+    parser.add_argument("--min-turns-per-s", type=float, default=None, help="fail below this throughput")
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    parser.add_argument("--metrics", action="store_true", help="print the stage histogram breakdown")
+    parser.add_argument("--metrics-out", help="write turn_stage_seconds (Prometheus text) to this file")
+    args = parser.parse_args()
+
+    conversations = load_corpus(args.paths) + synthetic_corpus(args.synthetic_sessions)
+    conversations = repeat_corpus(conversations, args.repeat)
+
+    if not conversations:
+        parser.error("nothing to replay (give paths or --synthetic-sessions)")
+
+    result = replay(conversations, args.workers)
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print_report(result)
+
+    if args.metrics:
+        for group_by in (None, "handler", "state"):
+            print()
+            print(stage_report(group_by))
+
+    if args.metrics_out:
+        with open(args.metrics_out, "w", encoding="utf-8") as f:
+            f.write(REGISTRY.render())
+
+    failed = False
+    if args.max_divergence is not None and len(result["divergences"]) > args.max_divergence:
+        print(f"FAIL: {len(result['divergences'])} divergences > {args.max_divergence}")
+        failed = True
+    if args.min_turns_per_s is not None and result["turns_per_s"] < args.min_turns_per_s:
+        print(f"FAIL: {result['turns_per_s']:.1f} turns/s < {args.min_turns_per_s}")
+        failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+# app/perf/turn_load.py
+"""
+Concurrency load test for the async turn pipeline.
+
+Simulates N concurrent calls, each running a scripted conversation,
+through AsyncTurnRunner (off-loop) or inline on the event loop (the old
+blocking path), and reports latency percentiles per concurrency level.
+
+Session storage is an in-process stand-in for Redis that still pays
+serialization and a simulated round-trip delay: blocking for the inline
+mode (old sync client), awaited for the runner (async repository).
+
+Usage:
+    python -m app.perf.turn_load --levels 1 8 32 64 --redis-latency-ms 2
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Dict, List
+
+from app.cli.main import load_menu_store
+from app.core.hypothesis_selector import SpeechHypothesis
+from app.core.response_builder import ResponseBuilder
+from app.core.turn_engine import TurnEngine
+from app.core.turn_runner import AsyncTurnRunner
+from app.menu.repository import MenuRepository
+from app.session.codec import JsonSessionCodec
+from app.session.session import Session
+from app.state_machine.state_router import StateRouter
+
+SCRIPT = [
+    "i want a chicken taco",
+    "coke",
+    "no",
+    "two",
+    "show my cart",
+    "that's all",
+]
+
+# Loop-lag probe interval
+PROBE_INTERVAL_S = 0.005
+
+_CODEC = JsonSessionCodec()
+
+
+# =================================================
+# Redis stand-in
+# =================================================
+
+class MemoryStore:
+    def __init__(self, latency_s: float) -> None:
+        self.latency_s = latency_s
+        self._data: Dict[str, bytes] = {}
+
+    # ---- blocking (old sync redis.Redis path) ----
+
+    def load_blocking(self, session_id: str, restaurant_id: str) -> Session:
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        return self._get(session_id, restaurant_id)
+
+    def save_blocking(self, session: Session) -> None:
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        self._data[session.session_id] = _CODEC.encode(session)
+
+    # ---- async (SessionBackend path) ----
+
+    async def load(self, session_id: str, restaurant_id: str, affinity=None) -> Session:
+        if self.latency_s:
+            await asyncio.sleep(self.latency_s)
+        return self._get(session_id, restaurant_id)
+
+    async def save(self, session: Session) -> None:
+        if self.latency_s:
+            await asyncio.sleep(self.latency_s)
+        self._data[session.session_id] = _CODEC.encode(session)
+
+    def _get(self, session_id: str, restaurant_id: str) -> Session:
+        raw = self._data.get(session_id)
+        if raw is None:
+            return Session(session_id=session_id, restaurant_id=restaurant_id)
+        return _CODEC.decode(raw)
+
+
+# =================================================
+# Drivers
+# =================================================
+
+async def _call_inline(engine, responder, store, session_id: str, latencies: List[float]):
+    for text in SCRIPT:
+        started = time.perf_counter()
+
+        session = store.load_blocking(session_id, "demo")
+        out = engine.process_turn(session, text)
+        store.save_blocking(session)
+        responder.build(out.response_key, session.conversation_context, out.response_payload)
+
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(0)
+
+
+async def _call_runner(runner: AsyncTurnRunner, session_id: str, latencies: List[float]):
+    for text in SCRIPT:
+        started = time.perf_counter()
+        await runner.run_turn(session_id, "demo", [SpeechHypothesis(text)])
+        latencies.append(time.perf_counter() - started)
+
+
+async def _probe_loop_lag(stop: asyncio.Event, lags: List[float]):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL_S)
+        lags.append(time.perf_counter() - started - PROBE_INTERVAL_S)
+
+
+async def run_level(mode: str, concurrency: int, args) -> dict:
+    store = MemoryStore(args.redis_latency_ms / 1000)
+
+    menu_repo = MenuRepository(load_menu_store("demo"))
+    engine = TurnEngine(StateRouter(), menu_repo)
+    responder = ResponseBuilder(menu_repo)
+
+    runner = AsyncTurnRunner(
+        engine,
+        responder,
+        load=store.load,
+        save=store.save,
+        max_workers=args.workers,
+        max_concurrent_turns=args.max_concurrent_turns,
+    )
+
+    latencies: List[float] = []
+    lags: List[float] = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_probe_loop_lag(stop, lags))
+
+    started = time.perf_counter()
+
+    if mode == "runner":
+        calls = [
+            _call_runner(runner, f"load-{concurrency}-{i}", latencies)
+            for i in range(concurrency)
+        ]
+    else:
+        calls = [
+            _call_inline(engine, responder, store, f"load-{concurrency}-{i}", latencies)
+            for i in range(concurrency)
+        ]
+
+    await asyncio.gather(*calls)
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await probe
+    runner.shutdown()
+
+    return {
+        "mode": mode,
+        "concurrency": concurrency,
+        "turns": len(latencies),
+        "turns_per_s": len(latencies) / elapsed,
+        "turn_p50_ms": _pct(latencies, 50),
+        "turn_p99_ms": _pct(latencies, 99),
+        "loop_lag_p99_ms": _pct(lags, 99),
+    }
+
+
+def _pct(values: List[float], pct: int) -> float:
+    if not values:
+        return 0.0
+    if len(values) == 1:
+        return values[0] * 1000
+    return statistics.quantiles(values, n=100, method="inclusive")[pct - 1] * 1000
+
+
+# =================================================
+# CLI
+# =================================================
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Async turn pipeline load test")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 8, 32, 64])
+    parser.add_argument("--modes", nargs="+", default=["inline", "runner"], choices=["inline", "runner"])
+    parser.add_argument("--redis-latency-ms", type=float, default=2.0)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--max-concurrent-turns", type=int, default=64)
+    args = parser.parse_args()
+
+    print(
+        f"{'mode':<8}{'calls':>7}{'turns':>8}{'turns/s':>10}"
+        f"{'p50 ms':>10}{'p99 ms':>10}{'loop lag p99 ms':>18}"
+    )
+
+    for mode in args.modes:
+        for level in args.levels:
+            r = asyncio.run(run_level(mode, level, args))
+            print(
+                f"{r['mode']:<8}{r['concurrency']:>7}{r['turns']:>8}"
+                f"{r['turns_per_s']:>10.1f}{r['turn_p50_ms']:>10.2f}"
+                f"{r['turn_p99_ms']:>10.2f}{r['loop_lag_p99_ms']:>18.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+# app/perf/twiml_bench.py
+"""
+Microbenchmark: precompiled TwiML templates (app/api/twiml_templates.py)
+against the twilio helper library (VoiceResponse / Gather + str()),
+including the url_for lookups each path does per request.
+
+Before timing, both paths render a set of texts and turn sequences
+(escapable characters, newlines, unicode, empty text), spoken with
+<Say> and played from cached prompt audio with <Play>, and must agree
+byte for byte; any difference is printed and the exit code is 1.
+
+Usage:
+    python -m app.perf.twiml_bench
+    python -m app.perf.twiml_bench --budget-s 2 --host voice.example.com
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from typing import Callable, List, Optional, Tuple
+
+from starlette.requests import Request
+from twilio.twiml.voice_response import Gather, VoiceResponse
+
+from app.api.twiml_templates import GATHER_SPEECH_TIMEOUT, GATHER_TIMEOUT, TwimlTemplates
+
+SAMPLE_TEXTS = [
+    "Thank you for calling Compass. What would you like to order?",
+    "Which Can Drinks would you like with your Chicken Taco?",
+    "Your cart:\n- 1 x Chicken Taco ($3.99)\n\nWould you like to proceed?",
+    "Sorry, that’s not available. Popular sides include Coke, Sprite, or Fanta.",
+    "Fish & Chips <large> \"special\" for 'you'\tnow\r\n",
+    "Crème brûlée — 2 × 🍰",
+    "",
+]
+
+SAMPLE_TURNS = [None, 0, 1, 17, "3", "a b&c=d"]
+
+SAMPLE_AUDIO = [None, "0123456789abcdef0123456789abcdef"]
+
+
+# =================================================
+# Helper-library path (what the endpoints did before)
+# =================================================
+
+def _library_gather(
+    action_url: str,
+    say: Optional[str],
+    partial_url: str,
+    play_url: Optional[str] = None,
+) -> Gather:
+    g = Gather(
+        input="speech",
+        action=action_url,
+        method="POST",
+        timeout=GATHER_TIMEOUT,
+        speechTimeout=GATHER_SPEECH_TIMEOUT,
+        bargeIn=True,
+        partialResultCallback=partial_url,
+        partialResultCallbackMethod="POST",
+    )
+    if play_url:
+        g.play(play_url)
+    elif say:
+        g.say(say)
+    return g
+
+
+def _library_action_url(request: Request, turn_seq) -> str:
+    url = request.url_for("process_speech")
+    if turn_seq is None:
+        return str(url)
+    return str(url.include_query_params(turn=turn_seq))
+
+
+def _library_play_url(request: Request, audio: Optional[str]) -> Optional[str]:
+    return f"{request.base_url}audio/{audio}" if audio else None
+
+
+def library_say_then_gather(request: Request, say: str, turn_seq, audio: Optional[str] = None) -> str:
+    vr = VoiceResponse()
+    if audio:
+        vr.play(_library_play_url(request, audio))
+    else:
+        vr.say(say)
+    vr.append(_library_gather(
+        _library_action_url(request, turn_seq),
+        None,
+        str(request.url_for("partial_speech")),
+    ))
+    return str(vr)
+
+
+def library_gather_with_say(request: Request, say: str, turn_seq, audio: Optional[str] = None) -> str:
+    vr = VoiceResponse()
+    vr.append(_library_gather(
+        _library_action_url(request, turn_seq),
+        say,
+        str(request.url_for("partial_speech")),
+        _library_play_url(request, audio),
+    ))
+    return str(vr)
+
+
+# =================================================
+# Harness
+# =================================================
+
+def make_request(app, host: str, scheme: str = "https", root_path: str = "") -> Request:
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "scheme": scheme,
+        "server": (host, 443 if scheme == "https" else 80),
+        "path": "/process_speech",
+        "root_path": root_path,
+        "query_string": b"",
+        "headers": [(b"host", host.encode("latin-1"))],
+        "app": app,
+    }
+    return Request(scope)
+
+
+def check_identical(app, host: str) -> List[str]:
+    templates = TwimlTemplates()
+    failures = []
+
+    requests = [
+        make_request(app, host),
+        make_request(app, "localhost:5000", scheme="http"),
+        make_request(app, host, root_path="/voice-api"),
+    ]
+
+    for request in requests:
+        template = templates.for_request(request)
+        for text in SAMPLE_TEXTS:
+            for turn in SAMPLE_TURNS:
+                for audio in SAMPLE_AUDIO:
+                    pairs = (
+                        (library_say_then_gather(request, text, turn, audio),
+                         template.say_then_gather(text, turn, audio)),
+                        (library_gather_with_say(request, text, turn, audio),
+                         template.gather_with_say(text, turn, audio)),
+                    )
+                    for expected, actual in pairs:
+                        if expected != actual:
+                            failures.append(f"expected: {expected!r}\n  actual: {actual!r}")
+
+    return failures
+
+
+def _time_calls(fn: Callable[[], object], budget_s: float) -> Tuple[float, int]:
+    calls = 0
+    started = time.perf_counter()
+    while True:
+        for _ in range(100):
+            fn()
+        calls += 100
+        elapsed = time.perf_counter() - started
+        if elapsed >= budget_s:
+            return elapsed / calls, calls
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="TwiML templates vs the twilio helper library")
+    parser.add_argument("--budget-s", type=float, default=1.0, help="time per measurement")
+    parser.add_argument("--host", default="compass-voice.example.com")
+    args = parser.parse_args()
+
+    from app.api.twilio_server import app
+
+    failures = check_identical(app, args.host)
+    if failures:
+        print(f"❌ {len(failures)} renderings differ from the helper library:")
+        for failure in failures[:10]:
+            print(" ", failure)
+        sys.exit(1)
+    print("✅ byte-identical to the helper library "
+          f"({len(SAMPLE_TEXTS) * len(SAMPLE_TURNS) * len(SAMPLE_AUDIO) * 2 * 3} renderings)\n")
+
+    templates = TwimlTemplates()
+    text = SAMPLE_TEXTS[1]
+
+    cases = [
+        ("turn (say + gather)",
+         lambda r: library_say_then_gather(r, text, 7),
+         lambda r: templates.for_request(r).say_then_gather(text, 7)),
+        ("greeting (gather > say)",
+         lambda r: library_gather_with_say(r, SAMPLE_TEXTS[0], 0),
+         lambda r: templates.for_request(r).gather_with_say(SAMPLE_TEXTS[0], 0)),
+    ]
+
+    print(f"{'document':<26}{'library µs':>12}{'template µs':>13}{'speedup':>9}")
+    for name, library, template in cases:
+        # Fresh Request per call: url_for caches nothing across requests
+        library_s, _ = _time_calls(lambda: library(make_request(app, args.host)), args.budget_s)
+        template_s, _ = _time_calls(lambda: template(make_request(app, args.host)), args.budget_s)
+        print(
+            f"{name:<26}{library_s * 1e6:>12.2f}{template_s * 1e6:>13.2f}"
+            f"{library_s / template_s:>8.1f}x"
+        )
+
+    print()
+    print("per request, including Request construction and url_for")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,106 +1,102 @@
 # app/responses/item_responses.py
+from typing import Optional
+
 from app.menu.repository import MenuRepository
+from app.responses.slot_prompts import (
+    MODIFIER,
+    SIDE,
+    SlotPrompt,
+    build_slot_prompt,
+)
 from app.state_machine.context import ConversationContext
 from app.utils.top_k_choices import get_top_k_choices
-import re
 
 
-def _clean_group_label(name: str, fallback: str) -> str:
-    if not name:
-        return fallback
-    label = name.strip()
-    label = re.sub(r"^choose\s+(your\s+|a\s+)?", "", label, flags=re.IGNORECASE)
-    label = re.sub(r"\s+", " ", label).strip()
-    return label if label else fallback
+def _side_prompt(context: ConversationContext, menu_repo: MenuRepository) -> SlotPrompt:
+    item = menu_repo.store.get_item(context.current_item_id)
+    return build_slot_prompt(item, SIDE, context.current_side_group_index)
 
 
-def ask_for_side(context: ConversationContext, menu_repo: MenuRepository) -> str:
+def _modifier_prompt(context: ConversationContext, menu_repo: MenuRepository) -> SlotPrompt:
     item = menu_repo.store.get_item(context.current_item_id)
-    idx = context.current_side_group_index
-    group = item.side_groups[idx]
-    group_label = _clean_group_label(group.name, "side")
-    lead = "Which" if idx == 0 else "Now, which"
-
-    if group.is_required:
-        count = max(group.min_selector, 1)
-        if count == 1:
-            return f"{lead} {group_label} would you like with your {item.name}?"
-        return (
-            f"{lead} {group_label}s would you like with your {item.name}? "
-            f"You can choose {count}."
-        )
+    return build_slot_prompt(item, MODIFIER, context.current_modifier_group_index)
 
-    return (
-        f"{lead} {group_label} would you like with your {item.name}? "
-        "If you want one, just tell me which."
-    )
 
+def _top_choices(payload: dict, prompt: SlotPrompt) -> list[str]:
+    return payload.get("top_choices") or [
+        c.name for c in get_top_k_choices(prompt.choices, k=3)
+    ]
 
-def repeat_side_options(
+
+# -------------------------------------------------
+# Slot prompts
+#
+# `prompt` is the cached SlotPrompt of the current slot
+# (see SlotPromptCache); built on the spot when omitted.
+# -------------------------------------------------
+
+def ask_for_side(
     context: ConversationContext,
     menu_repo: MenuRepository,
-    payload: dict,
+    prompt: Optional[SlotPrompt] = None,
 ) -> str:
-    item = menu_repo.store.get_item(context.current_item_id)
-    group = item.side_groups[context.current_side_group_index]
+    prompt = prompt or _side_prompt(context, menu_repo)
+    return prompt.ask
 
-    group_label = (
-        _clean_group_label(payload.get("group_name"), "side")
-        if payload.get("group_name")
-        else _clean_group_label(group.name, "side")
-    ).lower()
 
-    top_choices = payload.get("top_choices") or [
-        c.name for c in get_top_k_choices(group.choices, k=3)
-    ]
+def repeat_side_options(
+    context: ConversationContext,
+    menu_repo: MenuRepository,
+    payload: dict,
+    prompt: Optional[SlotPrompt] = None,
+) -> str:
+    prompt = prompt or _side_prompt(context, menu_repo)
+    group_label = prompt.label_for(payload)
+    top_choices = _top_choices(payload, prompt)
 
     reason = payload.get("repeat_reason", "invalid")
 
     options = _format_options(top_choices)
+    which = (
+        prompt.which
+        if group_label == prompt.label_lower
+        else f"Which {group_label} would you like with your {prompt.item_name}?"
+    )
 
     # ----------------------------------
     # ASK OPTIONS (no apology)
     # ----------------------------------
     if reason == "options":
-        return (
-            f"You can choose {options}. "
-            f"Which {group_label} would you like with your {item.name}?"
-        )
+        return f"You can choose {options}. {which}"
 
     # ----------------------------------
     # INVALID SELECTION (apology allowed)
     # ----------------------------------
-    return (
-        f"Sorry, that’s not available. Popular {group_label}s include {options}. "
-        f"Which {group_label} would you like with your {item.name}?"
-    )\
+    return f"Sorry, that’s not available. Popular {group_label}s include {options}. {which}"
 
 
 def too_many_side_choices(
     context: ConversationContext,
     menu_repo: MenuRepository,
     payload: dict,
+    prompt: Optional[SlotPrompt] = None,
 ) -> str:
-    item = menu_repo.store.get_item(context.current_item_id)
-    group = item.side_groups[context.current_side_group_index]
-    group_label = (_clean_group_label(payload.get("group_name"), "side") if payload.get("group_name") else _clean_group_label(group.name, "side")).lower()
-    top_choices = payload.get("top_choices") or [c.name for c in get_top_k_choices(group.choices, k=3)]
-    options = _format_options(top_choices)
+    prompt = prompt or _side_prompt(context, menu_repo)
+    group_label = prompt.label_for(payload)
+    options = _format_options(_top_choices(payload, prompt))
     return (
-        f"You can choose only one {group_label} for your {item.name}. "
+        f"You can choose only one {group_label} for your {prompt.item_name}. "
         f"Popular choices include {options}. Which one would you like?"
     )
 
 
-def ask_for_modifier(context: ConversationContext, menu_repo: MenuRepository) -> str:
-    item = menu_repo.store.get_item(context.current_item_id)
-
-    idx = context.current_modifier_group_index
-    group = item.modifier_groups[idx]
-    group_label = _clean_group_label(group.name, "add-on")
-
-    lead = "Any" if idx == 0 else "Now, any"
-    return f"{lead} {group_label.lower()}s you’d like with your {item.name}?"
+def ask_for_modifier(
+    context: ConversationContext,
+    menu_repo: MenuRepository,
+    prompt: Optional[SlotPrompt] = None,
+) -> str:
+    prompt = prompt or _modifier_prompt(context, menu_repo)
+    return prompt.ask
 
 
 def ask_for_size(context: ConversationContext, menu_repo: MenuRepository) -> str:
@@ -115,46 +111,30 @@ def ask_for_size(context: ConversationContext, menu_repo: MenuRepository) -> str
 def required_side_cannot_skip(
     context: ConversationContext,
     menu_repo: MenuRepository,
+    prompt: Optional[SlotPrompt] = None,
 ) -> str:
-    item = menu_repo.store.get_item(context.current_item_id)
-    group = item.side_groups[context.current_side_group_index]
-    group_label = _clean_group_label(group.name, "side")
-    count = max(group.min_selector, 1)
-    top_choices = getattr(context, "payload", None)
-    base = (
-        f"This item needs {count} {group_label}s. "
-        f"Which {group_label}s would you like with your {item.name}? You can choose {count}."
-    ) if count > 1 else (
-        f"This item needs a {group_label}. "
-        f"Which {group_label} would you like with your {item.name}?"
-    )
-    return _append_top_choices(base, context, group.choices)
+    prompt = prompt or _side_prompt(context, menu_repo)
+    return _append_top_choices(prompt.cannot_skip, context, prompt.choices)
 
 
 def required_modifier_cannot_skip(
     context: ConversationContext,
     menu_repo: MenuRepository,
+    prompt: Optional[SlotPrompt] = None,
 ) -> str:
-    item = menu_repo.store.get_item(context.current_item_id)
-    group = item.modifier_groups[context.current_modifier_group_index]
-    group_label = _clean_group_label(group.name, "add-on")
-    base = (
-        f"This item needs a {group_label.lower()}. "
-        f"Which {group_label.lower()} would you like with your {item.name}?"
-    )
-    return _append_top_choices(base, context, group.choices)
+    prompt = prompt or _modifier_prompt(context, menu_repo)
+    return _append_top_choices(prompt.cannot_skip, context, prompt.choices)
 
 
 def too_many_modifier_choices(
     context: ConversationContext,
     menu_repo: MenuRepository,
     payload: dict,
+    prompt: Optional[SlotPrompt] = None,
 ) -> str:
-    item = menu_repo.store.get_item(context.current_item_id)
-    group = item.modifier_groups[context.current_modifier_group_index]
-    group_label = (_clean_group_label(payload.get("group_name"), "add-on") if payload.get("group_name") else _clean_group_label(group.name, "add-on")).lower()
-    top_choices = payload.get("top_choices") or [c.name for c in get_top_k_choices(group.choices, k=3)]
-    options = _format_options(top_choices)
+    prompt = prompt or _modifier_prompt(context, menu_repo)
+    group_label = prompt.label_for(payload)
+    options = _format_options(_top_choices(payload, prompt))
     return (
         f"You can choose only one {group_label} here. "
         f"Popular choices include {options}. Which one would you like?"
@@ -240,32 +220,26 @@ def repeat_modifier_options(
     context: ConversationContext,
     menu_repo: MenuRepository,
     payload: dict,
+    prompt: Optional[SlotPrompt] = None,
 ) -> str:
-    item = menu_repo.store.get_item(context.current_item_id)
-    group = item.modifier_groups[context.current_modifier_group_index]
-
-    group_label = (
-        _clean_group_label(payload.get("group_name"), "add-on")
-        if payload.get("group_name")
-        else _clean_group_label(group.name, "add-on")
-    ).lower()
-
-    top_choices = payload.get("top_choices") or [
-        c.name for c in get_top_k_choices(group.choices, k=3)
-    ]
+    prompt = prompt or _modifier_prompt(context, menu_repo)
+    group_label = prompt.label_for(payload)
+    top_choices = _top_choices(payload, prompt)
 
     reason = payload.get("repeat_reason", "invalid")
     options = _format_options(top_choices)
 
     if reason == "options":
-        return (
-            f"You can choose {options}. "
-            f"Which {group_label} would you like for your {item.name}?"
+        which = (
+            prompt.which
+            if group_label == prompt.label_lower
+            else f"Which {group_label} would you like for your {prompt.item_name}?"
         )
+        return f"You can choose {options}. {which}"
 
     return (
         f"Sorry, that’s not available. Popular {group_label}s include {options}. "
-        f"Which would you like for your {item.name}?"
+        f"Which would you like for your {prompt.item_name}?"
     )
 
 
@@ -283,14 +257,14 @@ def list_side_options(
     context: ConversationContext,
     menu_repo: MenuRepository,
     payload: dict,
+    prompt: Optional[SlotPrompt] = None,
 ) -> str:
-    item = menu_repo.store.get_item(context.current_item_id)
-    group = item.side_groups[context.current_side_group_index]
-    group_label = (_clean_group_label(payload.get("group_name"), "side") if payload.get("group_name") else _clean_group_label(group.name, "side")).lower()
-    top_choices = payload.get("top_choices") or [c.name for c in get_top_k_choices(group.choices, k=3)]
+    prompt = prompt or _side_prompt(context, menu_repo)
+    group_label = prompt.label_for(payload)
+    top_choices = _top_choices(payload, prompt)
 
     if not top_choices:
-        return f"You can pick any {group_label} available for your {item.name}."
+        return f"You can pick any {group_label} available for your {prompt.item_name}."
 
     options = _format_options(top_choices)
     return f"You can choose  {options}."
@@ -300,12 +274,11 @@ def clarify_side_choice(
     context: ConversationContext,
     menu_repo: MenuRepository,
     payload: dict,
+    prompt: Optional[SlotPrompt] = None,
 ) -> str:
-    item = menu_repo.store.get_item(context.current_item_id)
-    group = item.side_groups[context.current_side_group_index]
-    group_label = (_clean_group_label(payload.get("group_name"), "side") if payload.get("group_name") else _clean_group_label(group.name, "side")).lower()
-    top_choices = payload.get("top_choices") or [c.name for c in get_top_k_choices(group.choices, k=3)]
-    options = _format_options(top_choices)
+    prompt = prompt or _side_prompt(context, menu_repo)
+    group_label = prompt.label_for(payload)
+    options = _format_options(_top_choices(payload, prompt))
     return f"Did you mean {options}, or something else for your {group_label}?"
 
 
@@ -313,14 +286,14 @@ def list_modifier_options(
     context: ConversationContext,
     menu_repo: MenuRepository,
     payload: dict,
+    prompt: Optional[SlotPrompt] = None,
 ) -> str:
-    item = menu_repo.store.get_item(context.current_item_id)
-    group = item.modifier_groups[context.current_modifier_group_index]
-    group_label = (_clean_group_label(payload.get("group_name"), "add-on") if payload.get("group_name") else _clean_group_label(group.name, "add-on")).lower()
-    top_choices = payload.get("top_choices") or [c.name for c in get_top_k_choices(group.choices, k=3)]
+    prompt = prompt or _modifier_prompt(context, menu_repo)
+    group_label = prompt.label_for(payload)
+    top_choices = _top_choices(payload, prompt)
 
     if not top_choices:
-        return f"You can add any {group_label} you like to your {item.name}."
+        return f"You can add any {group_label} you like to your {prompt.item_name}."
 
     options = _format_options(top_choices)
     return f"You can choose  {options}."
@@ -330,10 +303,9 @@ def clarify_modifier_choice(
     context: ConversationContext,
     menu_repo: MenuRepository,
     payload: dict,
+    prompt: Optional[SlotPrompt] = None,
 ) -> str:
-    item = menu_repo.store.get_item(context.current_item_id)
-    group = item.modifier_groups[context.current_modifier_group_index]
-    group_label = (_clean_group_label(payload.get("group_name"), "add-on") if payload.get("group_name") else _clean_group_label(group.name, "add-on")).lower()
-    top_choices = payload.get("top_choices") or [c.name for c in get_top_k_choices(group.choices, k=3)]
-    options = _format_options(top_choices)
+    prompt = prompt or _modifier_prompt(context, menu_repo)
+    group_label = prompt.label_for(payload)
+    options = _format_options(_top_choices(payload, prompt))
     return f"Did you mean {options}, or something else for your {group_label}?"
@@ -0,0 +1,175 @@
+# app/responses/slot_prompts.py
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from threading import Lock
+from typing import List, Optional
+import re
+
+from app.menu.models import MenuItem
+from app.menu.repository import MenuRepository
+from app.state_machine.context import ConversationContext
+
+_CHOOSE_PREFIX = re.compile(r"^choose\s+(your\s+|a\s+)?", flags=re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+SIDE = "side"
+MODIFIER = "modifier"
+
+_FALLBACK_LABEL = {SIDE: "side", MODIFIER: "add-on"}
+
+
+@lru_cache(maxsize=4096)
+def clean_group_label(name: str, fallback: str) -> str:
+    """
+    "Choose your Drink " → "Drink". Memoized: group names are menu data.
+    """
+    if not name:
+        return fallback
+    label = name.strip()
+    label = _CHOOSE_PREFIX.sub("", label)
+    label = _WHITESPACE.sub(" ", label).strip()
+    return label if label else fallback
+
+
+@dataclass(frozen=True)
+class SlotPrompt:
+    """
+    The static parts of every prompt about one (item, group) slot.
+    Only the option sample is filled in per turn.
+    """
+    kind: str                   # side | modifier
+    item_name: str
+    group_name: str
+    label: str                  # cleaned group label, menu casing
+    label_lower: str
+    choices: List[object]
+    ask: str                    # ask_for_side / ask_for_modifier
+    cannot_skip: str            # required_*_cannot_skip, before choices
+    which: str                  # closing question of repeat_*_options
+
+    def label_for(self, payload: dict) -> str:
+        """
+        Lowercased label, honoring a payload group_name override.
+        """
+        name = payload.get("group_name")
+        if not name or name == self.group_name:
+            return self.label_lower
+        return clean_group_label(name, _FALLBACK_LABEL[self.kind]).lower()
+
+
+def build_slot_prompt(item: MenuItem, kind: str, idx: int) -> SlotPrompt:
+    if kind == SIDE:
+        group = item.side_groups[idx]
+        label = clean_group_label(group.name, "side")
+        lead = "Which" if idx == 0 else "Now, which"
+
+        if group.is_required:
+            count = max(group.min_selector, 1)
+            if count == 1:
+                ask = f"{lead} {label} would you like with your {item.name}?"
+            else:
+                ask = (
+                    f"{lead} {label}s would you like with your {item.name}? "
+                    f"You can choose {count}."
+                )
+        else:
+            ask = (
+                f"{lead} {label} would you like with your {item.name}? "
+                "If you want one, just tell me which."
+            )
+
+        count = max(group.min_selector, 1)
+        cannot_skip = (
+            f"This item needs {count} {label}s. "
+            f"Which {label}s would you like with your {item.name}? You can choose {count}."
+        ) if count > 1 else (
+            f"This item needs a {label}. "
+            f"Which {label} would you like with your {item.name}?"
+        )
+        which = f"Which {label.lower()} would you like with your {item.name}?"
+
+    else:
+        group = item.modifier_groups[idx]
+        label = clean_group_label(group.name, "add-on")
+        lead = "Any" if idx == 0 else "Now, any"
+
+        ask = f"{lead} {label.lower()}s you’d like with your {item.name}?"
+        cannot_skip = (
+            f"This item needs a {label.lower()}. "
+            f"Which {label.lower()} would you like with your {item.name}?"
+        )
+        which = f"Which {label.lower()} would you like for your {item.name}?"
+
+    return SlotPrompt(
+        kind=kind,
+        item_name=item.name,
+        group_name=group.name,
+        label=label,
+        label_lower=label.lower(),
+        choices=group.choices,
+        ask=ask,
+        cannot_skip=cannot_skip,
+        which=which,
+    )
+
+
+class SlotPromptCache:
+    """
+    Per-menu cache of SlotPrompts, keyed by (kind, item_id, group index).
+
+    Responsibilities:
+    - Build each slot's static prompt text once per menu snapshot
+    - Drop everything when menu_repo.store is replaced (menu reload)
+
+    Non-responsibilities:
+    - Option sampling (per turn, in item_responses)
+    - Deciding which prompt to show
+    """
+
+    def __init__(self, menu_repo: MenuRepository, max_entries: int = 4096):
+        self.menu_repo = menu_repo
+        self.max_entries = max_entries
+        self._store = menu_repo.store
+        self._entries: "OrderedDict[tuple, SlotPrompt]" = OrderedDict()
+        self._lock = Lock()
+
+    def side(self, context: ConversationContext) -> SlotPrompt:
+        return self.get(SIDE, context.current_item_id, context.current_side_group_index)
+
+    def modifier(self, context: ConversationContext) -> SlotPrompt:
+        return self.get(MODIFIER, context.current_item_id, context.current_modifier_group_index)
+
+    def get(self, kind: str, item_id: str, idx: int) -> SlotPrompt:
+        store = self.menu_repo.store
+        key = (kind, item_id, idx)
+
+        with self._lock:
+            if store is not self._store:
+                self._entries.clear()
+                self._store = store
+
+            prompt: Optional[SlotPrompt] = self._entries.get(key)
+            if prompt is not None:
+                self._entries.move_to_end(key)
+                return prompt
+
+        prompt = build_slot_prompt(store.get_item(item_id), kind, idx)
+
+        if self.max_entries > 0:
+            with self._lock:
+                if store is self._store:
+                    self._entries[key] = prompt
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+
+        return prompt
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._store = self.menu_repo.store
+
+    def __len__(self) -> int:
+        return len(self._entries)
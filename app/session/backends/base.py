@@ -0,0 +1,62 @@
+# app/session/backends/base.py
+
+from __future__ import annotations
+
+import os
+from typing import Optional, Protocol
+
+from app.session.codec import SessionCodec
+from app.session.session import Session
+
+# Idle sessions expire after this (every backend)
+SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", 60 * 60))  # 1 hour
+
+
+class SessionBackend(Protocol):
+    """
+    Async session storage used by the turn runner, the session cache
+    and the sync CLI wrappers.
+
+    Contract:
+    ---------
+    - load() never fails for a missing / expired / unreadable session:
+      it returns a fresh Session (not persisted until saved)
+    - load() refreshes the TTL; save() stores with TTL
+    - save() is optimistic: it bumps session.version and raises
+      SessionConflictError if the stored version is no longer the one
+      the session was loaded at (nothing is overwritten)
+    - `affinity` is a routing hint; backends may ignore it
+
+    Implementations:
+    ----------------
+    - redis  : RedisSessionBackend (shared, multi-node)
+    - memory : MemorySessionBackend (LRU + TTL, one process)
+    - sqlite : SqliteSessionBackend (WAL file, one node, many workers)
+    """
+
+    codec: SessionCodec
+
+    # True → apply_write() / claim_version() / read_claim() /
+    # read_version() are available, and the write-behind cache can sit
+    # in front (see app/session/cache.py)
+    supports_delta_writes: bool
+
+    async def load(
+        self,
+        session_id: str,
+        restaurant_id: str,
+        affinity: Optional[str] = None,
+    ) -> Session:
+        ...
+
+    async def save(self, session: Session) -> None:
+        ...
+
+    async def read_version(self, session_id: str) -> Optional[int]:
+        ...
+
+    async def ping(self) -> bool:
+        ...
+
+    async def close(self) -> None:
+        ...
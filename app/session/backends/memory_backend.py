@@ -0,0 +1,127 @@
+# app/session/backends/memory_backend.py
+
+from __future__ import annotations
+
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from app.session.backends.base import SESSION_TTL_SECONDS
+from app.session.codec import JsonSessionCodec, SessionCodec, SessionCodecError
+from app.session.exceptions import SessionConflictError
+from app.session.session import Session
+
+SESSION_MEMORY_MAX_SESSIONS = int(os.getenv("SESSION_MEMORY_MAX_SESSIONS", 10_000))
+
+
+@dataclass
+class _StoredSession:
+    raw: bytes
+    version: int
+    expires_at: float
+
+
+class MemorySessionBackend:
+    """
+    In-process session storage: LRU bounded by count, with TTL.
+
+    Responsibilities:
+    -----------------
+    - Store encoded sessions (every load decodes a private copy)
+    - Expire idle sessions; evict least recently used beyond the bound
+    - Version check on save (same contract as the Redis backend)
+
+    Use for the CLI, manual tests, load tests / replay benchmarks and
+    single-process deployments. Sessions do not survive a restart and
+    are NOT shared between worker processes.
+    """
+
+    supports_delta_writes = False
+
+    def __init__(
+        self,
+        *,
+        max_sessions: int = SESSION_MEMORY_MAX_SESSIONS,
+        ttl_seconds: int = SESSION_TTL_SECONDS,
+        codec: Optional[SessionCodec] = None,
+    ) -> None:
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.codec = codec or JsonSessionCodec()
+
+        self._sessions: "OrderedDict[str, _StoredSession]" = OrderedDict()
+
+    # -------------------------
+    # Public API
+    # -------------------------
+
+    async def load(
+        self,
+        session_id: str,
+        restaurant_id: str,
+        affinity: Optional[str] = None,
+    ) -> Session:
+        stored = self._get(session_id)
+
+        if stored is not None:
+            stored.expires_at = time.monotonic() + self.ttl_seconds
+            try:
+                session = self.codec.decode(stored.raw)
+                session.version = stored.version
+                session.mark_clean()
+                return session
+            except SessionCodecError as e:
+                print(f"[SESSION] Discarding unreadable session {session_id}: {e}")
+
+        return Session(
+            session_id=session_id,
+            restaurant_id=restaurant_id,
+        )
+
+    async def save(self, session: Session) -> None:
+        session_id = session.session_id
+        stored = self._get(session_id)
+
+        current = stored.version if stored is not None else 0
+        if current != session.version:
+            raise SessionConflictError(session_id, session.version, current)
+
+        session.version += 1
+        self._sessions[session_id] = _StoredSession(
+            raw=self.codec.encode(session),
+            version=session.version,
+            expires_at=time.monotonic() + self.ttl_seconds,
+        )
+        self._sessions.move_to_end(session_id)
+        session.mark_clean()
+
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+
+    async def read_version(self, session_id: str) -> Optional[int]:
+        stored = self._get(session_id)
+        return stored.version if stored is not None else None
+
+    async def ping(self) -> bool:
+        return True
+
+    async def close(self) -> None:
+        self._sessions.clear()
+
+    # -------------------------
+    # Internals
+    # -------------------------
+
+    def _get(self, session_id: str) -> Optional[_StoredSession]:
+        stored = self._sessions.get(session_id)
+        if stored is None:
+            return None
+
+        if stored.expires_at <= time.monotonic():
+            del self._sessions[session_id]
+            return None
+
+        self._sessions.move_to_end(session_id)
+        return stored
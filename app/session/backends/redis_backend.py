@@ -0,0 +1,424 @@
+# app/session/backends/redis_backend.py
+
+from __future__ import annotations
+
+import asyncio
+import os
+from typing import Optional
+
+import redis.asyncio as aioredis
+from redis.exceptions import ResponseError
+
+from app.session.codec import (
+    BinarySessionCodec,
+    JsonSessionCodec,
+    SessionCodec,
+    SessionCodecError,
+    SessionWrite,
+)
+from app.session.backends.base import SESSION_TTL_SECONDS
+from app.session.exceptions import SessionConflictError
+from app.session.session import Session
+
+REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
+REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
+REDIS_POOL_SIZE = int(os.getenv("REDIS_POOL_SIZE", 32))
+REDIS_POOL_TIMEOUT_SECONDS = float(os.getenv("REDIS_POOL_TIMEOUT_SECONDS", 2.0))
+
+# A version claimed by a write-behind save (see claim_version()) and
+# never written back (crashed worker) stops blocking others after this
+SESSION_CLAIM_SECONDS = float(os.getenv("SESSION_CLAIM_SECONDS", 5.0))
+
+
+# Compare-and-set of a session hash on its "ver" field.
+#
+# KEYS[1]  session key
+# KEYS[2]  claim key (highest version claimed or written, decimal)
+# ARGV[1]  expected version (encoded as stored)
+# ARGV[2]  "1" when the expected version is 0 (absent "ver" matches)
+# ARGV[3]  TTL seconds
+# ARGV[4]  "1" → full write (replace the key)
+# ARGV[5]  highest version this writer may find claimed (decimal)
+# ARGV[6]  version written (decimal)
+# ARGV[7]  claim TTL milliseconds
+# ARGV[8]  number of HSET field/value pairs, then the pairs,
+#          then the fields to HDEL
+#
+# Returns {1} when applied, {0, stored_ver, claim} on conflict.
+_CAS_WRITE_LUA = """
+local unpack = table.unpack or unpack
+
+local current = ''
+if redis.call('TYPE', KEYS[1])['ok'] == 'hash' then
+    current = redis.call('HGET', KEYS[1], 'ver') or ''
+end
+
+local claim = redis.call('GET', KEYS[2])
+
+if current ~= ARGV[1] and not (current == '' and ARGV[2] == '1') then
+    return {0, current, claim or ''}
+end
+if claim and tonumber(claim) > tonumber(ARGV[5]) then
+    return {0, current, claim}
+end
+
+if ARGV[4] == '1' then
+    redis.call('DEL', KEYS[1])
+end
+
+local pairs_end = 8 + 2 * tonumber(ARGV[8])
+if pairs_end > 8 then
+    redis.call('HSET', KEYS[1], unpack(ARGV, 9, pairs_end))
+end
+if #ARGV > pairs_end then
+    redis.call('HDEL', KEYS[1], unpack(ARGV, pairs_end + 1, #ARGV))
+end
+
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+
+if not claim or tonumber(claim) < tonumber(ARGV[6]) then
+    redis.call('SET', KEYS[2], ARGV[6], 'PX', ARGV[7])
+end
+return {1}
+"""
+
+# Claims the next version of a session before its write lands
+# (write-behind): only one writer can build on a given version.
+#
+# KEYS[1]  session key
+# KEYS[2]  claim key
+# ARGV[1]  expected version (encoded as stored)
+# ARGV[2]  "1" when the expected version is 0 (absent "ver" matches)
+# ARGV[3]  expected version (decimal)
+# ARGV[4]  claimed version (decimal)
+# ARGV[5]  claim TTL milliseconds
+#
+# A live claim at the expected version is the caller's own (nobody
+# else can load a version before it is written back).
+#
+# Returns {1} when claimed, {0, stored_ver, claim} on conflict.
+_CLAIM_LUA = """
+local claim = redis.call('GET', KEYS[2])
+local expected = tonumber(ARGV[3])
+
+if claim and tonumber(claim) > expected then
+    return {0, '', claim}
+end
+
+if not claim or tonumber(claim) < expected then
+    local current = ''
+    if redis.call('TYPE', KEYS[1])['ok'] == 'hash' then
+        current = redis.call('HGET', KEYS[1], 'ver') or ''
+    end
+    if current ~= ARGV[1] and not (current == '' and ARGV[2] == '1') then
+        return {0, current, claim or ''}
+    end
+end
+
+redis.call('SET', KEYS[2], ARGV[4], 'PX', ARGV[5])
+return {1}
+"""
+
+
+class RedisSessionBackend:
+    """
+    Session persistence on redis.asyncio with an explicit, sized pool.
+
+    Responsibilities:
+    -----------------
+    - Own the Redis connection pool (created by the caller, e.g. the
+      FastAPI lifespan — never at import time)
+    - Load a session and refresh its TTL in ONE round trip
+    - Save a session with TTL
+    - Close the pool gracefully on shutdown
+
+    Encoding is delegated to a SessionCodec (binary or legacy JSON).
+
+    With the binary codec a session is a Redis HASH and a save writes
+    only the fields the turn changed (HSET / HDEL + EXPIRE). Saves are
+    optimistic: a Lua compare-and-set on the version stamp applies the
+    write only if nobody saved since the session was loaded, otherwise
+    SessionConflictError is raised. Writers that answer before their
+    write lands (the write-behind cache) claim the version first
+    (claim_version()); a claim is honoured by every write. Other codecs
+    store one string
+    value per session (last writer wins).
+    Sessions stored as strings by older releases are read once and
+    replaced by a hash on their next save.
+
+    The pool is BLOCKING: when all connections are busy, callers wait
+    (up to pool_timeout) instead of opening unbounded connections.
+    """
+
+    def __init__(
+        self,
+        *,
+        host: str = REDIS_HOST,
+        port: int = REDIS_PORT,
+        pool_size: int = REDIS_POOL_SIZE,
+        pool_timeout: float = REDIS_POOL_TIMEOUT_SECONDS,
+        ttl_seconds: int = SESSION_TTL_SECONDS,
+        codec: Optional[SessionCodec] = None,
+        client: Optional[aioredis.Redis] = None,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.codec = codec or JsonSessionCodec()
+        self._hash_layout = isinstance(self.codec, BinarySessionCodec)
+
+        if client is not None:
+            # Externally owned client (tests / shared pools)
+            self._pool = client.connection_pool
+            self._redis = client
+            self._cas_write = self._redis.register_script(_CAS_WRITE_LUA)
+            self._claim = self._redis.register_script(_CLAIM_LUA)
+            return
+
+        self._pool = aioredis.BlockingConnectionPool(
+            host=host,
+            port=port,
+            max_connections=pool_size,
+            timeout=pool_timeout,
+        )
+        self._redis = aioredis.Redis(connection_pool=self._pool)
+        self._cas_write = self._redis.register_script(_CAS_WRITE_LUA)
+        self._claim = self._redis.register_script(_CLAIM_LUA)
+
+    # -------------------------
+    # Public API
+    # -------------------------
+
+    async def load(
+        self,
+        session_id: str,
+        restaurant_id: str,
+        affinity: Optional[str] = None,
+    ) -> Session:
+        """
+        Pipelined load-and-touch: read + EXPIRE in a single round trip.
+        Missing sessions are created fresh (not persisted until saved).
+
+        `affinity` is accepted (and ignored) so the repository and the
+        write-behind cache are interchangeable.
+        """
+        if self._hash_layout:
+            session = await self._load_hash(session_id)
+        else:
+            session = await self._load_string(session_id)
+
+        return session or Session(
+            session_id=session_id,
+            restaurant_id=restaurant_id,
+        )
+
+    async def save(self, session: Session) -> None:
+        if self._hash_layout:
+            await self._save_hash(session)
+            return
+
+        await self._redis.set(
+            _key(session.session_id),
+            self.codec.encode(session),
+            ex=self.ttl_seconds,
+        )
+
+    @property
+    def redis(self) -> aioredis.Redis:
+        """
+        The pooled client, for other short-lived keys (e.g. webhook
+        idempotency) that should share the pool.
+        """
+        return self._redis
+
+    @property
+    def supports_delta_writes(self) -> bool:
+        return self._hash_layout
+
+    async def apply_write(
+        self,
+        session_id: str,
+        write: SessionWrite,
+        expected_version: int,
+        *,
+        version: int,
+        claimed: bool = False,
+    ) -> None:
+        """
+        Applies a hash mutation (HSET / HDEL + EXPIRE) atomically, in one
+        round trip, iff the stored version is still `expected_version`
+        and nobody else claimed a newer one. `version` is the version
+        the write stores; `claimed` → the caller claimed it
+        (claim_version()). A full write replaces the key.
+        """
+        args = [
+            self.codec.encode_version(expected_version),
+            "1" if expected_version == 0 else "0",
+            self.ttl_seconds,
+            "1" if write.full else "0",
+            version if claimed else expected_version,
+            version,
+            int(SESSION_CLAIM_SECONDS * 1000),
+            len(write.fields),
+        ]
+        for name, value in write.fields.items():
+            args.extend((name, value))
+        args.extend(write.delete)
+
+        result = await self._cas_write(
+            keys=[_key(session_id), _claim_key(session_id)],
+            args=args,
+        )
+
+        if not result[0]:
+            raise self._conflict(session_id, expected_version, result)
+
+    async def claim_version(
+        self,
+        session_id: str,
+        expected_version: int,
+        version: int,
+    ) -> None:
+        """
+        Reserves `version` for a write based on `expected_version`, one
+        round trip, so an overlapping writer (any worker) is refused now
+        rather than when the write lands. Raises SessionConflictError.
+        """
+        result = await self._claim(
+            keys=[_key(session_id), _claim_key(session_id)],
+            args=[
+                self.codec.encode_version(expected_version),
+                "1" if expected_version == 0 else "0",
+                expected_version,
+                version,
+                int(SESSION_CLAIM_SECONDS * 1000),
+            ],
+        )
+
+        if not result[0]:
+            raise self._conflict(session_id, expected_version, result)
+
+    async def read_claim(self, session_id: str) -> Optional[int]:
+        """
+        Highest version claimed or written lately (None if no live claim).
+        """
+        raw = await self._redis.get(_claim_key(session_id))
+        return int(raw) if raw is not None else None
+
+    async def read_version(self, session_id: str) -> Optional[int]:
+        """
+        Version stamp of the stored session (None if absent / unversioned).
+        """
+        raw = await self._redis.hget(_key(session_id), "ver")
+        return self.codec.decode_version(raw) if raw is not None else None
+
+    async def ping(self) -> bool:
+        return await self._redis.ping()
+
+    async def warm(self, connections: int) -> int:
+        """
+        Opens up to `connections` pooled connections (concurrent PINGs)
+        and loads the CAS / claim scripts, so the first calls skip connection
+        setup and the NOSCRIPT round trip. Returns the connections opened.
+        """
+        connections = max(1, min(connections, self._pool.max_connections))
+        await asyncio.gather(*(self._redis.ping() for _ in range(connections)))
+        await self._redis.script_load(_CAS_WRITE_LUA)
+        await self._redis.script_load(_CLAIM_LUA)
+        return connections
+
+    async def close(self) -> None:
+        """
+        Graceful shutdown: stop handing out connections, then close them.
+        """
+        await self._redis.aclose()
+        await self._pool.disconnect()
+
+    def _conflict(self, session_id: str, expected_version: int, result) -> SessionConflictError:
+        stored, claim = result[1], result[2]
+        if claim and int(claim) > expected_version:
+            actual = int(claim)
+        else:
+            actual = self.codec.decode_version(stored) if stored else None
+        return SessionConflictError(session_id, expected_version, actual)
+
+    # -------------------------
+    # String layout
+    # -------------------------
+
+    async def _load_string(self, session_id: str) -> Optional[Session]:
+        key = _key(session_id)
+
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.get(key)
+            pipe.expire(key, self.ttl_seconds)
+            raw, _ = await pipe.execute()
+
+        return self._decode(session_id, raw)
+
+    def _decode(self, session_id: str, raw: Optional[bytes]) -> Optional[Session]:
+        if not raw:
+            return None
+
+        try:
+            return self.codec.decode(raw)
+        except SessionCodecError as e:
+            # Unreadable (e.g. foreign menu snapshot) → start over
+            print(f"[SESSION] Discarding unreadable session {session_id}: {e}")
+            return None
+
+    # -------------------------
+    # Hash layout (delta writes)
+    # -------------------------
+
+    async def _load_hash(self, session_id: str) -> Optional[Session]:
+        key = _key(session_id)
+
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.hgetall(key)
+            pipe.expire(key, self.ttl_seconds)
+            fields, _ = await pipe.execute(raise_on_error=False)
+
+        if isinstance(fields, ResponseError):
+            if "WRONGTYPE" not in str(fields):
+                raise fields
+
+            # Written as a string by an older release; the next save
+            # is a full write that replaces it with a hash.
+            return self._decode(session_id, await self._redis.get(key))
+
+        if not fields:
+            return None
+
+        try:
+            session = self.codec.decode_fields(fields)
+        except SessionCodecError as e:
+            print(f"[SESSION] Discarding unreadable session {session_id}: {e}")
+            return None
+
+        # Baseline for dirty tracking: the next save writes only changes
+        session.mark_clean()
+        return session
+
+    async def _save_hash(self, session: Session) -> None:
+        expected = session.version
+        session.version = expected + 1
+
+        try:
+            await self.apply_write(
+                session.session_id,
+                self.codec.encode_changes(session),
+                expected_version=expected,
+                version=session.version,
+            )
+        except SessionConflictError:
+            session.version = expected
+            raise
+
+        session.mark_clean()
+
+
+def _key(session_id: str) -> str:
+    return f"session:{session_id}"
+
+
+def _claim_key(session_id: str) -> str:
+    return f"session-claim:{session_id}"
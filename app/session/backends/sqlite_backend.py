@@ -0,0 +1,190 @@
+# app/session/backends/sqlite_backend.py
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Optional, Tuple
+
+from app.session.backends.base import SESSION_TTL_SECONDS
+from app.session.codec import JsonSessionCodec, SessionCodec, SessionCodecError
+from app.session.exceptions import SessionConflictError
+from app.session.session import Session
+
+SESSION_SQLITE_PATH = os.getenv("SESSION_SQLITE_PATH", "compass_sessions.db")
+
+# Expired rows are purged every N saves
+_PURGE_EVERY_SAVES = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id  TEXT PRIMARY KEY,
+    version     INTEGER NOT NULL,
+    data        BLOB NOT NULL,
+    expires_at  REAL NOT NULL
+)
+"""
+
+# Insert, or overwrite only if the stored version is the expected one
+# (or the stored row has expired). rowcount == 0 → conflict.
+_CAS_UPSERT = """
+INSERT INTO sessions (session_id, version, data, expires_at)
+VALUES (?, ?, ?, ?)
+ON CONFLICT (session_id) DO UPDATE SET
+    version = excluded.version,
+    data = excluded.data,
+    expires_at = excluded.expires_at
+WHERE sessions.version = ? OR sessions.expires_at <= ?
+"""
+
+
+class SqliteSessionBackend:
+    """
+    Session storage in a local SQLite database (WAL mode).
+
+    Responsibilities:
+    -----------------
+    - Durable sessions on a single node without a Redis hop
+    - Safe for several worker processes on the same file (WAL: readers
+      never block the writer; writers wait on busy_timeout)
+    - Version check on save as one compare-and-set UPSERT
+
+    All SQLite calls run on one dedicated thread (the connection is
+    bound to it), never on the event loop.
+    """
+
+    supports_delta_writes = False
+
+    def __init__(
+        self,
+        *,
+        path: str = SESSION_SQLITE_PATH,
+        ttl_seconds: int = SESSION_TTL_SECONDS,
+        codec: Optional[SessionCodec] = None,
+    ) -> None:
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.codec = codec or JsonSessionCodec()
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-session")
+        self._conn: Optional[sqlite3.Connection] = None
+        self._saves = 0
+
+    # -------------------------
+    # Public API
+    # -------------------------
+
+    async def load(
+        self,
+        session_id: str,
+        restaurant_id: str,
+        affinity: Optional[str] = None,
+    ) -> Session:
+        row = await self._run(self._load_row, session_id)
+
+        if row is not None:
+            raw, version = row
+            try:
+                session = self.codec.decode(raw)
+                session.version = version
+                session.mark_clean()
+                return session
+            except SessionCodecError as e:
+                print(f"[SESSION] Discarding unreadable session {session_id}: {e}")
+
+        return Session(
+            session_id=session_id,
+            restaurant_id=restaurant_id,
+        )
+
+    async def save(self, session: Session) -> None:
+        expected = session.version
+        session.version = expected + 1
+
+        try:
+            await self._run(
+                self._cas_write,
+                session.session_id,
+                expected,
+                self.codec.encode(session),
+            )
+        except SessionConflictError:
+            session.version = expected
+            raise
+
+        session.mark_clean()
+
+    async def read_version(self, session_id: str) -> Optional[int]:
+        row = await self._run(self._load_row, session_id, touch=False)
+        return row[1] if row is not None else None
+
+    async def ping(self) -> bool:
+        await self._run(lambda: self._connection().execute("SELECT 1").fetchone())
+        return True
+
+    async def close(self) -> None:
+        await self._run(self._close_connection)
+        self._executor.shutdown(wait=True)
+
+    # -------------------------
+    # Blocking (sqlite thread)
+    # -------------------------
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _close_connection(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _load_row(self, session_id: str, touch: bool = True) -> Optional[Tuple[bytes, int]]:
+        conn = self._connection()
+        now = time.time()
+
+        row = conn.execute(
+            "SELECT data, version FROM sessions WHERE session_id = ? AND expires_at > ?",
+            (session_id, now),
+        ).fetchone()
+
+        if row is not None and touch:
+            conn.execute(
+                "UPDATE sessions SET expires_at = ? WHERE session_id = ?",
+                (now + self.ttl_seconds, session_id),
+            )
+
+        return row
+
+    def _cas_write(self, session_id: str, expected: int, raw: bytes) -> None:
+        conn = self._connection()
+        now = time.time()
+
+        cursor = conn.execute(
+            _CAS_UPSERT,
+            (session_id, expected + 1, raw, now + self.ttl_seconds, expected, now),
+        )
+
+        if cursor.rowcount == 0:
+            row = conn.execute(
+                "SELECT version FROM sessions WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+            raise SessionConflictError(session_id, expected, row[0] if row else None)
+
+        self._saves += 1
+        if self._saves % _PURGE_EVERY_SAVES == 0:
+            conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (now,))
+
+    async def _run(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(fn, *args, **kwargs))
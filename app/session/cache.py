@@ -0,0 +1,490 @@
+# app/session/cache.py
+
+from __future__ import annotations
+
+import asyncio
+import os
+import socket
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+from app.core.metrics import REGISTRY
+from app.session.codec import BinarySessionCodec, SessionWrite
+from app.session.exceptions import SessionConflictError
+from app.session.backends.base import SessionBackend
+from app.session.session import Session
+
+SESSION_CACHE_ENABLED = os.getenv("SESSION_CACHE_ENABLED", "1") == "1"
+SESSION_CACHE_MAX_SESSIONS = int(os.getenv("SESSION_CACHE_MAX_SESSIONS", 2048))
+SESSION_CACHE_MAX_BYTES = int(os.getenv("SESSION_CACHE_MAX_BYTES", 16 * 1024 * 1024))
+
+# Durability deadline: a saved turn reaches Redis within this delay
+SESSION_WRITE_BEHIND_SECONDS = float(os.getenv("SESSION_WRITE_BEHIND_SECONDS", 0.25))
+
+# How long a load waits for another worker's pending write to land
+# (only when the affinity hint says Redis is behind)
+SESSION_HANDOFF_WAIT_SECONDS = float(
+    os.getenv("SESSION_HANDOFF_WAIT_SECONDS", 2 * SESSION_WRITE_BEHIND_SECONDS)
+)
+
+# Node part of the worker id (default: hostname); see current_worker_id()
+WORKER_NODE = os.getenv("WORKER_ID") or socket.gethostname()
+
+# Cookie carrying the affinity hint (Twilio keeps cookies for the call)
+SESSION_AFFINITY_COOKIE = os.getenv("SESSION_AFFINITY_COOKIE", "cv_affinity")
+
+
+_CACHE_EVENTS = (
+    "hits",
+    "misses",
+    "stale",
+    "flushes",
+    "flush_errors",
+    "writeback_conflicts",
+    "evictions",
+)
+
+CACHE_EVENTS = REGISTRY.counter(
+    "session_cache_events_total",
+    "Write-behind session cache events",
+    ("event",),
+)
+
+# Shared with AsyncTurnRunner (retried / rejected turns)
+SESSION_CONFLICTS = REGISTRY.counter(
+    "session_conflicts_total",
+    "Turns that lost an optimistic-concurrency race on save",
+    ("outcome",),
+)
+
+
+# =================================================
+# Affinity hint
+# =================================================
+
+def current_worker_id() -> str:
+    """
+    Identifies this worker process in affinity hints (and turn log
+    segment names): "<node>-<pid>".
+
+    Call it in the worker (lifespan), never at import: with gunicorn's
+    preload_app the master imports the app before forking, and an
+    import-time id would be the master's, shared by every worker.
+    """
+    return f"{WORKER_NODE}-{os.getpid()}"
+
+
+def format_affinity(version: int, worker_id: str) -> str:
+    """
+    "<worker_id>.<version>" — the worker part is what a sticky load
+    balancer routes on; the version lets any worker validate its cache.
+    """
+    return f"{worker_id}.{version}"
+
+
+def parse_affinity(value: Optional[str]) -> Optional[Tuple[str, int]]:
+    if not value or "." not in value:
+        return None
+
+    worker_id, _, version = value.rpartition(".")
+    try:
+        return worker_id, int(version)
+    except ValueError:
+        return None
+
+
+# =================================================
+# Cache
+# =================================================
+
+@dataclass
+class _CacheEntry:
+    raw: bytes                              # whole-session image (binary codec)
+    version: int
+    stored_version: int = 0                 # version Redis holds (last flush / load)
+    pending: Optional[SessionWrite] = None  # saved locally, not yet in Redis
+    deadline: float = 0.0                   # monotonic flush deadline
+    flush_lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    @property
+    def size(self) -> int:
+        # Pending writes are deltas of `raw` → bounded by it
+        return len(self.raw)
+
+
+class WriteBehindSessionCache:
+    """
+    In-process session cache in front of a delta-capable SessionBackend
+    (Redis).
+
+    Responsibilities:
+    -----------------
+    - Serve consecutive turns of a call from memory (no Redis GET)
+    - Coalesce saves and write them back asynchronously, each within
+      the durability deadline (SESSION_WRITE_BEHIND_SECONDS)
+    - Validate cached copies with version stamps, so a call that moved
+      to another worker and back never sees a stale session
+    - Stay within a session-count and byte budget (LRU eviction,
+      flushing pending writes first)
+    - Detect overlapping turns before they are answered: a save based
+      on an older version than the cached one, or on a version another
+      worker already claimed in Redis (claim_version()), raises
+      SessionConflictError — the turn runner's conflict policy applies
+    - Write back with compare-and-set, so a superseded copy never
+      overwrites Redis (only reachable once a claim expired, e.g. a
+      worker stalled past SESSION_CLAIM_SECONDS)
+
+    Non-responsibilities:
+    ---------------------
+    - Encoding (BinarySessionCodec)
+    - Redis I/O (RedisSessionBackend)
+    - Routing (the load balancer may use the affinity hint)
+
+    Every load hands out a private copy decoded from the cached image,
+    so concurrent webhooks of one call never share mutable state
+    (CartItems, immutable, are shared by the codec).
+    """
+
+    def __init__(
+        self,
+        backend: SessionBackend,
+        *,
+        max_sessions: int = SESSION_CACHE_MAX_SESSIONS,
+        max_bytes: int = SESSION_CACHE_MAX_BYTES,
+        write_behind_seconds: float = SESSION_WRITE_BEHIND_SECONDS,
+        handoff_wait_seconds: float = SESSION_HANDOFF_WAIT_SECONDS,
+        worker_id: Optional[str] = None,
+    ) -> None:
+        if not backend.supports_delta_writes:
+            raise ValueError(
+                "WriteBehindSessionCache requires the redis backend with the binary codec"
+            )
+
+        self.backend = backend
+        self.codec: BinarySessionCodec = backend.codec
+        self.worker_id = worker_id or current_worker_id()
+
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.write_behind_seconds = write_behind_seconds
+        self.handoff_wait_seconds = handoff_wait_seconds
+
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._bytes = 0
+
+        self._flusher: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+
+        self.stats: Dict[str, int] = {event: 0 for event in _CACHE_EVENTS}
+
+    # =================================================
+    # Lifecycle
+    # =================================================
+
+    async def start(self) -> None:
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_loop())
+
+    async def close(self) -> None:
+        """
+        Stops the flusher, writes back everything pending, closes Redis.
+        """
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+
+        await self.flush_all()
+        await self.backend.close()
+
+    async def ping(self) -> bool:
+        return await self.backend.ping()
+
+    # =================================================
+    # Public API (same shape as SessionBackend)
+    # =================================================
+
+    async def load(
+        self,
+        session_id: str,
+        restaurant_id: str,
+        affinity: Optional[str] = None,
+    ) -> Session:
+        entry = self._entries.get(session_id)
+        hint = parse_affinity(affinity)
+
+        if entry is not None and await self._is_current(session_id, entry, hint):
+            self._count("hits")
+            self._entries.move_to_end(session_id)
+            return self._checkout(entry)
+
+        if entry is not None:
+            # Another worker wrote a newer version since we cached it.
+            # Anything still pending here is older → never flush it.
+            self._count("stale")
+            if entry.pending is not None:
+                print(f"[SESSION CACHE] Discarding superseded write-back for {session_id}")
+            self._discard(session_id)
+        else:
+            self._count("misses")
+
+        # A turn answered elsewhere may not have landed yet: its claim
+        # (or the caller's hint from another worker) is ahead of Redis
+        expected = await self.backend.read_claim(session_id) or 0
+        if hint is not None and hint[0] != self.worker_id:
+            expected = max(expected, hint[1])
+        if expected:
+            await self._await_handoff(session_id, expected)
+
+        session = await self.backend.load(session_id, restaurant_id)
+        self._store(session_id, _CacheEntry(
+            raw=self.codec.encode(session),
+            version=session.version,
+            stored_version=session.version,
+        ))
+        return session
+
+    async def save(self, session: Session) -> None:
+        session_id = session.session_id
+        entry = self._entries.get(session_id)
+        base = session.version
+
+        if entry is None:
+            await self._write_through(session)
+        else:
+            # Saves and write-backs of one session run one at a time
+            async with entry.flush_lock:
+                if entry.version != base:
+                    # An overlapping turn of this call saved first (same
+                    # worker): detected here, before anything is written.
+                    raise SessionConflictError(session_id, base, entry.version)
+
+                # One small round trip, so that an overlapping turn on
+                # another worker is refused now (and retried / rejected by
+                # the runner), not after both callers were answered
+                try:
+                    await self.backend.claim_version(session_id, base, base + 1)
+                except SessionConflictError:
+                    # This copy is superseded: the next load reads Redis
+                    if self._entries.get(session_id) is entry:
+                        self._discard(session_id)
+                    raise
+
+                session.version = base + 1
+                if self._entries.get(session_id) is not entry:
+                    # Dropped while claiming (eviction): still the latest
+                    self._store(session_id, entry)
+
+                self._bytes -= entry.size
+                entry.raw = self.codec.encode(session)
+                entry.version = session.version
+                write = self.codec.encode_changes(session)
+                if entry.pending is None:
+                    entry.pending = write
+                    entry.deadline = time.monotonic() + self.write_behind_seconds
+                    self._wakeup.set()
+                else:
+                    entry.pending = entry.pending.merge(write)
+                self._bytes += entry.size
+                self._entries.move_to_end(session_id)
+
+        session.mark_clean()
+        await self._enforce_bounds()
+
+    def affinity_for(self, session: Session) -> str:
+        return format_affinity(session.version, self.worker_id)
+
+    # =================================================
+    # Write-back
+    # =================================================
+
+    async def flush(self, session_id: str) -> None:
+        entry = self._entries.get(session_id)
+        if entry is None:
+            return
+
+        async with entry.flush_lock:
+            write = entry.pending
+            if write is None:
+                return
+
+            entry.pending = None
+            version = entry.version
+
+            try:
+                await self.backend.apply_write(
+                    session_id,
+                    write,
+                    expected_version=entry.stored_version,
+                    version=version,
+                    claimed=True,
+                )
+                entry.stored_version = version
+                self._count("flushes")
+            except SessionConflictError:
+                # Our claim expired and another worker saved this call
+                # meanwhile: the turns answered since are lost (counted),
+                # everything cached here is superseded → drop it, never
+                # overwrite.
+                self._count("writeback_conflicts")
+                SESSION_CONFLICTS.inc(outcome="writeback_lost")
+                if self._entries.get(session_id) is entry:
+                    self._discard(session_id)
+            except Exception as e:
+                # Keep it (merged under newer changes) and retry next tick
+                self._count("flush_errors")
+                print(f"[SESSION CACHE] Write-back failed for {session_id}: {e}")
+                entry.pending = write if entry.pending is None else write.merge(entry.pending)
+                entry.deadline = time.monotonic() + self.write_behind_seconds
+                raise
+
+    async def flush_all(self) -> None:
+        for session_id in [sid for sid, e in self._entries.items() if e.pending]:
+            try:
+                await self.flush(session_id)
+            except Exception:
+                pass
+
+    async def _flush_loop(self) -> None:
+        while True:
+            now = time.monotonic()
+            due = [
+                sid for sid, e in self._entries.items()
+                if e.pending is not None and e.deadline <= now
+            ]
+
+            for session_id in due:
+                try:
+                    await self.flush(session_id)
+                except Exception:
+                    pass
+
+            next_deadline = min(
+                (e.deadline for e in self._entries.values() if e.pending is not None),
+                default=None,
+            )
+
+            self._wakeup.clear()
+            timeout = None if next_deadline is None else max(0.0, next_deadline - time.monotonic())
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    # =================================================
+    # Internals
+    # =================================================
+
+    async def _write_through(self, session: Session) -> None:
+        """
+        Saves a session evicted since its load: compare-and-set in Redis.
+        """
+        base = session.version
+        session.version = base + 1
+
+        try:
+            await self.backend.apply_write(
+                session.session_id,
+                self.codec.encode_changes(session),
+                expected_version=base,
+                version=session.version,
+            )
+        except SessionConflictError:
+            session.version = base
+            raise
+
+        self._store(session.session_id, _CacheEntry(
+            raw=self.codec.encode(session),
+            version=session.version,
+            stored_version=session.version,
+        ))
+
+    async def _is_current(
+        self,
+        session_id: str,
+        entry: _CacheEntry,
+        hint: Optional[Tuple[str, int]],
+    ) -> bool:
+        if hint is not None:
+            # The caller's last response carried the current version.
+            # An older hint (retried / overlapping webhook) is still
+            # served from here: this copy is at least as new. A newer
+            # hint means another worker wrote since → stale. Anything
+            # subtler (split brain) is caught by the claim on save.
+            return hint[1] <= entry.version
+
+        if entry.pending is not None or entry.flush_lock.locked():
+            # We are the latest writer; Redis is (or may still be) behind us
+            return True
+
+        # No hint (e.g. /test/chat): one small read instead of a full load
+        return await self.backend.read_version(session_id) == entry.version
+
+    async def _await_handoff(self, session_id: str, expected_version: int) -> None:
+        """
+        The call moved here from another worker whose write-behind may
+        not have landed yet: wait (bounded) for Redis to catch up.
+        """
+        deadline = time.monotonic() + self.handoff_wait_seconds
+
+        while time.monotonic() < deadline:
+            stored = await self.backend.read_version(session_id) or 0
+            if stored >= expected_version:
+                return
+            await asyncio.sleep(self.write_behind_seconds / 5)
+
+        print(f"[SESSION CACHE] Handoff wait expired for {session_id} (v{expected_version})")
+
+    def _count(self, event: str) -> None:
+        self.stats[event] += 1
+        CACHE_EVENTS.inc(event=event)
+
+    def _checkout(self, entry: _CacheEntry) -> Session:
+        session = self.codec.decode(entry.raw)
+        session.version = entry.version
+        session.mark_clean()
+        return session
+
+    def _store(self, session_id: str, entry: _CacheEntry) -> None:
+        self._discard(session_id)
+        self._entries[session_id] = entry
+        self._bytes += entry.size
+
+    async def _drop(self, session_id: str) -> None:
+        """
+        Evicts an entry, writing back its pending changes first.
+        """
+        entry = self._entries.get(session_id)
+        if entry is None:
+            return
+
+        if entry.pending is not None:
+            await self.flush(session_id)
+
+        # flush() awaited: the entry may have been replaced meanwhile
+        if self._entries.get(session_id) is entry:
+            self._discard(session_id)
+
+    def _discard(self, session_id: str) -> None:
+        entry = self._entries.pop(session_id, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    async def _enforce_bounds(self) -> None:
+        while self._entries and (
+            len(self._entries) > self.max_sessions or self._bytes > self.max_bytes
+        ):
+            session_id = next(iter(self._entries))
+            self._count("evictions")
+            try:
+                await self._drop(session_id)
+            except Exception:
+                # Could not persist → keep it, retry on the next save
+                self._entries.move_to_end(session_id)
+                return
@@ -0,0 +1,816 @@
+# app/session/codec.py
+
+from __future__ import annotations
+
+import json
+import os
+import struct
+import zlib
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Protocol, Tuple, Union
+
+import msgpack
+
+from app.cart.cart import Cart
+from app.cart.cart_item import CartItem
+from app.menu.store import MenuStore
+from app.nlu.intent_resolution.intent import Intent
+from app.session.session import Session
+from app.state_machine.context import ConversationContext
+from app.state_machine.conversation_state import ConversationState
+
+# "binary" (default for the server) | "json" (legacy format)
+SESSION_CODEC = os.getenv("SESSION_CODEC", "binary")
+
+# Bump when the binary layout changes; old versions stay decodable.
+# v1: menu IDs as positions in the snapshot's sorted ID table
+# v2: menu IDs as stable per-ID numbers (see MenuIdInterner)
+SESSION_SCHEMA_VERSION = 2
+SUPPORTED_SCHEMA_VERSIONS = (1, 2)
+
+# Cart items remembered per codec, packed and decoded (see
+# BinarySessionCodec._pack_item / _unpack_item)
+SESSION_CODEC_ITEM_CACHE = int(os.getenv("SESSION_CODEC_ITEM_CACHE", 4096))
+
+# First byte of every binary session.
+# Legacy JSON sessions always start with "{", so the two never collide.
+_BINARY_MAGIC = 0xC5
+
+# magic (B) + schema version (B) + menu snapshot fingerprint (I)
+_HEADER = struct.Struct(">BBI")
+
+# Hash layout field names (see BinarySessionCodec.encode_changes)
+_H_HEADER = "h"
+_H_SESSION_ID = "sid"
+_H_RESTAURANT_ID = "rid"
+_H_STATE = "state"
+_H_TURN = "turn"
+_H_INTENT = "intent"
+_H_RESPONSE_KEY = "rkey"
+_H_VERSION = "ver"
+_H_CONTEXT = "c."
+_H_CART = "cart"
+_H_ITEM = "i."
+
+# Session attribute → hash field
+_SESSION_HASH_FIELDS = (
+    ("conversation_state", _H_STATE),
+    ("turn_count", _H_TURN),
+    ("last_intent", _H_INTENT),
+    ("last_response_key", _H_RESPONSE_KEY),
+    ("version", _H_VERSION),
+)
+
+
+class SessionCodecError(Exception):
+    """
+    Raised when a stored session cannot be decoded
+    (unknown schema version, v1 session of another menu snapshot,
+    corrupt payload).
+    Callers treat the session as missing.
+    """
+    pass
+
+
+@dataclass
+class SessionWrite:
+    """
+    Hash mutation for one save: HSET `fields`, HDEL `delete`.
+    `full` → the hash is rewritten from scratch (replace the key).
+    """
+    fields: Dict[str, bytes]
+    delete: List[str]
+    full: bool
+
+    def merge(self, newer: "SessionWrite") -> "SessionWrite":
+        """
+        Coalesces two consecutive writes into one (write-behind).
+        """
+        if newer.full:
+            return newer
+
+        fields = dict(self.fields)
+        delete = [k for k in self.delete if k not in newer.fields]
+
+        for k in newer.delete:
+            fields.pop(k, None)
+            delete.append(k)
+
+        fields.update(newer.fields)
+
+        return SessionWrite(fields=fields, delete=delete, full=self.full)
+
+
+class SessionCodec(Protocol):
+    """
+    Pluggable session (de)serializer used by the session repository.
+    """
+
+    def encode(self, session: Session) -> bytes:
+        ...
+
+    def decode(self, raw: bytes) -> Session:
+        ...
+
+
+# =================================================
+# Legacy JSON codec
+# =================================================
+
+class JsonSessionCodec:
+    """
+    Original JSON document format.
+    Kept for the CLI and for reading sessions written before the
+    binary codec was rolled out.
+    """
+
+    def encode(self, session: Session) -> bytes:
+        return _serialize(session).encode("utf-8")
+
+    def decode(self, raw: Union[bytes, str]) -> Session:
+        return _deserialize(raw)
+
+
+# =================================================
+# Menu ID interning
+# =================================================
+
+class MenuIdInterner:
+    """
+    Maps menu IDs (36-char UUID strings) to small integers.
+
+    v2 (written): each ID maps to a number derived from the ID alone
+    (negative, 31-bit CRC32), not from the rest of the menu — adding or
+    removing menu items never changes what a stored session means.
+    An ID that left the menu decodes to a dangling placeholder, like a
+    stale raw ID would (lookups miss, the session survives). IDs whose
+    numbers collide within one menu are not interned (raw UUIDs).
+
+    v1 (read only): positions in the sorted ID table of the snapshot;
+    only readable under the same snapshot (CRC32 fingerprint of the
+    table, in each session header).
+    """
+
+    def __init__(self, store: MenuStore) -> None:
+        ids = set()
+
+        for item in store.items.values():
+            ids.add(item.item_id)
+
+            for v in item.pricing.variants or []:
+                ids.add(v.variant_id)
+
+            for g in item.side_groups:
+                ids.add(g.group_id)
+                ids.update(c.item_id for c in g.choices)
+
+            for g in item.modifier_groups:
+                ids.add(g.group_id)
+                ids.update(c.modifier_id for c in g.choices)
+
+        self._ids: List[str] = sorted(ids)
+        self._index: Dict[str, int] = {
+            menu_id: i for i, menu_id in enumerate(self._ids)
+        }
+
+        self.fingerprint = zlib.crc32("\n".join(self._ids).encode("utf-8"))
+
+        # menu ID → v2 number (the encode path looks IDs up here)
+        self.numbers: Dict[str, int] = {}
+        self._by_stable: Dict[int, str] = {}
+        collided = set()
+        for menu_id in self._ids:
+            number = stable_menu_id(menu_id)
+            if number in self._by_stable or number in collided:
+                collided.add(number)
+                self.numbers.pop(self._by_stable.pop(number, None), None)
+            else:
+                self.numbers[menu_id] = number
+                self._by_stable[number] = menu_id
+
+        # Every number that decodes to a menu ID of this snapshot, v1
+        # positions (>= 0) and v2 numbers (< 0) alike: one dict lookup
+        # per ID on the decode path (see BinarySessionCodec)
+        self.names: Dict[int, str] = dict(enumerate(self._ids))
+        self.names.update(self._by_stable)
+
+    def intern(self, menu_id: str) -> Optional[int]:
+        return self.numbers.get(menu_id)
+
+    def resolve(self, number: int) -> str:
+        if number < 0:
+            menu_id = self._by_stable.get(number)
+            # Not (or no longer) on the menu: dangling, never fatal
+            return menu_id if menu_id is not None else f"menu:{-number:08x}"
+
+        # v1 position (header fingerprint already checked)
+        if number < len(self._ids):
+            return self._ids[number]
+        raise SessionCodecError(f"Unknown interned menu id: {number}")
+
+
+def stable_menu_id(menu_id: str) -> int:
+    """
+    Menu ID → its v2 number: -(CRC32 & 0x7FFFFFFF) - 1, so it is
+    always negative (v1 positions never are) and fits a msgpack int32.
+    """
+    return -(zlib.crc32(menu_id.encode("utf-8")) & 0x7FFFFFFF) - 1
+
+
+# =================================================
+# Binary codec (schema v1)
+# =================================================
+
+class BinarySessionCodec:
+    """
+    Compact, versioned binary session format.
+
+    Layout:
+    -------
+    header : magic (1) | schema version (1) | menu fingerprint (4)
+    body   : msgpack array, positional fields (no key names)
+
+    Compaction:
+    -----------
+    - Menu IDs → stable ints via MenuIdInterner (independent of the
+      rest of the menu: a menu change keeps live sessions readable)
+    - Other UUIDs (cart_item_id, stale menu IDs) → 16 raw bytes
+    - Enums → their int values
+
+    Legacy JSON sessions are decoded transparently (migration path):
+    they are rewritten in binary on the next save.
+    """
+
+    def __init__(self, interner: MenuIdInterner) -> None:
+        self.interner = interner
+        self._json = JsonSessionCodec()
+        self._ctx_fields = self._context_fields()
+
+        # CartItems are immutable and their cart_item_id is never reused
+        # (the hash layout relies on it too): an item seen once packs and
+        # decodes from here, without the interner and UUID work
+        self._packed_items: Dict[str, list] = {}
+        self._decoded_items: Dict[object, CartItem] = {}
+
+    # -------------------------
+    # Public API
+    # -------------------------
+
+    def encode(self, session: Session) -> bytes:
+        body = [
+            session.session_id,
+            session.restaurant_id,
+            session.conversation_state.value,
+            session.turn_count,
+            session.last_intent.value if session.last_intent else None,
+            session.last_response_key,
+            self._pack_context(session.conversation_context),
+            self._pack_cart(session.cart),
+        ]
+
+        return self._header() + _pack(body)
+
+    def decode(self, raw: Union[bytes, str]) -> Session:
+        if isinstance(raw, str):
+            raw = raw.encode("utf-8")
+
+        if not raw:
+            raise SessionCodecError("Empty session payload")
+
+        if raw[0] != _BINARY_MAGIC:
+            return self._decode_legacy(raw)
+
+        if len(raw) < _HEADER.size:
+            raise SessionCodecError("Truncated session header")
+
+        self._check_header(raw)
+
+        try:
+            body = _unpack(raw[_HEADER.size:])
+            return self._unpack_session(body)
+        except SessionCodecError:
+            raise
+        except Exception as e:
+            raise SessionCodecError(f"Corrupt session payload: {e}") from e
+
+    # -------------------------
+    # Hash layout (delta persistence)
+    # -------------------------
+
+    def encode_changes(self, session: Session) -> SessionWrite:
+        """
+        Hash fields to write / delete for what changed since the session
+        was loaded. Untracked sessions produce a full image.
+
+        Hash layout:
+        ------------
+        h            header (magic | version | menu fingerprint)
+        sid, rid     identity
+        state, turn, intent, rkey
+        ver          version stamp (bumped by the writer, see WriteBehindSessionCache)
+        c.<field>    one entry per ConversationContext field
+        cart         cart_item_id order
+        i.<id>       one entry per CartItem (immutable → written once)
+        """
+        session_dirty = session.dirty_fields()
+
+        # A replaced cart leaves stale item fields behind → rewrite all
+        full = session_dirty is None or "cart" in session_dirty
+
+        ctx = session.conversation_context
+        ctx_dirty = None
+        if not full and "conversation_context" not in session_dirty:
+            ctx_dirty = ctx.dirty_fields()
+
+        cart_changes = None if full else session.cart.pending_changes()
+
+        fields: Dict[str, bytes] = {}
+        delete: List[str] = []
+
+        if full:
+            fields[_H_HEADER] = self._header()
+            fields[_H_SESSION_ID] = _pack(session.session_id)
+            fields[_H_RESTAURANT_ID] = _pack(session.restaurant_id)
+
+        for attr, name in _SESSION_HASH_FIELDS:
+            if full or attr in session_dirty:
+                fields[name] = _pack(self._pack_session_field(session, attr))
+
+        for name, pack, _ in self._ctx_fields:
+            if ctx_dirty is None or name in ctx_dirty:
+                fields[_H_CONTEXT + name] = _pack(pack(getattr(ctx, name)))
+
+        if cart_changes is None:
+            items = session.cart.get_items()
+            fields[_H_CART] = _pack([self._pack_ref(i.cart_item_id) for i in items])
+            for item in items:
+                fields[_H_ITEM + item.cart_item_id] = _pack(self._pack_item(item))
+
+        elif cart_changes.changed:
+            fields[_H_CART] = _pack([self._pack_ref(cid) for cid in cart_changes.order])
+            for item in cart_changes.added:
+                fields[_H_ITEM + item.cart_item_id] = _pack(self._pack_item(item))
+            delete.extend(_H_ITEM + cid for cid in cart_changes.removed)
+
+        return SessionWrite(fields=fields, delete=delete, full=full)
+
+    def decode_fields(self, raw: Dict[Union[bytes, str], bytes]) -> Session:
+        """
+        Rebuilds a session from its hash (HGETALL result).
+        """
+        names = list(raw)
+        if names and type(names[0]) is bytes:
+            # One decode for all field names (none contains NUL)
+            names = b"\0".join(names).decode("utf-8").split("\0")
+        fields = dict(zip(names, raw.values()))
+
+        header = fields.get(_H_HEADER)
+        if not header or len(header) < _HEADER.size or header[0] != _BINARY_MAGIC:
+            raise SessionCodecError("Missing or invalid session header")
+
+        self._check_header(header)
+
+        try:
+            return self._unpack_fields(_unpack_values(fields))
+        except SessionCodecError:
+            raise
+        except Exception as e:
+            raise SessionCodecError(f"Corrupt session hash: {e}") from e
+
+    def encode_version(self, version: int) -> bytes:
+        return _pack(version)
+
+    def decode_version(self, raw: bytes) -> int:
+        try:
+            return int(_unpack(raw))
+        except Exception as e:
+            raise SessionCodecError(f"Corrupt session version: {e}") from e
+
+    def _unpack_fields(self, values: Dict[str, object]) -> Session:
+        """
+        Session from its unpacked hash values (field → value).
+        """
+        ctx = {}
+        for name, _, unpack in self._ctx_fields:
+            key = _H_CONTEXT + name
+            if key in values:
+                ctx[name] = unpack(values[key])
+
+        cart = Cart()
+        for ref in values[_H_CART]:
+            cart_item_id = self._unpack_ref(ref)
+            item = values.get(_H_ITEM + cart_item_id)
+            if item is None:
+                raise SessionCodecError(f"Missing cart item {cart_item_id}")
+            cart.add_item(self._unpack_item(item))
+
+        last_intent = values[_H_INTENT]
+
+        # One constructor call (see _unpack_session). Hashes written
+        # before version stamps have none.
+        return Session(
+            session_id=values[_H_SESSION_ID],
+            restaurant_id=values[_H_RESTAURANT_ID],
+            conversation_state=ConversationState(values[_H_STATE]),
+            conversation_context=ConversationContext(**ctx),
+            cart=cart,
+            turn_count=values[_H_TURN],
+            last_intent=Intent(last_intent) if last_intent is not None else None,
+            last_response_key=values[_H_RESPONSE_KEY],
+            version=values.get(_H_VERSION, 0),
+        )
+
+    def _pack_session_field(self, session: Session, attr: str):
+        value = getattr(session, attr)
+
+        if attr in ("conversation_state", "last_intent"):
+            return value.value if value is not None else None
+
+        return value
+
+    # -------------------------
+    # Header
+    # -------------------------
+
+    def _header(self) -> bytes:
+        return _HEADER.pack(
+            _BINARY_MAGIC,
+            SESSION_SCHEMA_VERSION,
+            self.interner.fingerprint,
+        )
+
+    def _check_header(self, raw: bytes) -> None:
+        _, version, fingerprint = _HEADER.unpack_from(raw)
+
+        if version not in SUPPORTED_SCHEMA_VERSIONS:
+            raise SessionCodecError(f"Unsupported session schema version: {version}")
+
+        # v1 positions only mean something under their own snapshot
+        # (v2 IDs do not depend on it; the fingerprint is informational)
+        if version == 1 and fingerprint != self.interner.fingerprint:
+            raise SessionCodecError("v1 session was written against another menu snapshot")
+
+    # -------------------------
+    # Session
+    # -------------------------
+
+    def _unpack_session(self, body: list) -> Session:
+        (
+            session_id,
+            restaurant_id,
+            state,
+            turn_count,
+            last_intent,
+            last_response_key,
+            ctx,
+            cart,
+        ) = body
+
+        # One constructor call: assignments after it would each go
+        # through change tracking
+        return Session(
+            session_id=session_id,
+            restaurant_id=restaurant_id,
+            conversation_state=ConversationState(state),
+            conversation_context=self._unpack_context(ctx),
+            cart=self._unpack_cart(cart),
+            turn_count=turn_count,
+            last_intent=Intent(last_intent) if last_intent is not None else None,
+            last_response_key=last_response_key,
+        )
+
+    def _decode_legacy(self, raw: bytes) -> Session:
+        try:
+            return self._json.decode(raw)
+        except Exception as e:
+            raise SessionCodecError(f"Corrupt legacy session: {e}") from e
+
+    # -------------------------
+    # Context
+    # -------------------------
+
+    def _context_fields(self) -> Tuple[Tuple[str, Callable, Callable], ...]:
+        """
+        (field, pack, unpack) for every persisted context field.
+        Order is the positional layout of schema v1 — do not reorder.
+        """
+        ref, unref = self._pack_ref, self._unpack_ref
+        groups, ungroups = self._pack_groups, self._unpack_groups
+        same = _identity
+
+        return (
+            ("current_item_id", ref, unref),
+            ("current_item_name", same, same),
+            ("candidate_item_id", ref, unref),
+            ("selected_variant_id", ref, unref),
+            ("current_side_group_index", same, same),
+            ("current_modifier_group_index", same, same),
+            ("selected_side_groups", groups, ungroups),
+            ("selected_modifier_groups", groups, ungroups),
+            ("quantity", same, same),
+            ("pending_action", same, same),
+            ("awaiting_confirmation_for", same, same),
+            ("skipped_modifier_groups",
+                lambda v: [ref(g) for g in v],
+                lambda v: {unref(g) for g in v}),
+            ("size_target", same, same),
+        )
+
+    def _pack_context(self, ctx: ConversationContext) -> list:
+        return [pack(getattr(ctx, name)) for name, pack, _ in self._ctx_fields]
+
+    def _unpack_context(self, data: list) -> ConversationContext:
+        if len(data) != len(self._ctx_fields):
+            raise SessionCodecError("Context field count mismatch")
+
+        return ConversationContext(**{
+            name: unpack(value)
+            for (name, _, unpack), value in zip(self._ctx_fields, data)
+        })
+
+    # -------------------------
+    # Cart
+    # -------------------------
+
+    def _pack_cart(self, cart: Cart) -> list:
+        return [self._pack_item(item) for item in cart.get_items()]
+
+    def _unpack_cart(self, data: list) -> Cart:
+        cart = Cart()
+        for item in data:
+            cart.add_item(self._unpack_item(item))
+        return cart
+
+    def _pack_item(self, item: CartItem) -> list:
+        packed = self._packed_items.get(item.cart_item_id)
+        if packed is None:
+            numbers, ref = self.interner.numbers, self._pack_ref
+            packed = [
+                ref(item.cart_item_id),
+                numbers.get(item.item_id) or ref(item.item_id),
+                item.quantity,
+                ref(item.variant_id),
+                self._pack_groups(item.sides),
+                self._pack_groups(item.modifiers),
+            ]
+            _remember(self._packed_items, item.cart_item_id, packed)
+        return packed
+
+    def _unpack_item(self, data: list) -> CartItem:
+        # Keyed by the packed cart_item_id (bytes | str)
+        item = self._decoded_items.get(data[0])
+        if item is not None:
+            return item
+
+        names, unref = self.interner.names, self._unpack_ref
+        cart_item_id, item_id, quantity, variant_id, sides, modifiers = data
+
+        item = CartItem(
+            cart_item_id=unref(cart_item_id),
+            item_id=names.get(item_id) or unref(item_id),
+            quantity=quantity,
+            variant_id=unref(variant_id),
+            sides=self._unpack_groups(sides),
+            modifiers=self._unpack_groups(modifiers),
+        )
+        _remember(self._decoded_items, cart_item_id, item)
+        return item
+
+    # -------------------------
+    # IDs
+    # -------------------------
+
+    def _pack_groups(self, groups: Dict[str, List[str]]) -> dict:
+        # Menu IDs (nearly all of them) are interned inline
+        numbers, ref = self.interner.numbers, self._pack_ref
+        return {
+            numbers.get(group_id) or ref(group_id): [numbers.get(v) or ref(v) for v in values]
+            for group_id, values in groups.items()
+        }
+
+    def _unpack_groups(self, data: dict) -> Dict[str, List[str]]:
+        # Interned menu IDs (nearly all of them) resolve inline
+        names, unref = self.interner.names, self._unpack_ref
+        return {
+            names.get(group_id) or unref(group_id): [names.get(v) or unref(v) for v in values]
+            for group_id, values in data.items()
+        }
+
+    def _pack_ref(self, value: Optional[str]):
+        """
+        ID → int (interned) | 16 bytes (canonical UUID) | str (anything else)
+        """
+        if value is None:
+            return None
+
+        index = self.interner.intern(value)
+        if index is not None:
+            return index
+
+        packed = _pack_uuid(value)
+        return packed if packed is not None else value
+
+    def _unpack_ref(self, value):
+        # Interned ids are by far the most common → checked first
+        if type(value) is int:
+            return self.interner.resolve(value)
+
+        if value is None or isinstance(value, str):
+            return value
+
+        if isinstance(value, bytes) and len(value) == 16:
+            return _format_uuid(value)
+
+        raise SessionCodecError(f"Unexpected id encoding: {type(value).__name__}")
+
+
+def _pack(value) -> bytes:
+    return msgpack.packb(value, use_bin_type=True)
+
+
+def _unpack(raw: bytes):
+    return msgpack.unpackb(raw, raw=False, strict_map_key=False)
+
+
+_END = object()
+
+
+def _unpack_values(fields: Dict[str, bytes]) -> Dict[str, object]:
+    """
+    Unpacks every hash value but the header in one pass (one msgpack
+    stream instead of a call per field).
+    """
+    names = [name for name in fields if name != _H_HEADER]
+
+    unpacker = msgpack.Unpacker(raw=False, strict_map_key=False)
+    unpacker.feed(b"".join(fields[name] for name in names))
+
+    values = dict(zip(names, unpacker))
+    if len(values) != len(names) or next(unpacker, _END) is not _END:
+        raise SessionCodecError("Corrupt session hash: field values do not align")
+    return values
+
+
+def _identity(value):
+    return value
+
+
+def _remember(cache: dict, key, value) -> None:
+    # Bounded, oldest out first (dicts keep insertion order)
+    if len(cache) >= SESSION_CODEC_ITEM_CACHE:
+        del cache[next(iter(cache))]
+    cache[key] = value
+
+
+@lru_cache(maxsize=4096)
+def _format_uuid(value: bytes) -> str:
+    # Cart item IDs: the same few are decoded on every turn of a call
+    h = value.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+@lru_cache(maxsize=4096)
+def _pack_uuid(value) -> Optional[bytes]:
+    """
+    Canonical (lowercase, hyphenated) UUID string → 16 bytes, else None.
+    Non-canonical spellings are kept verbatim so decoding is lossless.
+    Cached like _format_uuid (cart item IDs recur on every save).
+    """
+    if not isinstance(value, str) or len(value) != 36:
+        return None
+
+    if value[8] != "-" or value[13] != "-" or value[18] != "-" or value[23] != "-":
+        return None
+
+    hex_digits = value.replace("-", "")
+    if len(hex_digits) != 32 or hex_digits != hex_digits.lower():
+        return None
+
+    try:
+        return bytes.fromhex(hex_digits)
+    except ValueError:
+        return None
+
+
+# =================================================
+# Factory
+# =================================================
+
+def build_session_codec(store: MenuStore, name: str = SESSION_CODEC) -> SessionCodec:
+    """
+    Codec for the configured format, bound to the loaded menu snapshot.
+    """
+    if name == "binary":
+        return BinarySessionCodec(MenuIdInterner(store))
+
+    if name == "json":
+        return JsonSessionCodec()
+
+    raise ValueError(f"Unknown session codec: {name}")
+
+
+# =================================================
+# Legacy JSON serialization (schema v0)
+# =================================================
+
+def _serialize(session: Session) -> str:
+    return json.dumps({
+        "session_id": session.session_id,
+        "restaurant_id": session.restaurant_id,
+
+        "conversation_state": session.conversation_state.value,
+
+        "conversation_context": {
+            "current_item_id": session.conversation_context.current_item_id,
+            "current_item_name": session.conversation_context.current_item_name,
+
+            "candidate_item_id": session.conversation_context.candidate_item_id,
+
+            "selected_variant_id": session.conversation_context.selected_variant_id,
+
+            "current_side_group_index": session.conversation_context.current_side_group_index,
+            "current_modifier_group_index": session.conversation_context.current_modifier_group_index,
+
+            "selected_side_groups": session.conversation_context.selected_side_groups,
+            "selected_modifier_groups": session.conversation_context.selected_modifier_groups,
+
+            "quantity": session.conversation_context.quantity,
+            "pending_action": session.conversation_context.pending_action,
+            "awaiting_confirmation_for": session.conversation_context.awaiting_confirmation_for,
+
+            "skipped_modifier_groups": list(
+                session.conversation_context.skipped_modifier_groups
+            ),
+
+            # 🔑 THIS IS THE BUG FIX
+            "size_target": session.conversation_context.size_target,
+        },
+
+        "cart": session.cart.to_dict(),
+
+        "turn_count": session.turn_count,
+        "last_intent": session.last_intent.value if session.last_intent else None,
+        "last_response_key": session.last_response_key,
+    })
+
+
+def _deserialize(raw: Union[bytes, str]) -> Session:
+    data = json.loads(raw)
+
+    session = Session(
+        session_id=data["session_id"],
+        restaurant_id=data["restaurant_id"],
+        conversation_state=ConversationState(data["conversation_state"]),
+    )
+
+    # Restore context
+    ctx = ConversationContext()
+
+    ctx.current_item_id = data["conversation_context"].get("current_item_id")
+    ctx.current_item_name = data["conversation_context"].get("current_item_name")
+
+    ctx.candidate_item_id = data["conversation_context"].get("candidate_item_id")
+
+    ctx.selected_variant_id = data["conversation_context"].get("selected_variant_id")
+
+    ctx.current_side_group_index = data["conversation_context"].get(
+        "current_side_group_index", 0
+    )
+    ctx.current_modifier_group_index = data["conversation_context"].get(
+        "current_modifier_group_index", 0
+    )
+
+    ctx.selected_side_groups = data["conversation_context"].get(
+        "selected_side_groups", {}
+    )
+    ctx.selected_modifier_groups = data["conversation_context"].get(
+        "selected_modifier_groups", {}
+    )
+
+    ctx.quantity = data["conversation_context"].get("quantity")
+    ctx.pending_action = data["conversation_context"].get("pending_action")
+    ctx.awaiting_confirmation_for = data["conversation_context"].get(
+        "awaiting_confirmation_for"
+    )
+
+    ctx.skipped_modifier_groups = set(
+        data["conversation_context"].get("skipped_modifier_groups", [])
+    )
+
+    # 🔑 CRITICAL
+    ctx.size_target = data["conversation_context"].get("size_target")
+
+    session.conversation_context = ctx
+
+    # Restore cart
+    session.cart = Cart.from_dict(data["cart"])
+
+    session.turn_count = data.get("turn_count", 0)
+
+    if data.get("last_intent"):
+        session.last_intent = Intent(data["last_intent"])
+
+    session.last_response_key = data.get("last_response_key")
+
+    return session
@@ -0,0 +1,23 @@
+# app/session/exceptions.py
+
+from typing import Optional
+
+
+class SessionConflictError(Exception):
+    """
+    Raised when a session save loses an optimistic-concurrency race:
+    the stored version is no longer the one the turn was based on
+    (overlapping webhooks for the same CallSid).
+
+    The caller either retries the turn on the fresh session or
+    rejects it; the stored session is never overwritten.
+    """
+
+    def __init__(self, session_id: str, expected: int, actual: Optional[int]) -> None:
+        self.session_id = session_id
+        self.expected = expected
+        self.actual = actual
+        super().__init__(
+            f"Session {session_id} changed concurrently "
+            f"(expected v{expected}, found v{actual})"
+        )
@@ -2,160 +2,74 @@
 
 from __future__ import annotations
 
-import json
+import asyncio
 import os
-import redis
+import threading
+from typing import Optional
 
+from app.session.backends.base import SessionBackend
+from app.session.codec import SessionCodec
 from app.session.session import Session
-from app.state_machine.conversation_state import ConversationState
-from app.state_machine.context import ConversationContext
-from app.cart.cart import Cart
-from app.nlu.intent_resolution.intent import Intent
 
-REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
-REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
-SESSION_TTL_SECONDS = 60 * 60  # 1 hour
-
-_redis = redis.Redis(
-    host=REDIS_HOST,
-    port=REDIS_PORT,
-    decode_responses=True,
-)
+# "redis" (shared, default) | "memory" (one process) | "sqlite" (one node)
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "redis")
 
 
 # =================================================
-# Public API
+# Backend selection
 # =================================================
 
-def load_session(session_id: str, restaurant_id: str) -> Session:
-    key = _key(session_id)
+def build_session_backend(
+    name: str = SESSION_BACKEND,
+    codec: Optional[SessionCodec] = None,
+) -> SessionBackend:
+    """
+    Session backend for the configured name (SESSION_BACKEND).
+    Implementations are imported lazily: the memory and SQLite
+    backends do not need the redis package.
+    """
+    if name == "redis":
+        from app.session.backends.redis_backend import RedisSessionBackend
+        return RedisSessionBackend(codec=codec)
 
-    raw = _redis.get(key)
-    if not raw:
-        return Session(
-            session_id=session_id,
-            restaurant_id=restaurant_id,
-        )
+    if name == "memory":
+        from app.session.backends.memory_backend import MemorySessionBackend
+        return MemorySessionBackend(codec=codec)
 
-    return _deserialize(raw)
+    if name == "sqlite":
+        from app.session.backends.sqlite_backend import SqliteSessionBackend
+        return SqliteSessionBackend(codec=codec)
 
-
-def save_session(session: Session) -> None:
-    key = _key(session.session_id)
-
-    _redis.setex(
-        key,
-        SESSION_TTL_SECONDS,
-        _serialize(session),
-    )
+    raise ValueError(f"Unknown session backend: {name}")
 
 
 # =================================================
-# Serialization
+# Sync API (CLI / scripts) — thin wrappers
 # =================================================
 
-def _serialize(session: Session) -> str:
-    return json.dumps({
-        "session_id": session.session_id,
-        "restaurant_id": session.restaurant_id,
-
-        "conversation_state": session.conversation_state.value,
-
-        "conversation_context": {
-            "current_item_id": session.conversation_context.current_item_id,
-            "current_item_name": session.conversation_context.current_item_name,
-
-            "candidate_item_id": session.conversation_context.candidate_item_id,
-
-            "selected_variant_id": session.conversation_context.selected_variant_id,
-
-            "current_side_group_index": session.conversation_context.current_side_group_index,
-            "current_modifier_group_index": session.conversation_context.current_modifier_group_index,
-
-            "selected_side_groups": session.conversation_context.selected_side_groups,
-            "selected_modifier_groups": session.conversation_context.selected_modifier_groups,
-
-            "quantity": session.conversation_context.quantity,
-            "pending_action": session.conversation_context.pending_action,
-            "awaiting_confirmation_for": session.conversation_context.awaiting_confirmation_for,
-
-            "skipped_modifier_groups": list(
-                session.conversation_context.skipped_modifier_groups
-            ),
-
-            # 🔑 THIS IS THE BUG FIX
-            "size_target": session.conversation_context.size_target,
-        },
-
-        "cart": session.cart.to_dict(),
-
-        "turn_count": session.turn_count,
-        "last_intent": session.last_intent.value if session.last_intent else None,
-        "last_response_key": session.last_response_key,
-    })
+# The async backend is driven by a private event loop,
+# so sync callers share the same code path as the server.
+_sync_lock = threading.Lock()
+_sync_loop: Optional[asyncio.AbstractEventLoop] = None
+_sync_backend: Optional[SessionBackend] = None
 
 
-def _deserialize(raw: str) -> Session:
-    data = json.loads(raw)
+def _run_sync(method: str, *args):
+    global _sync_loop, _sync_backend
 
-    session = Session(
-        session_id=data["session_id"],
-        restaurant_id=data["restaurant_id"],
-        conversation_state=ConversationState(data["conversation_state"]),
-    )
+    with _sync_lock:
+        if _sync_loop is None:
+            _sync_loop = asyncio.new_event_loop()
+            _sync_backend = build_session_backend()
 
-    # Restore context
-    ctx = ConversationContext()
-
-    ctx.current_item_id = data["conversation_context"].get("current_item_id")
-    ctx.current_item_name = data["conversation_context"].get("current_item_name")
-
-    ctx.candidate_item_id = data["conversation_context"].get("candidate_item_id")
-
-    ctx.selected_variant_id = data["conversation_context"].get("selected_variant_id")
-
-    ctx.current_side_group_index = data["conversation_context"].get(
-        "current_side_group_index", 0
-    )
-    ctx.current_modifier_group_index = data["conversation_context"].get(
-        "current_modifier_group_index", 0
-    )
-
-    ctx.selected_side_groups = data["conversation_context"].get(
-        "selected_side_groups", {}
-    )
-    ctx.selected_modifier_groups = data["conversation_context"].get(
-        "selected_modifier_groups", {}
-    )
-
-    ctx.quantity = data["conversation_context"].get("quantity")
-    ctx.pending_action = data["conversation_context"].get("pending_action")
-    ctx.awaiting_confirmation_for = data["conversation_context"].get(
-        "awaiting_confirmation_for"
-    )
-
-    ctx.skipped_modifier_groups = set(
-        data["conversation_context"].get("skipped_modifier_groups", [])
-    )
-
-    # 🔑 CRITICAL
-    ctx.size_target = data["conversation_context"].get("size_target")
-
-    session.conversation_context = ctx
-
-    # Restore cart
-    session.cart = Cart.from_dict(data["cart"])
-
-    session.turn_count = data.get("turn_count", 0)
-
-    if data.get("last_intent"):
-        session.last_intent = Intent(data["last_intent"])
-
-    session.last_response_key = data.get("last_response_key")
+        return _sync_loop.run_until_complete(
+            getattr(_sync_backend, method)(*args)
+        )
 
-    return session
 
+def load_session(session_id: str, restaurant_id: str) -> Session:
+    return _run_sync("load", session_id, restaurant_id)
 
-def _key(session_id: str) -> str:
-    return f"session:{session_id}"
 
+def save_session(session: Session) -> None:
+    _run_sync("save", session)
@@ -0,0 +1,167 @@
+# app/session/resident.py
+
+from __future__ import annotations
+
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Optional
+
+from app.core.metrics import REGISTRY
+from app.session.exceptions import SessionConflictError
+from app.session.session import Session
+
+# How long a resident session may be ahead of the session store:
+# turns within this window are coalesced into one save
+RESIDENT_SAVE_SECONDS = float(os.getenv("RESIDENT_SAVE_SECONDS", 0.25))
+
+RESIDENT_SAVES = REGISTRY.counter(
+    "resident_session_saves_total",
+    "Background saves of connection-resident sessions (saved / conflict / error)",
+    ("outcome",),
+)
+
+# load(session_id, restaurant_id) → Session
+LoadFn = Callable[[str, str], Awaitable[Session]]
+SaveFn = Callable[[Session], Awaitable[None]]
+
+
+class ResidentSession:
+    """
+    A session held in memory for the life of a connection
+    (e.g. the /test/ws WebSocket).
+
+    Responsibilities:
+    -----------------
+    - Load the session once, hand it to the connection's turns
+    - Persist it in the background: turns mark it dirty, a writer
+      saves the latest state at most every RESIDENT_SAVE_SECONDS
+      (and on close), off the response path
+    - Keep turns and saves apart: a save encodes and then marks the
+      session clean, so no turn may change it meanwhile
+    - Lost save race (someone else saved this session): the store
+      wins, the next turn runs on a reloaded copy
+
+    Non-responsibilities:
+    ---------------------
+    - Running turns (AsyncTurnRunner.run_loaded_turn)
+    - Encoding / storage (session backends)
+
+    `save` must raise SessionConflictError on a lost race (every
+    session backend does).
+
+    Event-loop only (not thread-safe). Turns of one connection run
+    one at a time.
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        restaurant_id: str,
+        *,
+        load: LoadFn,
+        save: SaveFn,
+        save_seconds: float = RESIDENT_SAVE_SECONDS,
+    ) -> None:
+        self.session_id = session_id
+        self.restaurant_id = restaurant_id
+        self.save_seconds = save_seconds
+
+        self._load = load
+        self._save = save
+
+        self._session: Optional[Session] = None
+        self._stale = True
+
+        # Held by a turn, or by the writer while saving
+        self._lock = asyncio.Lock()
+        self._dirty = asyncio.Event()
+        self._writer: Optional[asyncio.Task] = None
+
+    # =================================================
+    # Lifecycle
+    # =================================================
+
+    async def open(self) -> Session:
+        async with self._lock:
+            await self._reload()
+        self._writer = asyncio.create_task(self._write_loop())
+        return self._session
+
+    async def close(self) -> None:
+        """
+        Stops the writer and saves what is still pending.
+        """
+        if self._writer is not None:
+            self._writer.cancel()
+            try:
+                await self._writer
+            except asyncio.CancelledError:
+                pass
+            self._writer = None
+
+        async with self._lock:
+            await self._save_pending()
+
+    @property
+    def saved(self) -> bool:
+        """
+        False when turns of this session are not in the store: its last
+        save lost a race or failed (e.g. checked after close()).
+        """
+        return not (self._stale or self._dirty.is_set())
+
+    # =================================================
+    # Turns
+    # =================================================
+
+    @asynccontextmanager
+    async def turn(self):
+        """
+        Yields the session for one turn; it is saved in the background.
+        """
+        async with self._lock:
+            if self._stale:
+                await self._reload()
+
+            try:
+                yield self._session
+            finally:
+                # Even a failed turn may have changed it
+                self._dirty.set()
+
+    # =================================================
+    # Internals
+    # =================================================
+
+    async def _reload(self) -> None:
+        self._session = await self._load(self.session_id, self.restaurant_id)
+        self._stale = False
+
+    async def _write_loop(self) -> None:
+        while True:
+            await self._dirty.wait()
+
+            # Coalesce the turns of the next interval into one save
+            await asyncio.sleep(self.save_seconds)
+
+            async with self._lock:
+                await self._save_pending()
+
+    async def _save_pending(self) -> None:
+        if not self._dirty.is_set() or self._stale:
+            return
+        self._dirty.clear()
+
+        try:
+            await self._save(self._session)
+            RESIDENT_SAVES.inc(outcome="saved")
+        except SessionConflictError as e:
+            RESIDENT_SAVES.inc(outcome="conflict")
+            print(f"[RESIDENT] Session superseded, reloading on next turn: {e}")
+            self._stale = True
+        except Exception as e:
+            # Kept dirty: retried on the next interval
+            RESIDENT_SAVES.inc(outcome="error")
+            print(f"[RESIDENT] Save failed for {self.session_id}: {e}")
+            self._dirty.set()
@@ -8,13 +8,17 @@ from app.state_machine.conversation_state import ConversationState
 from app.state_machine.context import ConversationContext
 from app.cart.cart import Cart
 from app.nlu.intent_resolution.intent import Intent
+from app.session.tracking import ChangeTracked
 
 
 @dataclass
-class Session:
+class Session(ChangeTracked):
     """
     Represents a persisted conversational session.
     This object is the single source of truth across turns.
+
+    Session, its ConversationContext and its Cart track their own
+    changes so the repository can persist only what a turn modified.
     """
 
     # Identity
@@ -35,3 +39,12 @@ class Session:
     last_intent: Optional[Intent] = None
     last_response_key: Optional[str] = None
     last_response_payload: Optional[Dict[str, Any]] = None
+
+    # Persistence: version stamp of the stored copy (maintained by the
+    # session cache / repository, not by conversational code)
+    version: int = 0
+
+    def mark_clean(self) -> None:
+        super().mark_clean()
+        self.conversation_context.mark_clean()
+        self.cart.mark_clean()
@@ -0,0 +1,68 @@
+# app/session/tracking.py
+
+import copy
+from typing import Any, ClassVar, Dict, Optional, Set, Tuple
+
+
+_UNSET = object()
+
+
+class ChangeTracked:
+    """
+    Dirty-field tracking for persisted dataclasses.
+
+    Responsibilities:
+    -----------------
+    - Record attribute assignments made after the object was loaded
+    - Detect in-place mutation of container fields (dicts / sets / lists)
+      by comparing against a snapshot taken at load time
+    - Report which fields changed since the last persist
+
+    Non-responsibilities:
+    ---------------------
+    - Encoding or writing the changes (session codec / repository)
+
+    Objects start UNTRACKED: until mark_clean() is called (after a load
+    or a save) every field is considered dirty.
+    """
+
+    # Fields mutated in place by handlers (setdefault().append, .clear(), ...)
+    _TRACKED_CONTAINERS: ClassVar[Tuple[str, ...]] = ()
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        dirty = self.__dict__.get("_dirty")
+        if (
+            dirty is not None
+            and name not in dirty
+            and self.__dict__.get(name, _UNSET) != value
+        ):
+            # Re-assigning an equal value (e.g. reset()) is not a change
+            dirty.add(name)
+        object.__setattr__(self, name, value)
+
+    def mark_clean(self) -> None:
+        """
+        Current values become the persisted baseline.
+        """
+        object.__setattr__(self, "_dirty", set())
+        object.__setattr__(self, "_snapshot", _snapshot(self, self._TRACKED_CONTAINERS))
+
+    def dirty_fields(self) -> Optional[Set[str]]:
+        """
+        Fields changed since mark_clean(), or None when untracked
+        (never loaded / saved → everything must be written).
+        """
+        dirty = self.__dict__.get("_dirty")
+        if dirty is None:
+            return None
+
+        changed = set(dirty)
+        for name, before in self.__dict__["_snapshot"].items():
+            if name not in changed and getattr(self, name) != before:
+                changed.add(name)
+
+        return changed
+
+
+def _snapshot(obj: Any, names: Tuple[str, ...]) -> Dict[str, Any]:
+    return {name: copy.deepcopy(getattr(obj, name)) for name in names}
@@ -3,16 +3,25 @@
 from dataclasses import dataclass, field
 from typing import Optional, Dict, List, Any
 
+from app.session.tracking import ChangeTracked
 from app.state_machine.conversation_state import ConversationState
 
 
 @dataclass
-class ConversationContext:
+class ConversationContext(ChangeTracked):
     """
     Holds all transient data related to the current conversational task.
     This context aligns with the menu domain model but does NOT duplicate it.
     """
 
+    _TRACKED_CONTAINERS = (
+        "selected_side_groups",
+        "selected_modifier_groups",
+        "awaiting_confirmation_for",
+        "skipped_modifier_groups",
+        "size_target",
+    )
+
     # === Item focus ===
     # Canonical menu item currently being worked on
     current_item_id: Optional[str] = None
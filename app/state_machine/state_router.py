@@ -1,6 +1,7 @@
 # app/state_machine/state_router.py
 
-from typing import Dict, Set
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
 
 from app.nlu.intent_resolution.intent import Intent
 from app.nlu.intent_resolution.intent_result import IntentResult
@@ -8,220 +9,245 @@ from app.state_machine.conversation_state import ConversationState
 from app.state_machine.route_result import RouteResult
 
 
+@dataclass(frozen=True)
+class RouteRule:
+    """
+    Routes `intents` (None → any) in `states` (None → any, minus
+    `except_states`) to `handler`. handler None denies.
+    """
+
+    intents: Optional[FrozenSet[Intent]] = None
+    states: Optional[FrozenSet[ConversationState]] = None
+    handler: Optional[str] = None
+    except_states: FrozenSet[ConversationState] = frozenset()
+
+    def __post_init__(self) -> None:
+        for name in ("intents", "states", "except_states"):
+            value = getattr(self, name)
+            if value is not None and not isinstance(value, frozenset):
+                object.__setattr__(self, name, frozenset(value))
+
+    def matches(self, state: ConversationState, intent: Intent) -> bool:
+        if self.intents is not None and intent not in self.intents:
+            return False
+        if self.states is not None and state not in self.states:
+            return False
+        return state not in self.except_states
+
+
+# Only TASK states belong here: intent → <state>_handler
+TASK_STATE_INTENTS: Dict[ConversationState, Set[Intent]] = {
+    ConversationState.GREETING: {
+        Intent.CONFIRM,
+        Intent.UNKNOWN,
+    },
+
+    ConversationState.IDLE: {
+        Intent.ADD_ITEM,
+        Intent.MODIFY_ITEM,
+        Intent.REMOVE_ITEM,
+        Intent.SHOW_MENU,
+        Intent.END_ADDING,
+        Intent.START_ORDER,
+    },
+
+    ConversationState.CONFIRMING_ITEM: {
+        Intent.CONFIRM,
+        Intent.DENY,
+        Intent.CANCEL,
+        Intent.UNKNOWN,
+    },
+
+    ConversationState.WAITING_FOR_SIDE: {
+        Intent.CONFIRM,
+        Intent.DENY,
+        Intent.CANCEL,
+        Intent.UNKNOWN,
+    },
+
+    ConversationState.WAITING_FOR_MODIFIER: {
+        Intent.CONFIRM,
+        Intent.DENY,
+        Intent.CANCEL,
+        Intent.UNKNOWN,
+    },
+
+    ConversationState.WAITING_FOR_SIZE: {
+        Intent.CONFIRM,
+        Intent.DENY,
+        Intent.CANCEL,
+        Intent.UNKNOWN,
+    },
+
+    ConversationState.WAITING_FOR_QUANTITY: {
+        Intent.CONFIRM,
+        Intent.DENY,
+        Intent.CANCEL,
+        Intent.UNKNOWN,
+    },
+
+    ConversationState.MODIFYING_ITEM: {
+        Intent.CONFIRM,
+        Intent.DENY,
+        Intent.CANCEL,
+        Intent.UNKNOWN,
+    },
+
+    ConversationState.REMOVING_ITEM: {
+        Intent.CONFIRM,
+        Intent.DENY,
+        Intent.CANCEL,
+    },
+
+    ConversationState.CONFIRMING_ORDER: {
+        Intent.CONFIRM,
+        Intent.DENY,
+        Intent.CANCEL,
+    },
+
+    ConversationState.CANCELLATION_CONFIRMATION: {
+        Intent.CONFIRM,
+        Intent.DENY,
+    },
+
+    ConversationState.WAITING_FOR_PAYMENT: {
+        Intent.PAYMENT_DONE,
+        Intent.DENY,
+        Intent.CANCEL,
+        Intent.UNKNOWN,
+    },
+
+    ConversationState.ERROR_RECOVERY: {
+        Intent.CONFIRM,
+        Intent.CANCEL,
+        Intent.UNKNOWN,
+    },
+}
+
+
+# Ordered: the first matching rule decides; no match → denied
+ROUTE_RULES: Tuple[RouteRule, ...] = (
+    # --------------------------------------------------
+    # ASK MENU INFO (GLOBAL, READ-ONLY)
+    # --------------------------------------------------
+    RouteRule({Intent.ASK_MENU_INFO}, {ConversationState.WAITING_FOR_PAYMENT}),
+    RouteRule({Intent.ASK_MENU_INFO}, handler="ask_menu_info_handler"),
+
+    # --------------------------------------------------
+    # CART OVERLAYS (GLOBAL, NON-TASK)
+    # --------------------------------------------------
+    RouteRule({Intent.SHOW_CART, Intent.SHOW_TOTAL}, {ConversationState.IDLE}, "cart_handler"),
+    RouteRule({Intent.SHOW_CART, Intent.SHOW_TOTAL}),
+
+    # --------------------------------------------------
+    # ASK PRICE OF AN ITEM
+    # --------------------------------------------------
+    RouteRule({Intent.ASK_PRICE}, {ConversationState.WAITING_FOR_PAYMENT}),
+    RouteRule({Intent.ASK_PRICE}, handler="ask_price_handler"),
+
+    # --------------------------------------------------
+    # CLEAR CART (DESTRUCTIVE, STRICT)
+    # --------------------------------------------------
+    RouteRule(
+        {Intent.CLEAR_CART},
+        {ConversationState.IDLE, ConversationState.CONFIRMING_ORDER},
+        "cart_handler",
+    ),
+    RouteRule({Intent.CLEAR_CART}),
+
+    # --------------------------------------------------
+    # ADD / REMOVE ITEM (ENTRY POINTS)
+    # --------------------------------------------------
+    RouteRule({Intent.ADD_ITEM}, {ConversationState.IDLE}, "add_item_handler"),
+    RouteRule({Intent.REMOVE_ITEM}, {ConversationState.IDLE}, "remove_item_handler"),
+
+    # --------------------------------------------------
+    # END ADDING / START ORDER
+    # --------------------------------------------------
+    RouteRule(
+        {Intent.END_ADDING, Intent.START_ORDER},
+        {ConversationState.IDLE},
+        "start_order_handler",
+    ),
+
+    # --------------------------------------------------
+    # PAYMENT FLOW
+    # --------------------------------------------------
+    RouteRule(None, {ConversationState.WAITING_FOR_PAYMENT}, "waiting_for_payment_handler"),
+
+    # --------------------------------------------------
+    # DEFAULT TASK-STATE ROUTING
+    # --------------------------------------------------
+    *(
+        RouteRule(intents, {state}, f"{state.name.lower()}_handler")
+        for state, intents in TASK_STATE_INTENTS.items()
+    ),
+
+    # --------------------------------------------------
+    # GLOBAL CANCEL (TASKS ONLY)
+    # --------------------------------------------------
+    RouteRule({Intent.CANCEL}, handler="cancel_handler", except_states={ConversationState.IDLE}),
+)
+
+_DENIED = RouteResult(allowed=False)
+
+
 class StateRouter:
     """
     Authoritative router that decides whether a detected intent
     is allowed to execute in the current conversation state.
 
+    The rules (ROUTE_RULES) are compiled once into a dense
+    state × intent table: route() is a single lookup.
+
     IMPORTANT:
     - Cart utilities are overlays, NOT states
     - SHOWING_* states do not exist
+    - RouteResults are shared between turns: read-only
     """
 
-    def __init__(self) -> None:
-        # Only TASK states belong here
-        self._allowed_intents: Dict[ConversationState, Set[Intent]] = {
-            ConversationState.GREETING: {
-                Intent.CONFIRM,
-                Intent.UNKNOWN,
-            },
-
-            ConversationState.IDLE: {
-                Intent.ADD_ITEM,
-                Intent.MODIFY_ITEM,
-                Intent.REMOVE_ITEM,
-                Intent.SHOW_MENU,
-                Intent.END_ADDING,
-                Intent.START_ORDER,
-            },
-
-            ConversationState.CONFIRMING_ITEM: {
-                Intent.CONFIRM,
-                Intent.DENY,
-                Intent.CANCEL,
-                Intent.UNKNOWN,
-            },
-
-            ConversationState.WAITING_FOR_SIDE: {
-                Intent.CONFIRM,
-                Intent.DENY,
-                Intent.CANCEL,
-                Intent.UNKNOWN,
-            },
-
-            ConversationState.WAITING_FOR_MODIFIER: {
-                Intent.CONFIRM,
-                Intent.DENY,
-                Intent.CANCEL,
-                Intent.UNKNOWN,
-            },
-
-            ConversationState.WAITING_FOR_SIZE: {
-                Intent.CONFIRM,
-                Intent.DENY,
-                Intent.CANCEL,
-                Intent.UNKNOWN,
-            },
-
-            ConversationState.WAITING_FOR_QUANTITY: {
-                Intent.CONFIRM,
-                Intent.DENY,
-                Intent.CANCEL,
-                Intent.UNKNOWN,
-            },
-
-            ConversationState.MODIFYING_ITEM: {
-                Intent.CONFIRM,
-                Intent.DENY,
-                Intent.CANCEL,
-                Intent.UNKNOWN,
-            },
-
-            ConversationState.REMOVING_ITEM: {
-                Intent.CONFIRM,
-                Intent.DENY,
-                Intent.CANCEL,
-            },
-
-            ConversationState.CONFIRMING_ORDER: {
-                Intent.CONFIRM,
-                Intent.DENY,
-                Intent.CANCEL,
-            },
-
-            ConversationState.CANCELLATION_CONFIRMATION: {
-                Intent.CONFIRM,
-                Intent.DENY,
-            },
-
-            ConversationState.WAITING_FOR_PAYMENT: {
-                Intent.PAYMENT_DONE,
-                Intent.DENY,
-                Intent.CANCEL,
-                Intent.UNKNOWN,
-            },
-
-            ConversationState.ERROR_RECOVERY: {
-                Intent.CONFIRM,
-                Intent.CANCEL,
-                Intent.UNKNOWN,
-            },
+    def __init__(self, rules: Iterable[RouteRule] = ROUTE_RULES) -> None:
+        self.rules: Tuple[RouteRule, ...] = tuple(rules)
+
+        intents = list(Intent)
+        self._intent_index = {intent: n for n, intent in enumerate(intents)}
+        self._state_offset = {
+            state: n * len(intents) for n, state in enumerate(ConversationState)
         }
 
-    def route(self, state: ConversationState, intent_result: IntentResult) -> RouteResult:
-        intent = intent_result.intent
-
-        # --------------------------------------------------
-        # ASK MENU INFO (GLOBAL, READ-ONLY)
-        # --------------------------------------------------
-        if intent == Intent.ASK_MENU_INFO:
-            if state == ConversationState.WAITING_FOR_PAYMENT:
-                return RouteResult(allowed=False)
-
-            return RouteResult(
-                allowed=True,
-                handler_name="ask_menu_info_handler",
-            )
-
-        # --------------------------------------------------
-        # CART OVERLAYS (GLOBAL, NON-TASK)
-        # --------------------------------------------------
-        if intent in {Intent.SHOW_CART, Intent.SHOW_TOTAL}:
-            if state != ConversationState.IDLE:
-                return RouteResult(allowed=False)
-
-            return RouteResult(
-                allowed=True,
-                handler_name="cart_handler",
-            )
-
-        # --------------------------------------------------
-        # ASK PRICE OF AN ITEM
-        # --------------------------------------------------
-        if intent == Intent.ASK_PRICE:
-            if state == ConversationState.WAITING_FOR_PAYMENT:
-                return RouteResult(allowed=False)
-
-            return RouteResult(
-                allowed=True,
-                handler_name="ask_price_handler",
-            )
-
-        # --------------------------------------------------
-        # CLEAR CART (DESTRUCTIVE, STRICT)
-        # --------------------------------------------------
-        if intent == Intent.CLEAR_CART:
-            if state in {
-                ConversationState.IDLE,
-                ConversationState.CONFIRMING_ORDER,
-            }:
-                return RouteResult(
-                    allowed=True,
-                    handler_name="cart_handler",
-                )
-
-            return RouteResult(allowed=False)
-
-        # --------------------------------------------------
-        # ADD ITEM (ENTRY POINT)
-        # --------------------------------------------------
-        if state == ConversationState.IDLE and intent == Intent.ADD_ITEM:
-            return RouteResult(
-                allowed=True,
-                handler_name="add_item_handler",
-            )
-
-        if state == ConversationState.IDLE and  intent_result.intent == Intent.REMOVE_ITEM:
-            return RouteResult(allowed=True, handler_name="remove_item_handler")
-
-        # --------------------------------------------------
-        # REMOVE ITEM (ENTRY POINT)
-        # --------------------------------------------------
-        if state == ConversationState.IDLE and intent == Intent.REMOVE_ITEM:
-            return RouteResult(
-                allowed=True,
-                handler_name="remove_item_handler",
-            )
-
-        # --------------------------------------------------
-        # END ADDING / START ORDER
-        # --------------------------------------------------
-        if state == ConversationState.IDLE and intent in {
-            Intent.END_ADDING,
-            Intent.START_ORDER,
-        }:
-            return RouteResult(
-                allowed=True,
-                handler_name="start_order_handler",
-            )
-
-        # --------------------------------------------------
-        # PAYMENT FLOW
-        # --------------------------------------------------
-        if state == ConversationState.WAITING_FOR_PAYMENT:
-            return RouteResult(
-                allowed=True,
-                handler_name="waiting_for_payment_handler",
-            )
-
-        # --------------------------------------------------
-        # DEFAULT TASK-STATE ROUTING
-        # --------------------------------------------------
-        allowed_intents = self._allowed_intents.get(state, set())
-        if intent in allowed_intents:
-            return RouteResult(
-                allowed=True,
-                handler_name=f"{state.name.lower()}_handler",
-            )
-
-        # --------------------------------------------------
-        # GLOBAL CANCEL (TASKS ONLY)
-        # --------------------------------------------------
-        if intent == Intent.CANCEL and state != ConversationState.IDLE:
-            return RouteResult(
-                allowed=True,
-                handler_name="cancel_handler",
-            )
-
-        return RouteResult(allowed=False)
+        # Rule index per cell (None → no rule matched), for reports
+        self.rule_table: List[Optional[int]] = []
+        self._table: List[RouteResult] = []
 
+        for state in ConversationState:
+            for intent in intents:
+                index = self._first_match(state, intent)
+                self.rule_table.append(index)
+                self._table.append(self._result(index))
+
+    def route(self, state: ConversationState, intent_result: IntentResult) -> RouteResult:
+        return self.lookup(state, intent_result.intent)
+
+    def lookup(self, state: ConversationState, intent: Intent) -> RouteResult:
+        return self._table[self._state_offset[state] + self._intent_index[intent]]
+
+    def rule_for(self, state: ConversationState, intent: Intent) -> Optional[int]:
+        """
+        Index in self.rules of the rule deciding (state, intent).
+        """
+        return self.rule_table[self._state_offset[state] + self._intent_index[intent]]
+
+    # -------------------------
+    # Compilation
+    # -------------------------
+
+    def _first_match(self, state: ConversationState, intent: Intent) -> Optional[int]:
+        for index, rule in enumerate(self.rules):
+            if rule.matches(state, intent):
+                return index
+        return None
+
+    def _result(self, index: Optional[int]) -> RouteResult:
+        if index is None or self.rules[index].handler is None:
+            return _DENIED
+        return RouteResult(allowed=True, handler_name=self.rules[index].handler)
@@ -0,0 +1,89 @@
+"""
+/test/chat/batch: a failing conversation ends itself, not the batch.
+
+Failures are injected per session_id: opening the session, a turn,
+and the final save (lost race). Every conversation must come back in
+a 200 response, the failing ones with `error` set and the turns that
+completed before.
+
+Run:
+    python -m app.tests.manual.test_chat_batch
+"""
+
+from fastapi.testclient import TestClient
+
+from app.api.twilio_server import app
+from app.session.backends.memory_backend import MemorySessionBackend
+from app.session.exceptions import SessionConflictError
+
+UTTERANCES = ["i want a chicken taco", "coke", "no"]
+
+
+def _inject_failures(backend, runner):
+    load, save = backend.load, backend.save
+    run_loaded_turn = runner.run_loaded_turn
+
+    async def failing_load(session_id, restaurant_id, affinity=None):
+        if session_id == "fails-open":
+            raise ConnectionError("session store unreachable")
+        return await load(session_id, restaurant_id, affinity)
+
+    async def failing_save(session):
+        if session.session_id == "fails-save":
+            raise SessionConflictError(session.session_id, session.version, session.version + 1)
+        await save(session)
+
+    async def failing_turn(session, hypotheses, analysis=None):
+        if session.session_id == "fails-turn" and session.turn_count == 1:
+            raise RuntimeError("turn failed")
+        return await run_loaded_turn(session, hypotheses, analysis)
+
+    backend.load = failing_load
+    backend.save = failing_save
+    runner.run_loaded_turn = failing_turn
+
+
+def test_failing_conversations_do_not_fail_the_batch():
+    backend = MemorySessionBackend()
+    app.state.session_backend = backend
+
+    with TestClient(app) as client:
+        _inject_failures(backend, app.state.runner)
+
+        session_ids = ["ok", "fails-open", "fails-turn", "fails-save"]
+        response = client.post("/test/chat/batch", json={
+            "conversations": [
+                {"session_id": sid, "utterances": UTTERANCES}
+                for sid in session_ids
+            ],
+        })
+
+    del app.state.session_backend
+
+    assert response.status_code == 200, response.text
+    results = {c["session_id"]: c for c in response.json()["conversations"]}
+    for sid, result in results.items():
+        print(f"{sid}: {len(result['turns'])} turns, error={result['error']!r}")
+
+    assert results["ok"]["error"] is None
+    assert len(results["ok"]["turns"]) == len(UTTERANCES)
+
+    assert "unreachable" in results["fails-open"]["error"]
+    assert results["fails-open"]["turns"] == []
+
+    assert results["fails-turn"]["error"] == "turn failed"
+    assert len(results["fails-turn"]["turns"]) == 1
+
+    assert results["fails-save"]["error"] is not None
+    assert len(results["fails-save"]["turns"]) == len(UTTERANCES)
+
+    assert response.json()["turns"] == 2 * len(UTTERANCES) + 1
+
+
+def main():
+    test_failing_conversations_do_not_fail_the_batch()
+    print("CHAT BATCH TEST PASSED")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Write-behind session cache: overlapping turns across workers.
+
+Two WriteBehindSessionCache instances (two workers) share one Redis
+(fakeredis, with Lua). A turn saved on one worker must refuse an
+overlapping turn on the other at save() — before it is answered —
+and the loser's reload must see the winner's turn. AsyncTurnRunner's
+conflict policy then retries the losing turn.
+
+Needs fakeredis with Lua support (lupa).
+
+Run:
+    python -m app.tests.manual.test_session_write_behind
+"""
+
+import asyncio
+from pathlib import Path
+
+import fakeredis
+
+from app.core.hypothesis_selector import SpeechHypothesis
+from app.core.response_builder import ResponseBuilder
+from app.core.turn_engine import TurnEngine
+from app.core.turn_runner import AsyncTurnRunner
+from app.menu.repository import MenuRepository
+from app.menu.store import MenuStore
+from app.session.backends.redis_backend import RedisSessionBackend
+from app.session.cache import SESSION_CONFLICTS, WriteBehindSessionCache
+from app.session.codec import BinarySessionCodec, MenuIdInterner
+from app.session.exceptions import SessionConflictError
+from app.state_machine.state_router import StateRouter
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+BASE_PATH = PROJECT_ROOT / "data" / "restaurants" / "demo"
+
+RESTAURANT_ID = "demo"
+SESSION_ID = "CA-write-behind-test"
+
+
+def _store() -> MenuStore:
+    return MenuStore(BASE_PATH / "menu.json", BASE_PATH / "entity_index.json")
+
+
+def _workers(count: int = 2, store: MenuStore = None, write_behind_seconds: float = 0.05):
+    store = store or _store()
+    server = fakeredis.FakeServer()
+
+    caches = []
+    for n in range(count):
+        backend = RedisSessionBackend(
+            codec=BinarySessionCodec(MenuIdInterner(store)),
+            client=fakeredis.aioredis.FakeRedis(server=server),
+        )
+        caches.append(WriteBehindSessionCache(
+            backend,
+            worker_id=f"worker-{n}",
+            write_behind_seconds=write_behind_seconds,
+            handoff_wait_seconds=4 * write_behind_seconds,
+        ))
+    return caches
+
+
+async def _overlap_is_refused_at_save():
+    first, second = _workers()
+    for cache in (first, second):
+        await cache.start()
+
+    # Both workers load v0 (overlapping webhooks of one call)
+    a = await first.load(SESSION_ID, RESTAURANT_ID)
+    b = await second.load(SESSION_ID, RESTAURANT_ID)
+
+    a.turn_count += 1
+    await first.save(a)
+
+    b.turn_count += 10
+    try:
+        await second.save(b)
+    except SessionConflictError as e:
+        print("Refused at save:", e)
+    else:
+        raise AssertionError("Overlapping save on another worker was accepted")
+
+    lost_before = SESSION_CONFLICTS.value(outcome="writeback_lost")
+
+    # The loser reloads: it waits for the winner's write-back
+    b = await second.load(SESSION_ID, RESTAURANT_ID)
+    assert b.version == a.version and b.turn_count == 1, (b.version, b.turn_count)
+
+    b.turn_count += 10
+    await second.save(b)
+
+    # Both write-backs land; nothing was dropped
+    await second.flush_all()
+    await first.flush_all()
+    stored = await first.backend.load(SESSION_ID, RESTAURANT_ID)
+    assert stored.turn_count == 11 and stored.version == 2, (stored.turn_count, stored.version)
+    assert SESSION_CONFLICTS.value(outcome="writeback_lost") == lost_before
+
+    # The first worker's copy is behind now: its next save is refused too
+    a = await first.load(SESSION_ID, RESTAURANT_ID, affinity=f"worker-0.{a.version}")
+    a.turn_count += 1
+    try:
+        await first.save(a)
+    except SessionConflictError:
+        pass
+    else:
+        raise AssertionError("Save on a superseded cached copy was accepted")
+
+    a = await first.load(SESSION_ID, RESTAURANT_ID)
+    assert a.turn_count == 11
+
+    for cache in (first, second):
+        await cache.close()
+
+
+async def _runner_retries_the_losing_turn():
+    store = _store()
+    repo = MenuRepository(store)
+    engine = TurnEngine(StateRouter(), repo)
+    responder = ResponseBuilder(repo)
+
+    # Write-back slower than the two turns: the overlap is certain
+    caches = _workers(store=store, write_behind_seconds=0.5)
+    runners = []
+    for cache in caches:
+        await cache.start()
+        runners.append(AsyncTurnRunner(
+            engine,
+            responder,
+            load=cache.load,
+            save=cache.save,
+            conflict_policy="retry",
+        ))
+    first, second = runners
+
+    # Warm (the first turn compiles lazily): the turns below must
+    # both fit inside one write-behind interval
+    await first.run_turn("warm-up", RESTAURANT_ID, [SpeechHypothesis("hi", 1.0)])
+
+    # v1 in Redis, cached by both workers ...
+    await first.run_turn(SESSION_ID, RESTAURANT_ID, [SpeechHypothesis("i want a chicken taco", 1.0)])
+    await caches[0].flush_all()
+    await caches[1].load(SESSION_ID, RESTAURANT_ID)
+
+    # ... the first answers a turn (v2, not written back yet) ...
+    await first.run_turn(SESSION_ID, RESTAURANT_ID, [SpeechHypothesis("coke", 1.0)])
+
+    # ... and the second runs the next turn on its v1 copy (still what
+    # Redis holds): refused at save, re-run on the first worker's v2
+    retried_before = SESSION_CONFLICTS.value(outcome="retried")
+    turn = await second.run_turn(SESSION_ID, RESTAURANT_ID, [SpeechHypothesis("no", 1.0)])
+
+    assert SESSION_CONFLICTS.value(outcome="retried") == retried_before + 1
+    assert turn.session.version == 3 and turn.session.turn_count == 3, (
+        turn.session.version, turn.session.turn_count,
+    )
+
+    for runner, cache in zip(runners, caches):
+        runner.shutdown()
+        await cache.close()
+
+
+def test_overlap_is_refused_at_save():
+    asyncio.run(_overlap_is_refused_at_save())
+
+
+def test_runner_retries_the_losing_turn():
+    asyncio.run(_runner_retries_the_losing_turn())
+
+
+def main():
+    test_overlap_is_refused_at_save()
+    test_runner_retries_the_losing_turn()
+    print("SESSION WRITE-BEHIND TEST PASSED")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+SpeculativeNLUCache: which partial analysis a final turn is offered.
+
+Partials are analyzed concurrently and may finish out of order: the
+cache keeps the longest one (a late partial the kept one extends
+never replaces it), never one computed for another state, and offers
+it to one turn only.
+
+Run:
+    python -m app.tests.manual.test_speculation
+"""
+
+from app.core.speculation import SpeculativeNLUCache, extends
+from app.core.turn_engine import TurnAnalysis
+from app.nlu.intent_resolution.intent import Intent
+from app.state_machine.conversation_state import ConversationState
+
+CALL_SID = "CA-speculation-test"
+
+
+def _analysis(text: str, state: ConversationState = ConversationState.IDLE) -> TurnAnalysis:
+    return TurnAnalysis(
+        state=state,
+        cleaned_text=text,
+        intent_result=None,
+        normalized_text=text,
+        refined_intent=Intent.ADD_ITEM,
+    )
+
+
+def test_extends_on_word_boundaries():
+    assert extends("i want a chicken taco", "i want a chicken")
+    assert extends("i want a chicken", "i want a chicken")
+    assert not extends("i want a chicken", "i want a chick")
+    assert not extends("i want a chicken", "i want a chicken taco")
+    assert not extends("chicken", "")
+
+
+def test_late_shorter_partial_does_not_replace_longer():
+    cache = SpeculativeNLUCache()
+    cache.remember_state(CALL_SID, ConversationState.IDLE)
+
+    cache.store(CALL_SID, _analysis("i want a chicken taco"))
+    cache.store(CALL_SID, _analysis("i want a chicken"))
+    assert cache.latest(CALL_SID).cleaned_text == "i want a chicken taco"
+    assert cache.covers(CALL_SID, "i want a chicken")
+    assert not cache.covers(CALL_SID, "i want a beef taco")
+
+    # A revision (not a prefix) is newer information: it replaces
+    cache.store(CALL_SID, _analysis("i want a beef taco"))
+    assert cache.latest(CALL_SID).cleaned_text == "i want a beef taco"
+
+
+def test_state_guard():
+    cache = SpeculativeNLUCache()
+    cache.remember_state(CALL_SID, ConversationState.IDLE)
+    cache.store(CALL_SID, _analysis("coke"))
+
+    # The turn moved on: the analysis is dropped, late ones refused
+    cache.remember_state(CALL_SID, ConversationState.WAITING_FOR_SIDE)
+    assert cache.latest(CALL_SID) is None
+    cache.store(CALL_SID, _analysis("coke and fries"))
+    assert not cache.covers(CALL_SID, "coke")
+
+    cache.store(CALL_SID, _analysis("fries", ConversationState.WAITING_FOR_SIDE))
+    assert cache.take(CALL_SID).cleaned_text == "fries"
+    assert cache.take(CALL_SID) is None
+
+
+def main():
+    test_extends_on_word_boundaries()
+    test_late_shorter_partial_does_not_replace_longer()
+    test_state_guard()
+    print("SPECULATION TEST PASSED")
+
+
+if __name__ == "__main__":
+    main()
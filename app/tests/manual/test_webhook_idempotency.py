@@ -0,0 +1,71 @@
+"""
+Webhook idempotency around turns that did not complete.
+
+A /process_speech turn that loses a session race answers with the
+conflict reprompt and keeps the caller on the same ?turn=. Saying the
+same words again produces the same idempotency key: the turn must run
+then, not replay the reprompt.
+
+Run:
+    python -m app.tests.manual.test_webhook_idempotency
+"""
+
+from fastapi.testclient import TestClient
+
+from app.api.twilio_server import CONFLICT_REPROMPT, app
+from app.session.backends.memory_backend import MemorySessionBackend
+from app.session.exceptions import SessionConflictError
+
+CALL_SID = "CA-idempotency-test"
+UTTERANCE = "I want a cheeseburger"
+
+
+def _conflict_once(runner):
+    """
+    Makes the runner's next turn lose a save race, once.
+    """
+    run_turn = runner.run_turn
+    state = {"raised": False}
+
+    async def racing_run_turn(**kwargs):
+        if not state["raised"]:
+            state["raised"] = True
+            raise SessionConflictError(kwargs["session_id"], 0, 1)
+        return await run_turn(**kwargs)
+
+    runner.run_turn = racing_run_turn
+
+
+def test_conflict_reply_is_not_replayed():
+    app.state.session_backend = MemorySessionBackend()
+
+    with TestClient(app) as client:
+        client.post("/voice", data={"CallSid": CALL_SID})
+        _conflict_once(app.state.runner)
+
+        speech = {"CallSid": CALL_SID, "SpeechResult": UTTERANCE, "Confidence": "0.9"}
+
+        first = client.post("/process_speech?turn=0", data=speech)
+        print("T1:", first.text)
+        assert CONFLICT_REPROMPT in first.text
+
+        # Same call, same ?turn=, same words → same idempotency key
+        second = client.post("/process_speech?turn=0", data=speech)
+        print("T2:", second.text)
+        assert CONFLICT_REPROMPT not in second.text, "Conflict reprompt was replayed"
+        assert "turn=1" in second.text, "The repeated utterance did not run the turn"
+
+        # A genuine retry of the completed turn is replayed
+        third = client.post("/process_speech?turn=0", data=speech)
+        assert third.text == second.text
+
+    del app.state.session_backend
+
+
+def main():
+    test_conflict_reply_is_not_replayed()
+    print("WEBHOOK IDEMPOTENCY TEST PASSED")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+# app/tts/base.py
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from typing import Protocol
+
+# Voice settings are part of every cache key: changing them
+# re-synthesizes instead of playing audio of the old voice
+TTS_VOICE = os.getenv("TTS_VOICE", "default")
+TTS_LANGUAGE = os.getenv("TTS_LANGUAGE", "en-US")
+TTS_RATE = float(os.getenv("TTS_RATE", 1.0))
+
+
+@dataclass(frozen=True)
+class VoiceSettings:
+    voice: str = TTS_VOICE
+    language: str = TTS_LANGUAGE
+    rate: float = TTS_RATE
+
+    def cache_tag(self) -> str:
+        return f"{self.voice}|{self.language}|{self.rate:g}"
+
+
+class SynthesisEngine(Protocol):
+    """
+    Text → audio, used by the prompt audio cache (app/tts/prompt_cache.py).
+
+    Contract:
+    ---------
+    - synthesize() is blocking; it is only called off the event loop
+    - the same (text, settings) always yields equivalent audio
+    - errors are raised, the cache falls back to <Say>
+
+    Implementations:
+    ----------------
+    - stub : StubSynthesisEngine (local tone WAV, no service; tests / load runs)
+    """
+
+    name: str
+    content_type: str       # e.g. audio/wav
+    file_extension: str     # e.g. wav
+
+    def synthesize(self, text: str, settings: VoiceSettings) -> bytes:
+        ...
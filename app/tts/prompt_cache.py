@@ -0,0 +1,292 @@
+# app/tts/prompt_cache.py
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import re
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, Set
+
+from app.core.metrics import REGISTRY
+from app.tts.base import SynthesisEngine, VoiceSettings
+
+# Off by default: without a real engine configured, <Say> is the voice
+TTS_CACHE_ENABLED = os.getenv("TTS_CACHE_ENABLED", "0") == "1"
+TTS_ENGINE = os.getenv("TTS_ENGINE", "stub")
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", "tts_cache")
+
+# Audio files kept (least recently played are deleted first)
+TTS_CACHE_MAX_ENTRIES = int(os.getenv("TTS_CACHE_MAX_ENTRIES", 2000))
+
+# A text is synthesized once it has been spoken this many times
+# (fixed prompts are warmed at startup instead)
+TTS_SYNTHESIZE_AFTER = int(os.getenv("TTS_SYNTHESIZE_AFTER", 2))
+
+# Longer texts (cart summaries, menus) are one-offs: always <Say>
+TTS_MAX_TEXT_CHARS = int(os.getenv("TTS_MAX_TEXT_CHARS", 200))
+
+# Uncached texts whose repeat counts are remembered
+TTS_MAX_TRACKED = int(os.getenv("TTS_MAX_TRACKED", 10_000))
+
+TTS_PROMPTS = REGISTRY.counter(
+    "tts_prompt_cache_total",
+    "Prompt audio cache lookups (hit / miss / skipped) and syntheses by outcome",
+    ("outcome",),
+)
+
+# Characters a synthesis provider would bill for: played from cache
+# ("hit") vs left to Twilio's <Say> ("miss", "skipped")
+TTS_PROMPT_CHARS = REGISTRY.counter(
+    "tts_prompt_cache_chars_total",
+    "Characters of spoken text by prompt audio cache outcome",
+    ("outcome",),
+)
+
+
+def build_synthesis_engine(name: str = TTS_ENGINE) -> SynthesisEngine:
+    """
+    Synthesis engine for the configured name (TTS_ENGINE).
+    """
+    if name == "stub":
+        from app.tts.stub_engine import StubSynthesisEngine
+        return StubSynthesisEngine()
+
+    raise ValueError(f"Unknown TTS engine: {name}")
+
+
+# prompt_key() output: the only names /audio/{key} resolves
+_KEY_PATTERN = re.compile(r"[0-9a-f]{32}")
+
+
+def normalize_prompt_text(text: str) -> str:
+    """
+    Spoken text as the cache sees it: NFC, single spaces, trimmed.
+    Case and punctuation are kept (both change how text is spoken).
+    """
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def prompt_key(text: str, settings: VoiceSettings, engine_name: str) -> str:
+    raw = f"{engine_name}\n{settings.cache_tag()}\n{normalize_prompt_text(text)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+
+class PromptAudioCache:
+    """
+    Synthesized audio of frequently spoken prompts, on local disk.
+
+    Responsibilities:
+    -----------------
+    - Map spoken text (+ voice settings + engine) to a content-addressed
+      audio file the webhooks can <Play> (served by GET /audio/{key})
+    - Synthesize warm-up prompts at startup and texts that keep
+      recurring, on a background thread — never on the request path
+    - Bound the number of files (LRU)
+
+    Non-responsibilities:
+    ---------------------
+    - TwiML rendering (app/api/twiml_templates.py)
+    - Which texts are fixed prompts (the caller passes them to start())
+
+    The directory may be shared by several workers (and their LRUs):
+    the file on disk, not this process's index, is the truth. lookup()
+    checks it (one stat) — a file another worker synthesized is
+    adopted, one another worker evicted falls back to <Say> — and
+    audio_path() serves any key whose file exists.
+
+    A text without audio yet is spoken with <Say> and, if it recurs,
+    synthesized for next time. Synthesis errors are counted and the
+    text stays on <Say>.
+    """
+
+    def __init__(
+        self,
+        engine: SynthesisEngine,
+        settings: Optional[VoiceSettings] = None,
+        *,
+        directory: str = TTS_CACHE_DIR,
+        max_entries: int = TTS_CACHE_MAX_ENTRIES,
+        synthesize_after: int = TTS_SYNTHESIZE_AFTER,
+        max_text_chars: int = TTS_MAX_TEXT_CHARS,
+        max_tracked: int = TTS_MAX_TRACKED,
+    ) -> None:
+        self.engine = engine
+        self.settings = settings or VoiceSettings()
+        self.directory = directory
+        self.max_entries = max_entries
+        self.synthesize_after = synthesize_after
+        self.max_text_chars = max_text_chars
+        self.max_tracked = max_tracked
+
+        # Loop-only state
+        self._entries: "OrderedDict[str, str]" = OrderedDict()   # key → path
+        self._seen: "OrderedDict[str, int]" = OrderedDict()      # key → times spoken
+        self._pending: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+
+        self._worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts")
+
+    # -------------------------
+    # Lifecycle
+    # -------------------------
+
+    async def start(self, warm: Iterable[str] = ()) -> None:
+        """
+        Indexes audio already on disk, then synthesizes the warm-up
+        prompts that are missing (in the background).
+        """
+        loop = asyncio.get_running_loop()
+        existing = await loop.run_in_executor(self._worker, self._scan)
+        self._entries.update(existing)
+
+        for text in warm:
+            key = self.key_for(text)
+            if key not in self._entries:
+                self._schedule(key, text)
+
+    async def close(self) -> None:
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._worker.shutdown(wait=True)
+
+    async def wait_idle(self) -> None:
+        """
+        Waits for scheduled syntheses (tests / warm-up checks).
+        """
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    # -------------------------
+    # Request path
+    # -------------------------
+
+    def key_for(self, text: str) -> str:
+        return prompt_key(text, self.settings, self.engine.name)
+
+    def lookup(self, text: str) -> Optional[str]:
+        """
+        Cache key of the audio for `text`, or None (speak with <Say>).
+        """
+        if not text or len(text) > self.max_text_chars:
+            TTS_PROMPTS.inc(outcome="skipped")
+            TTS_PROMPT_CHARS.inc(len(text or ""), outcome="skipped")
+            return None
+
+        key = self.key_for(text)
+        path = self._path_for(key)
+
+        if os.path.exists(path):
+            self._remember(key, path)
+            TTS_PROMPTS.inc(outcome="hit")
+            TTS_PROMPT_CHARS.inc(len(text), outcome="hit")
+            return key
+
+        # Evicted by another worker sharing the directory
+        self._entries.pop(key, None)
+
+        TTS_PROMPTS.inc(outcome="miss")
+        TTS_PROMPT_CHARS.inc(len(text), outcome="miss")
+
+        seen = self._seen.pop(key, 0) + 1
+        if seen >= self.synthesize_after:
+            self._schedule(key, text)
+        else:
+            self._seen[key] = seen
+            while len(self._seen) > self.max_tracked:
+                self._seen.popitem(last=False)
+
+        return None
+
+    def audio_path(self, key: str) -> Optional[str]:
+        """
+        File of `key` if it exists — whichever worker synthesized it
+        (Twilio's GET may reach any worker).
+        """
+        if not _KEY_PATTERN.fullmatch(key):
+            return None
+
+        path = self._path_for(key)
+        return path if os.path.isfile(path) else None
+
+    def stats(self) -> Dict[str, float]:
+        hits = TTS_PROMPTS.value(outcome="hit")
+        lookups = hits + TTS_PROMPTS.value(outcome="miss") + TTS_PROMPTS.value(outcome="skipped")
+        return {
+            "entries": len(self._entries),
+            "pending": len(self._pending),
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
+
+    # -------------------------
+    # Synthesis (background)
+    # -------------------------
+
+    def _schedule(self, key: str, text: str) -> None:
+        if key in self._pending:
+            return
+        self._pending.add(key)
+
+        task = asyncio.get_running_loop().create_task(self._synthesize(key, text))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _synthesize(self, key: str, text: str) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            path = await loop.run_in_executor(self._worker, self._synthesize_to_disk, key, text)
+        except Exception as e:
+            TTS_PROMPTS.inc(outcome="synthesis_error")
+            print(f"[TTS] synthesis failed for {key}: {e}")
+            return
+        finally:
+            self._pending.discard(key)
+
+        TTS_PROMPTS.inc(outcome="synthesized")
+        self._remember(key, path)
+
+    def _remember(self, key: str, path: str) -> None:
+        self._entries[key] = path
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            _, evicted = self._entries.popitem(last=False)
+            TTS_PROMPTS.inc(outcome="evicted")
+            asyncio.get_running_loop().run_in_executor(self._worker, _unlink, evicted)
+
+    def _path_for(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.{self.engine.file_extension}")
+
+    def _synthesize_to_disk(self, key: str, text: str) -> str:
+        audio = self.engine.synthesize(normalize_prompt_text(text), self.settings)
+
+        path = self._path_for(key)
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(audio)
+        os.replace(tmp, path)
+        return path
+
+    def _scan(self) -> Dict[str, str]:
+        os.makedirs(self.directory, exist_ok=True)
+
+        suffix = f".{self.engine.file_extension}"
+        found = []
+        for name in os.listdir(self.directory):
+            if name.endswith(suffix):
+                path = os.path.join(self.directory, name)
+                found.append((os.path.getmtime(path), name[: -len(suffix)], path))
+
+        # Oldest first: the LRU end
+        found.sort()
+        return {key: path for _, key, path in found[-self.max_entries:] if self.max_entries > 0}
+
+
+def _unlink(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -0,0 +1,56 @@
+# app/tts/stub_engine.py
+
+from __future__ import annotations
+
+import io
+import math
+import struct
+import wave
+import zlib
+
+from app.tts.base import VoiceSettings
+
+SAMPLE_RATE = 8000          # telephony rate
+SECONDS_PER_WORD = 0.06
+MAX_SECONDS = 10.0
+
+
+class StubSynthesisEngine:
+    """
+    Local stand-in for a TTS service: a short mono 16-bit WAV tone,
+    one beep per word, pitch derived from the text.
+
+    Deterministic and dependency-free, so cache behavior (keys, hits,
+    <Play> rendering, /audio serving) can be exercised without a
+    synthesis provider.
+    """
+
+    name = "stub"
+    content_type = "audio/wav"
+    file_extension = "wav"
+
+    def synthesize(self, text: str, settings: VoiceSettings) -> bytes:
+        words = max(len(text.split()), 1)
+        seconds = min(words * SECONDS_PER_WORD / max(settings.rate, 0.1), MAX_SECONDS)
+        frames = int(seconds * SAMPLE_RATE)
+
+        pitch = 300 + zlib.crc32(text.encode("utf-8")) % 500
+        beep = max(frames // words, 1)
+
+        samples = bytearray()
+        for n in range(frames):
+            # Short gap between words
+            if n % beep > beep * 0.8:
+                samples += b"\x00\x00"
+                continue
+            value = int(4000 * math.sin(2 * math.pi * pitch * n / SAMPLE_RATE))
+            samples += struct.pack("<h", value)
+
+        out = io.BytesIO()
+        with wave.open(out, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(SAMPLE_RATE)
+            wav.writeframes(bytes(samples))
+
+        return out.getvalue()